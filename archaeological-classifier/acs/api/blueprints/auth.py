@@ -220,10 +220,10 @@ def get_current_user():
     if user_data.get('username') == 'admin':
         try:
             db = get_database()
-            user = db.get_user_by_username('admin')
-            if user and user.get('password_hash'):
+            password_hash = db.get_password_hash('admin')
+            if password_hash:
                 # Check if password matches default 'admin123'
-                has_default = PasswordHasher.verify_password('admin123', user['password_hash'])
+                has_default = PasswordHasher.verify_password('admin123', password_hash)
                 user_data['has_default_password'] = has_default
             else:
                 user_data['has_default_password'] = False
@@ -681,7 +681,7 @@ def change_password():
             }), 400
 
         db = get_database()
-        user = db.get_user_by_id(g.current_user['user_id'])
+        user = db.get_user_by_id(g.current_user['user_id'], with_hash=True)
 
         # Verify current password
         if not PasswordHasher.verify_password(current_password, user['password_hash']):
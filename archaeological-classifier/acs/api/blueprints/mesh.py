@@ -66,7 +66,7 @@ def upload_mesh():
         max_size = FileValidator.MAX_SIZE_WEB if is_web_upload else FileValidator.MAX_SIZE_API
 
         # Validate file
-        safe_filename, detected_type = FileValidator.validate_upload(
+        safe_filename, detected_type, _ = FileValidator.validate_upload(
             file,
             max_size=max_size,
             check_integrity=False  # We'll check after saving
@@ -74,10 +74,10 @@ def upload_mesh():
 
         # Save file
         filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], safe_filename)
-        file.save(filepath)
+        FileValidator.save_stream(file, filepath)
 
         # Validate mesh integrity
-        is_valid, error_msg = FileValidator.validate_mesh_integrity(filepath)
+        is_valid, error_msg, mesh = FileValidator.validate_mesh_integrity(filepath)
         if not is_valid:
             # Clean up invalid file
             if os.path.exists(filepath):
@@ -92,7 +92,7 @@ def upload_mesh():
 
         # Process mesh
         start_time = time.time()
-        features = processor.load_mesh(filepath, artifact_id)
+        features = processor.load_mesh(filepath, artifact_id, mesh=mesh)
         processing_time = time.time() - start_time
 
         return jsonify({
@@ -146,7 +146,7 @@ def batch_process():
         if file and allowed_file(file.filename):
             filename = secure_filename(file.filename)
             filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
+            FileValidator.save_stream(file, filepath)
             filepaths.append(filepath)
 
     # Process batch
@@ -258,7 +258,7 @@ def export_features():
     Requires: admin role
 
     Body:
-        format: 'json' or 'csv'
+        format: 'json', 'csv', 'parquet' or 'npy' (scalar feature matrix)
 
     Returns:
         JSON with export status
@@ -266,8 +266,8 @@ def export_features():
     data = request.get_json()
     format_type = data.get('format', 'json')
 
-    if format_type not in ['json', 'csv']:
-        return jsonify({'error': 'Invalid format. Use json or csv'}), 400
+    if format_type not in ['json', 'csv', 'parquet', 'npy']:
+        return jsonify({'error': 'Invalid format. Use json, csv, parquet or npy'}), 400
 
     try:
         output_path = os.path.join(
@@ -159,7 +159,11 @@ def upload_batch():
 
         # Validate batch size
         try:
-            FileValidator.validate_batch_upload(files, max_total_size=FileValidator.MAX_SIZE_BATCH)
+            FileValidator.validate_batch_upload(
+                files,
+                max_total_size=FileValidator.MAX_SIZE_BATCH,
+                max_file_size=FileValidator.MAX_SIZE_API
+            )
         except FileValidationError as e:
             return jsonify({
                 'error': e.message,
@@ -183,17 +187,17 @@ def upload_batch():
 
             try:
                 # Validate file
-                safe_filename, detected_type = FileValidator.validate_upload(
+                safe_filename, detected_type, _ = FileValidator.validate_upload(
                     file,
                     max_size=FileValidator.MAX_SIZE_API,
                     check_integrity=False  # Check after saving
                 )
 
                 file_path = meshes_dir / safe_filename
-                file.save(str(file_path))
+                FileValidator.save_stream(file, str(file_path))
 
                 # Validate mesh integrity
-                is_valid, error_msg = FileValidator.validate_mesh_integrity(str(file_path))
+                is_valid, error_msg, _ = FileValidator.validate_mesh_integrity(str(file_path))
                 if not is_valid:
                     os.remove(str(file_path))
                     validation_errors.append(f"{safe_filename}: {error_msg}")
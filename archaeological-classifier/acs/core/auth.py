@@ -144,22 +144,17 @@ def authenticate_user(username: str, password: str) -> Optional[Dict]:
         User dict (without password_hash) if authenticated, None otherwise
     """
     db = get_database()
-    user = db.get_user_by_username(username)
 
-    if not user:
+    # Only active users have a retrievable hash
+    password_hash = db.get_password_hash(username)
+    if not password_hash:
         return None
 
     # Verify password
-    if not PasswordHasher.verify_password(password, user['password_hash']):
+    if not PasswordHasher.verify_password(password, password_hash):
         return None
 
-    # Check if user is active
-    if not user.get('is_active', True):
-        return None
-
-    # Remove password hash from returned dict
-    user_data = {k: v for k, v in user.items() if k != 'password_hash'}
-    return user_data
+    return db.get_user_by_username(username)
 
 
 def register_user(username: str, email: str, password: str,
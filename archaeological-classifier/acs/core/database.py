@@ -8,10 +8,310 @@ Persistent storage for artifacts, classifications, and ML training data.
 import sqlite3
 import json
 import os
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+import threading
+import queue
+import atexit
+import logging
+import copy
+from collections import OrderedDict, defaultdict
+from itertools import groupby
+from typing import Dict, List, Optional, Any, Tuple
 from contextlib import contextmanager
 
+import numpy as np
+
+# Optional orjson for faster (de)serialization of feature and comparison payloads
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional msgpack for compact binary storage of feature and comparison payloads
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+
+# Let sqlite3 bind numpy scalars directly (conversion happens in the C binding layer)
+for _np_type in (np.int8, np.int16, np.int32, np.int64,
+                 np.uint8, np.uint16, np.uint32, np.uint64):
+    sqlite3.register_adapter(_np_type, int)
+for _np_type in (np.float16, np.float32, np.float64):
+    sqlite3.register_adapter(_np_type, float)
+sqlite3.register_adapter(np.bool_, bool)
+
+
+def _json_default(obj):
+    """json.dumps fallback for numpy scalars and arrays."""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_dumps(obj) -> str:
+    """Serialize to JSON text, using orjson when available (handles numpy natively)."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(
+                obj, default=_json_default,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            ).decode()
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; the stdlib encoder copes
+    return json.dumps(obj, default=_json_default)
+
+
+def _json_loads(text):
+    """Parse JSON text, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN literals written by json.dumps in older rows
+    return json.loads(text)
+
+
+def _pack(obj):
+    """Serialize a stored payload: msgpack bytes (stored as BLOB) when available, else JSON."""
+    if MSGPACK_AVAILABLE:
+        return msgpack.packb(obj, default=_json_default)
+    return _json_dumps(obj)
+
+
+def _unpack(value):
+    """Deserialize a stored payload written by _pack, or a legacy JSON TEXT value."""
+    if isinstance(value, bytes):
+        if not MSGPACK_AVAILABLE:
+            raise RuntimeError("msgpack is required to read this database (pip install msgpack)")
+        return msgpack.unpackb(value, raw=False, strict_map_key=False)
+    return _json_loads(value)
+
+
+def _write_json_array(f, items):
+    """Write an iterable as a JSON array, one element at a time."""
+    f.write('[')
+    for i, item in enumerate(items):
+        f.write(',\n  ' if i else '\n  ')
+        f.write(json.dumps(item))
+    f.write('\n]')
+
+
+# Prepared statements kept per connection (sqlite3's LRU keyed by SQL text). Thread
+# connections are long-lived, so repeated queries skip sqlite3_prepare_v2 after the
+# first call; sized above the ~140 distinct statements in this module so routine
+# queries aren't evicted by one-off DDL or ad-hoc SQL from the blueprints.
+_STATEMENT_CACHE_SIZE = 256
+
+# Per-connection PRAGMAs (volatile, must be re-applied on every new connection).
+_CONNECTION_PRAGMAS = '''
+    PRAGMA busy_timeout=5000;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-64000;
+    PRAGMA mmap_size=268435456;
+'''
+
+# SQL for the hot write paths, kept as module constants so every call binds the exact
+# same string and hits the connection's prepared-statement cache.
+#
+# Timestamps are generated by SQLite with strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'),
+# which keeps the ISO-8601 local-time format (and text ordering) of existing rows.
+_SQL_INSERT_ARTIFACT = '''
+    INSERT OR REPLACE INTO artifacts
+    (artifact_id, project_id, mesh_path, upload_date, n_vertices, n_faces, is_watertight, metadata)
+    VALUES (?, ?, ?, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'), ?, ?, ?, ?)
+'''
+_SQL_UPSERT_FEATURE = '''
+    INSERT INTO features (artifact_id, feature_name, feature_value, extraction_date)
+    VALUES (?, ?, ?, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'))
+    ON CONFLICT(artifact_id, feature_name) DO UPDATE SET
+        feature_value = excluded.feature_value,
+        extraction_date = excluded.extraction_date
+'''
+_SQL_UPSERT_STYLISTIC_FEATURE = '''
+    INSERT INTO stylistic_features (artifact_id, feature_category, features_json, extraction_date)
+    VALUES (?, ?, ?, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'))
+    ON CONFLICT(artifact_id, feature_category) DO UPDATE SET
+        features_json = excluded.features_json,
+        extraction_date = excluded.extraction_date
+'''
+_SQL_INSERT_CLASSIFICATION = '''
+    INSERT INTO classifications
+    (artifact_id, class_id, class_name, confidence, classification_date, validated, validator_notes)
+    VALUES (?, ?, ?, ?, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'), ?, ?)
+'''
+_SQL_UPSERT_COMPARISON = '''
+    INSERT INTO comparisons
+    (artifact1_id, artifact2_id, similarity_score, comparison_data, comparison_date)
+    VALUES (?, ?, ?, ?, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'))
+    ON CONFLICT(artifact1_id, artifact2_id) DO UPDATE SET
+        similarity_score = excluded.similarity_score,
+        comparison_data = excluded.comparison_data,
+        comparison_date = excluded.comparison_date
+'''
+
+# User columns returned by the user getters; password_hash is only read when asked for
+_USER_COLUMNS = 'user_id, username, email, role, full_name, created_date, last_login, is_active'
+
+# All get_statistics() counts in one statement (one prepare/step instead of six)
+_SQL_STATISTICS = '''
+    SELECT
+        (SELECT row_count FROM table_counts WHERE table_name = 'artifacts') AS total_artifacts,
+        (SELECT row_count FROM table_counts WHERE table_name = 'classifications')
+            AS total_classifications,
+        (SELECT COUNT(*) FROM classifications WHERE validated = 1) AS validated_classifications,
+        (SELECT COUNT(*) FROM training_data WHERE is_validated = 1) AS training_samples,
+        (SELECT row_count FROM table_counts WHERE table_name = 'analysis_results')
+            AS analysis_results,
+        (SELECT row_count FROM table_counts WHERE table_name = 'comparisons') AS comparisons
+'''
+
+# Tables whose row counts are maintained in table_counts by triggers
+_COUNTED_TABLES = ('artifacts', 'classifications', 'training_data', 'analysis_results',
+                   'comparisons')
+
+# Stored in PRAGMA user_version once _init_database has brought a file up to date.
+# Bump it whenever the schema, indexes, triggers or migrations below change.
+SCHEMA_VERSION = 5
+
+def _artifact_count(cursor) -> int:
+    """Number of artifacts, from table_counts or COUNT(*) on files that predate it."""
+    try:
+        cursor.execute("SELECT row_count FROM table_counts WHERE table_name = 'artifacts'")
+        row = cursor.fetchone()
+        if row is not None:
+            return row[0]
+    except sqlite3.OperationalError:
+        pass  # no such table
+    # Keep this a bare COUNT(*) (no WHERE, alias or subquery) so it compiles to the
+    # Count opcode, which reads b-tree page headers instead of stepping every row
+    cursor.execute('SELECT COUNT(*) FROM artifacts')
+    return cursor.fetchone()[0]
+
+
+# Bumped whenever the database file is replaced on disk (e.g. restore from cloud),
+# so cached connections pointing at the old file get reopened.
+_connection_generation = 0
+
+
+class _ReadCache:
+    """
+    Process-wide LRU cache of read results for one database file.
+
+    Shared by every ArtifactDatabase instance on the same path and cleared
+    whenever a transaction on that path changes rows, so results never outlive
+    a write made through get_connection (including raw SQL in blueprints).
+    """
+
+    _MISS = object()
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.version = 0
+
+    def get(self, key):
+        """Return a copy of the cached value, or _ReadCache._MISS."""
+        with self._lock:
+            value = self._data.get(key, self._MISS)
+            if value is self._MISS:
+                return value
+            self._data.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def put(self, key, value, version: int):
+        """Store value unless the cache was invalidated since `version` was read."""
+        with self._lock:
+            if version != self.version:
+                return
+            self._data[key] = copy.deepcopy(value)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.version += 1
+
+
+_read_caches: Dict[str, _ReadCache] = {}
+_read_caches_lock = threading.Lock()
+
+
+class _BackgroundWriter:
+    """
+    Single daemon thread that applies queued writes for one database file.
+
+    Used for large, fire-and-forget payloads (comparisons, analysis results) so
+    request threads don't wait on the write lock and fsync. Failed writes are
+    logged with their traceback and counted in failed_writes.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.failed_writes = 0
+
+    def submit(self, func, *args):
+        """Queue func(*args) to run on the writer thread."""
+        with self._lock:
+            # Threads don't survive fork; start a fresh one in the child
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run, name='acs-db-writer',
+                                                daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+            self._queue.put((func, args))
+
+    def flush(self):
+        """Block until every queued write has been committed."""
+        if self._thread is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    def _run(self):
+        write_queue = self._queue
+        while True:
+            func, args = write_queue.get()
+            try:
+                func(*args)
+            except Exception:
+                self.failed_writes += 1  # only this thread writes it
+                logging.getLogger(__name__).exception("Background database write failed")
+            finally:
+                write_queue.task_done()
+
+
+_background_writers: Dict[str, _BackgroundWriter] = {}
+_background_writers_lock = threading.Lock()
+
+
+def _get_background_writer(db_path: str) -> _BackgroundWriter:
+    """Return the shared background writer for a database file."""
+    with _background_writers_lock:
+        writer = _background_writers.get(db_path)
+        if writer is None:
+            writer = _BackgroundWriter()
+            _background_writers[db_path] = writer
+            # Don't lose queued writes on interpreter shutdown
+            atexit.register(writer.flush)
+        return writer
+
+
+def _get_read_cache(db_path: str) -> _ReadCache:
+    """Get the shared read cache for a database file."""
+    with _read_caches_lock:
+        if db_path not in _read_caches:
+            _read_caches[db_path] = _ReadCache()
+        return _read_caches[db_path]
+
 
 class ArtifactDatabase:
     """
@@ -31,27 +331,118 @@ class ArtifactDatabase:
         if db_dir:
             os.makedirs(db_dir, exist_ok=True)
 
+        # One persistent connection per thread (sqlite3 connections are not thread-safe)
+        self._local = threading.local()
+        self._read_cache = _get_read_cache(db_path)
+        self._writer = _get_background_writer(db_path)
+
+        # WAL (readers don't block the writer) is persistent in the database file, so
+        # it's set once here rather than per connection; in-memory databases don't support it
+        if db_path != ':memory:':
+            self._get_thread_connection().execute('PRAGMA journal_mode=WAL')
+
         self._init_database()
 
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection with row factory and PRAGMAs applied."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None,
+                               cached_statements=_STATEMENT_CACHE_SIZE)
+        conn.row_factory = sqlite3.Row  # Enable column access by name
+        conn.executescript(_CONNECTION_PRAGMAS)
+        return conn
+
+    def _get_thread_connection(self) -> sqlite3.Connection:
+        """Return this thread's cached connection, reopening it after fork or file replacement."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and (self._local.pid != os.getpid() or
+                                 self._local.generation != _connection_generation):
+            if self._local.pid == os.getpid():
+                conn.close()
+            conn = None
+
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            self._local.generation = _connection_generation
+            self._local.depth = 0
+        return conn
+
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Enable column access by name
+        """Context manager for database connections.
+
+        Yields this thread's persistent connection. The outermost block runs in a
+        single transaction that is committed on exit and rolled back on error;
+        nested blocks join the enclosing transaction.
+        """
+        conn = self._get_thread_connection()
+        outermost = self._local.depth == 0
+        if outermost and not conn.in_transaction:
+            conn.execute('BEGIN')
+        changes_before = conn.total_changes
+        self._local.depth += 1
         try:
             yield conn
-            conn.commit()
         except Exception as e:
-            conn.rollback()
+            if outermost and conn.in_transaction:
+                conn.rollback()
             raise e
+        else:
+            if outermost and conn.in_transaction:
+                conn.commit()
         finally:
+            self._local.depth -= 1
+            if conn.total_changes != changes_before:
+                self._read_cache.clear()
+
+    @contextmanager
+    def get_read_connection(self):
+        """Context manager for single-statement reads.
+
+        Yields this thread's connection without opening a transaction, so each
+        SELECT runs in its own implicit read transaction and skips the BEGIN/COMMIT
+        round-trip. Inside a get_connection() block it sees that block's uncommitted
+        writes. Never write through it: writes belong in get_connection().
+        """
+        yield self._get_thread_connection()
+
+    def flush_writes(self):
+        """Wait for queued background writes (comparisons, analysis results) to commit."""
+        self._writer.flush()
+
+    def close(self):
+        """Close this thread's cached connection (e.g. on shutdown)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            try:
+                # Refresh planner statistics for tables whose shape changed this session
+                conn.execute('PRAGMA optimize')
+            except sqlite3.Error:
+                pass
             conn.close()
+            self._local.conn = None
 
     def _init_database(self):
         """Create database schema if it doesn't exist."""
+        # Already up to date: skip the DDL and migration checks entirely
+        with self.get_read_connection() as conn:
+            if conn.execute('PRAGMA user_version').fetchone()[0] >= SCHEMA_VERSION:
+                return
+
+        # All DDL and migrations run in one transaction (one commit, and a crash can't
+        # leave a half-migrated file). Take the write lock up front: upgrading a deferred
+        # read transaction fails immediately, without busy_timeout, when another
+        # process is initializing the same file.
+        self._get_thread_connection().execute('BEGIN IMMEDIATE')
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
+            # Another process may have finished initializing while we waited
+            cursor.execute('PRAGMA user_version')
+            if cursor.fetchone()[0] >= SCHEMA_VERSION:
+                return
+
             # Projects table (for multi-project management)
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS projects (
@@ -204,12 +595,155 @@ class ArtifactDatabase:
             # Create indexes
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_artifact_id ON features(artifact_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_class_id ON classifications(class_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_validated ON classifications(validated)')
+            # Only validated classifications are ever looked up by this flag, so a partial
+            # index (replacing the old full idx_validated) stays small and skips new rows;
+            # date order serves get_validated_classifications without a sort
+            cursor.execute('DROP INDEX IF EXISTS idx_validated')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_classifications_validated
+                ON classifications(classification_date DESC) WHERE validated = 1
+            ''')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_training_class ON training_data(class_label)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_username ON users(username)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_email ON users(email)')
+            # username/email are UNIQUE columns, so their automatic indexes already give
+            # active-user lookups a unique seek; these duplicates only slowed writes
+            cursor.execute('DROP INDEX IF EXISTS idx_username')
+            cursor.execute('DROP INDEX IF EXISTS idx_email')
+            # One row per (artifact, feature), required by the add_features upserts.
+            # Older databases may hold duplicates: keep the most recent row before indexing.
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_features_artifact_name'")
+            if cursor.fetchone() is None:
+                cursor.execute('''
+                    DELETE FROM features WHERE id NOT IN (
+                        SELECT MAX(id) FROM features GROUP BY artifact_id, feature_name
+                    )
+                ''')
+                cursor.execute('''
+                    DELETE FROM stylistic_features WHERE id NOT IN (
+                        SELECT MAX(id) FROM stylistic_features GROUP BY artifact_id, feature_category
+                    )
+                ''')
+            cursor.execute('''
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_features_artifact_name
+                ON features(artifact_id, feature_name)
+            ''')
+            cursor.execute('''
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_stylistic_artifact_category
+                ON stylistic_features(artifact_id, feature_category)
+            ''')
 
-            conn.commit()
+            # Comparisons are stored once per unordered pair as (min id, max id); migrate
+            # older databases that kept every run in either orientation (newest wins)
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_comparisons_pair'")
+            if cursor.fetchone() is None:
+                cursor.execute('''
+                    DELETE FROM comparisons WHERE id NOT IN (
+                        SELECT MAX(id) FROM comparisons
+                        GROUP BY MIN(artifact1_id, artifact2_id), MAX(artifact1_id, artifact2_id)
+                    )
+                ''')
+                cursor.execute('''
+                    UPDATE comparisons
+                    SET artifact1_id = artifact2_id, artifact2_id = artifact1_id
+                    WHERE artifact1_id > artifact2_id
+                ''')
+            cursor.execute('''
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_comparisons_pair
+                ON comparisons(artifact1_id, artifact2_id)
+            ''')
+            # Second leg of "artifact1_id = ? OR artifact2_id = ?" lookups
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_comparisons_artifact2
+                ON comparisons(artifact2_id)
+            ''')
+
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_artifacts_upload ON artifacts(upload_date DESC)')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_artifacts_project_upload
+                ON artifacts(project_id, upload_date DESC)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_classifications_artifact
+                ON classifications(artifact_id, classification_date DESC)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_training_validated
+                ON training_data(is_validated, class_label, added_date)
+            ''')
+
+            # Gather planner statistics once so the new indexes get picked up
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                cursor.execute('ANALYZE')
+
+            # Cascade artifact deletion to dependent rows inside SQLite. A trigger is used
+            # rather than ON DELETE CASCADE so it also applies to existing databases and
+            # doesn't require enforcing every foreign key (PRAGMA foreign_keys).
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_artifacts_delete_cascade
+                AFTER DELETE ON artifacts
+                BEGIN
+                    DELETE FROM features WHERE artifact_id = OLD.artifact_id;
+                    DELETE FROM stylistic_features WHERE artifact_id = OLD.artifact_id;
+                    DELETE FROM classifications WHERE artifact_id = OLD.artifact_id;
+                    DELETE FROM training_data WHERE artifact_id = OLD.artifact_id;
+                    DELETE FROM comparisons
+                    WHERE artifact1_id = OLD.artifact_id OR artifact2_id = OLD.artifact_id;
+                END
+            ''')
+
+            # Same for users: drop their collaborator memberships with them
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_users_delete_cascade
+                AFTER DELETE ON users
+                BEGIN
+                    DELETE FROM project_collaborators WHERE user_id = OLD.user_id;
+                END
+            ''')
+
+            # O(1) row counts: COUNT(*) has no cached count in SQLite and scans the table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS table_counts (
+                    table_name TEXT PRIMARY KEY,
+                    row_count INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            # INSERT OR REPLACE in add_artifact doesn't fire DELETE triggers for the
+            # replaced row, so artifacts are counted before the insert, only when new
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_artifacts_count_insert
+                BEFORE INSERT ON artifacts
+                WHEN NOT EXISTS (SELECT 1 FROM artifacts WHERE artifact_id = NEW.artifact_id)
+                BEGIN
+                    UPDATE table_counts SET row_count = row_count + 1
+                    WHERE table_name = 'artifacts';
+                END
+            ''')
+            for table in _COUNTED_TABLES:
+                if table != 'artifacts':
+                    cursor.execute(f'''
+                        CREATE TRIGGER IF NOT EXISTS trg_{table}_count_insert
+                        AFTER INSERT ON {table}
+                        BEGIN
+                            UPDATE table_counts SET row_count = row_count + 1
+                            WHERE table_name = '{table}';
+                        END
+                    ''')
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_count_delete
+                    AFTER DELETE ON {table}
+                    BEGIN
+                        UPDATE table_counts SET row_count = row_count - 1
+                        WHERE table_name = '{table}';
+                    END
+                ''')
+            # (Re)seed from the real counts; the migrations above may have deleted rows
+            for table in _COUNTED_TABLES:
+                cursor.execute(f'''
+                    INSERT OR REPLACE INTO table_counts (table_name, row_count)
+                    SELECT '{table}', COUNT(*) FROM {table}
+                ''')
+
+            cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
 
     # ========== ARTIFACT OPERATIONS ==========
 
@@ -219,15 +753,10 @@ class ArtifactDatabase:
         """Add a new artifact to the database."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR REPLACE INTO artifacts
-                (artifact_id, project_id, mesh_path, upload_date, n_vertices, n_faces, is_watertight, metadata)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            cursor.execute(_SQL_INSERT_ARTIFACT, (
                 artifact_id,
                 project_id,
                 mesh_path,
-                datetime.now().isoformat(),
                 n_vertices,
                 n_faces,
                 1 if is_watertight else 0,
@@ -236,19 +765,34 @@ class ArtifactDatabase:
 
     def get_artifact(self, artifact_id: str) -> Optional[Dict]:
         """Retrieve artifact data."""
+        key = ('artifact', artifact_id)
+        cached = self._read_cache.get(key)
+        if cached is not _ReadCache._MISS:
+            return cached
+        version = self._read_cache.version
+
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM artifacts WHERE artifact_id = ?', (artifact_id,))
+            cursor.execute('''
+                SELECT artifact_id, project_id, mesh_path, upload_date, n_vertices, n_faces,
+                       is_watertight, metadata
+                FROM artifacts WHERE artifact_id = ?
+            ''', (artifact_id,))
             row = cursor.fetchone()
-            if row:
-                return dict(row)
-            return None
+            result = dict(row) if row else None
+
+        self._read_cache.put(key, result, version)
+        return result
 
     def get_all_artifacts(self) -> List[Dict]:
         """Get all artifacts."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM artifacts ORDER BY upload_date DESC')
+            cursor.execute('''
+                SELECT artifact_id, project_id, mesh_path, upload_date, n_vertices, n_faces,
+                       is_watertight, metadata
+                FROM artifacts ORDER BY upload_date DESC
+            ''')
             return [dict(row) for row in cursor.fetchall()]
 
     def get_artifacts_paginated(self, page: int = 1, per_page: int = 20) -> Dict:
@@ -267,12 +811,18 @@ class ArtifactDatabase:
             - per_page: Items per page
             - pages: Total number of pages
         """
+        # The total is kept in the read cache, so it is only re-read
+        # after the database has been written to
+        total = self._read_cache.get(('artifacts_count',))
+        version = self._read_cache.version
+
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
             # Get total count
-            cursor.execute('SELECT COUNT(*) as count FROM artifacts')
-            total = cursor.fetchone()['count']
+            if total is _ReadCache._MISS:
+                total = _artifact_count(cursor)
+                self._read_cache.put(('artifacts_count',), total, version)
 
             # Calculate pagination
             pages = (total + per_page - 1) // per_page  # Ceiling division
@@ -280,7 +830,9 @@ class ArtifactDatabase:
 
             # Get paginated results
             cursor.execute('''
-                SELECT * FROM artifacts
+                SELECT artifact_id, project_id, mesh_path, upload_date, n_vertices, n_faces,
+                       is_watertight, metadata
+                FROM artifacts
                 ORDER BY upload_date DESC
                 LIMIT ? OFFSET ?
             ''', (per_page, offset))
@@ -313,94 +865,80 @@ class ArtifactDatabase:
         Returns:
             True if artifact was deleted, False if not found
         """
+        # Don't let a queued comparison re-insert rows for the deleted artifact
+        self.flush_writes()
+
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
-            # Check if artifact exists
-            cursor.execute('SELECT artifact_id FROM artifacts WHERE artifact_id = ?', (artifact_id,))
-            if not cursor.fetchone():
-                return False
-
-            # Delete from all related tables (CASCADE should handle this automatically,
-            # but we do it explicitly for clarity and to handle any non-CASCADE constraints)
-
-            # Delete features
-            cursor.execute('DELETE FROM features WHERE artifact_id = ?', (artifact_id,))
-
-            # Delete stylistic features
-            cursor.execute('DELETE FROM stylistic_features WHERE artifact_id = ?', (artifact_id,))
-
-            # Delete classifications
-            cursor.execute('DELETE FROM classifications WHERE artifact_id = ?', (artifact_id,))
-
-            # Delete training samples
-            cursor.execute('DELETE FROM training_data WHERE artifact_id = ?', (artifact_id,))
-
-            # Delete comparisons where this artifact is involved
-            cursor.execute('''
-                DELETE FROM comparisons
-                WHERE artifact1_id = ? OR artifact2_id = ?
-            ''', (artifact_id, artifact_id))
-
-            # Delete the artifact itself
+            # Dependent rows are removed by the trg_artifacts_delete_cascade trigger
             cursor.execute('DELETE FROM artifacts WHERE artifact_id = ?', (artifact_id,))
-
-            conn.commit()
-            return True
+            return cursor.rowcount > 0
 
     # ========== FEATURE OPERATIONS ==========
 
     def add_features(self, artifact_id: str, features: Dict[str, float]):
-        """Store features for an artifact."""
-        import json
-        import numpy as np
-
-        def convert_numpy_types(obj):
-            """Convert numpy types to Python native types for JSON serialization."""
-            if isinstance(obj, np.bool_):
-                return bool(obj)
-            elif isinstance(obj, np.integer):
-                return int(obj)
-            elif isinstance(obj, np.floating):
-                return float(obj)
-            elif isinstance(obj, np.ndarray):
-                return obj.tolist()
-            elif isinstance(obj, dict):
-                return {key: convert_numpy_types(value) for key, value in obj.items()}
-            elif isinstance(obj, (list, tuple)):
-                return [convert_numpy_types(item) for item in obj]
-            else:
-                return obj
+        """Store features for an artifact.
 
+        Numeric values go to the features table and nested dicts (e.g. 'savignano')
+        to stylistic_features. Existing values with the same name are overwritten;
+        features not present in `features` are kept.
+        """
+        numeric_rows = []
+        stylistic_rows = []
+
+        for feature_name, feature_value in features.items():
+            # Handle nested dictionaries (e.g., 'savignano' features)
+            if isinstance(feature_value, dict):
+                stylistic_rows.append((artifact_id, feature_name,
+                                       _pack(feature_value)))
+            elif isinstance(feature_value, (int, float, np.integer, np.floating)):
+                numeric_rows.append((artifact_id, feature_name, feature_value))
+
+        # Single transaction: one upsert executemany per table
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            extraction_date = datetime.now().isoformat()
-
-            # Delete existing features for this artifact
-            cursor.execute('DELETE FROM features WHERE artifact_id = ?', (artifact_id,))
-
-            # Insert new features
-            for feature_name, feature_value in features.items():
-                # Handle nested dictionaries (e.g., 'savignano' features)
-                if isinstance(feature_value, dict):
-                    # Convert numpy types before JSON serialization
-                    feature_value = convert_numpy_types(feature_value)
-                    # Store in stylistic_features table
-                    cursor.execute('DELETE FROM stylistic_features WHERE artifact_id = ? AND feature_category = ?',
-                                 (artifact_id, feature_name))
-                    cursor.execute('''
-                        INSERT INTO stylistic_features (artifact_id, feature_category, features_json, extraction_date)
-                        VALUES (?, ?, ?, ?)
-                    ''', (artifact_id, feature_name, json.dumps(feature_value), extraction_date))
-                elif isinstance(feature_value, (int, float)):
-                    cursor.execute('''
-                        INSERT INTO features (artifact_id, feature_name, feature_value, extraction_date)
-                        VALUES (?, ?, ?, ?)
-                    ''', (artifact_id, feature_name, float(feature_value), extraction_date))
+            cursor.executemany(_SQL_UPSERT_FEATURE, numeric_rows)
+            # Nested features go to the stylistic_features table (one row per category)
+            cursor.executemany(_SQL_UPSERT_STYLISTIC_FEATURE, stylistic_rows)
+
+    def add_features_bulk(self, artifact_ids: List[str], feature_matrix: np.ndarray,
+                          feature_names: List[str]):
+        """Store numeric features for many artifacts at once.
+
+        Same upsert semantics as add_features, but takes an (N, F) matrix and
+        writes it with a single executemany.
+
+        Args:
+            artifact_ids: N artifact IDs, one per matrix row
+            feature_matrix: Array of shape (N, F)
+            feature_names: F feature names, one per matrix column
+        """
+        matrix = np.asarray(feature_matrix)
+        if matrix.shape != (len(artifact_ids), len(feature_names)):
+            raise ValueError(
+                f"feature_matrix shape {matrix.shape} doesn't match "
+                f"({len(artifact_ids)} artifacts, {len(feature_names)} features)"
+            )
+
+        # tolist() converts the whole matrix to Python floats in C
+        rows = (
+            (artifact_id, feature_name, value)
+            for artifact_id, values in zip(artifact_ids, matrix.tolist())
+            for feature_name, value in zip(feature_names, values)
+        )
+
+        with self.get_connection() as conn:
+            conn.cursor().executemany(_SQL_UPSERT_FEATURE, rows)
 
     def get_features(self, artifact_id: str) -> Dict[str, float]:
         """Retrieve features for an artifact."""
-        import json
+        key = ('features', artifact_id)
+        cached = self._read_cache.get(key)
+        if cached is not _ReadCache._MISS:
+            return cached
+        version = self._read_cache.version
+
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
@@ -420,9 +958,10 @@ class ArtifactDatabase:
             ''', (artifact_id,))
 
             for row in cursor.fetchall():
-                result[row['feature_category']] = json.loads(row['features_json'])
+                result[row['feature_category']] = _unpack(row['features_json'])
 
-            return result
+        self._read_cache.put(key, result, version)
+        return result
 
     def get_all_features(self, include_stylistic: bool = True) -> Dict[str, Dict[str, Any]]:
         """Get features for all artifacts.
@@ -433,33 +972,29 @@ class ArtifactDatabase:
         Returns:
             Dict mapping artifact_id to dict of features
         """
-        import json
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.arraysize = 1000
+            result = defaultdict(dict)
 
-            # Get numeric features
+            # Get numeric features (iterate the cursor, positional access on this hot path)
             cursor.execute('SELECT artifact_id, feature_name, feature_value FROM features')
-
-            result = {}
-            for row in cursor.fetchall():
-                artifact_id = row['artifact_id']
-                if artifact_id not in result:
-                    result[artifact_id] = {}
-                result[artifact_id][row['feature_name']] = row['feature_value']
+            for row in cursor:
+                result[row[0]][row[1]] = row[2]
 
             # Also get stylistic features if requested
             if include_stylistic:
                 cursor.execute('SELECT artifact_id, feature_category, features_json FROM stylistic_features')
-                for row in cursor.fetchall():
-                    artifact_id = row['artifact_id']
-                    if artifact_id not in result:
-                        result[artifact_id] = {}
+                for row in cursor:
+                    artifact_features = result[row[0]]
                     try:
-                        result[artifact_id][row['feature_category']] = json.loads(row['features_json'])
-                    except (json.JSONDecodeError, TypeError):
+                        artifact_features[row[1]] = _unpack(row[2])
+                    except (ValueError, TypeError, RuntimeError):
+                        # Corrupt JSON/msgpack (both raise ValueError subclasses),
+                        # or a msgpack BLOB without msgpack installed
                         pass
 
-            return result
+            return dict(result)
 
     # ========== CLASSIFICATION OPERATIONS ==========
 
@@ -468,16 +1003,11 @@ class ArtifactDatabase:
         """Store a classification result."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO classifications
-                (artifact_id, class_id, class_name, confidence, classification_date, validated, validator_notes)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            cursor.execute(_SQL_INSERT_CLASSIFICATION, (
                 artifact_id,
                 class_id,
                 class_name,
                 confidence,
-                datetime.now().isoformat(),
                 1 if validated else 0,
                 notes
             ))
@@ -487,7 +1017,9 @@ class ArtifactDatabase:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT * FROM classifications
+                SELECT id, artifact_id, class_id, class_name, confidence, classification_date,
+                       validated, validator_notes
+                FROM classifications
                 WHERE artifact_id = ?
                 ORDER BY classification_date DESC
             ''', (artifact_id,))
@@ -509,7 +1041,9 @@ class ArtifactDatabase:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT * FROM classifications
+                SELECT id, artifact_id, class_id, class_name, confidence, classification_date,
+                       validated, validator_notes
+                FROM classifications
                 WHERE validated = 1
                 ORDER BY classification_date DESC
             ''')
@@ -526,13 +1060,12 @@ class ArtifactDatabase:
             cursor.execute('''
                 INSERT INTO training_data
                 (artifact_id, class_label, features_json, validation_score, added_date, is_validated)
-                VALUES (?, ?, ?, ?, ?, 1)
+                VALUES (?, ?, ?, ?, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'), 1)
             ''', (
                 artifact_id,
                 class_label,
-                json.dumps(features),
-                validation_score,
-                datetime.now().isoformat()
+                _pack(features),
+                validation_score
             ))
 
     def get_training_data(self, class_label: str = None) -> List[Dict]:
@@ -542,13 +1075,17 @@ class ArtifactDatabase:
 
             if class_label:
                 cursor.execute('''
-                    SELECT * FROM training_data
+                    SELECT id, artifact_id, class_label, features_json, validation_score, added_date,
+                           is_validated
+                    FROM training_data
                     WHERE class_label = ? AND is_validated = 1
                     ORDER BY added_date DESC
                 ''', (class_label,))
             else:
                 cursor.execute('''
-                    SELECT * FROM training_data
+                    SELECT id, artifact_id, class_label, features_json, validation_score, added_date,
+                           is_validated
+                    FROM training_data
                     WHERE is_validated = 1
                     ORDER BY added_date DESC
                 ''')
@@ -556,12 +1093,59 @@ class ArtifactDatabase:
             results = []
             for row in cursor.fetchall():
                 data = dict(row)
-                data['features'] = json.loads(data['features_json'])
+                data['features'] = _unpack(data['features_json'])
                 del data['features_json']
                 results.append(data)
 
             return results
 
+    def get_training_matrix(self, class_label: str = None) -> Tuple[np.ndarray, np.ndarray,
+                                                                     List[str], List[str]]:
+        """Retrieve validated training data as a dense feature matrix for ML.
+
+        Uses the same layout as MLArtifactClassifier._prepare_data: columns are the
+        sorted union of numeric feature names and missing values are 0.0.
+
+        Returns:
+            Tuple of (X float32 array of shape (n_samples, n_features),
+            y array of class labels, artifact_ids, feature_names)
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+
+            if class_label:
+                cursor.execute('''
+                    SELECT artifact_id, class_label, features_json FROM training_data
+                    WHERE class_label = ? AND is_validated = 1
+                    ORDER BY added_date DESC
+                ''', (class_label,))
+            else:
+                cursor.execute('''
+                    SELECT artifact_id, class_label, features_json FROM training_data
+                    WHERE is_validated = 1
+                    ORDER BY added_date DESC
+                ''')
+            rows = cursor.fetchall()
+
+        artifact_ids = [row[0] for row in rows]
+        labels = [row[1] for row in rows]
+        samples = [_unpack(row[2]) for row in rows]
+
+        feature_names = sorted({
+            name for features in samples
+            for name, value in features.items() if isinstance(value, (int, float))
+        })
+        column = {name: j for j, name in enumerate(feature_names)}
+
+        X = np.zeros((len(samples), len(feature_names)), dtype=np.float32)
+        for i, features in enumerate(samples):
+            for name, value in features.items():
+                j = column.get(name)
+                if j is not None and isinstance(value, (int, float)):
+                    X[i, j] = value
+
+        return X, np.array(labels, dtype=object), artifact_ids, feature_names
+
     def get_training_statistics(self) -> Dict:
         """Get statistics about training data."""
         with self.get_connection() as conn:
@@ -577,9 +1161,8 @@ class ArtifactDatabase:
 
             class_counts = {row['class_label']: row['count'] for row in cursor.fetchall()}
 
-            # Total count
-            cursor.execute('SELECT COUNT(*) as total FROM training_data WHERE is_validated = 1')
-            total = cursor.fetchone()['total']
+            # Every validated row falls into exactly one group
+            total = sum(class_counts.values())
 
             return {
                 'total_samples': total,
@@ -590,38 +1173,42 @@ class ArtifactDatabase:
     # ========== ANALYSIS OPERATIONS ==========
 
     def save_analysis_result(self, analysis_type: str, artifact_ids: List[str], results: Dict):
-        """Save analysis results (PCA, clustering, etc.)."""
+        """Save analysis results (PCA, clustering, etc.) on the background writer."""
+        # Serialize now so later mutation of `results` by the caller can't leak in
+        self._writer.submit(self._insert_analysis_result, analysis_type,
+                            json.dumps(artifact_ids), _json_dumps(results))
+
+    def _insert_analysis_result(self, analysis_type: str, artifact_ids_json: str,
+                                results_json: str):
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO analysis_results
                 (analysis_type, artifact_ids, results_json, analysis_date)
-                VALUES (?, ?, ?, ?)
-            ''', (
-                analysis_type,
-                json.dumps(artifact_ids),
-                json.dumps(results),
-                datetime.now().isoformat()
-            ))
+                VALUES (?, ?, ?, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'))
+            ''', (analysis_type, artifact_ids_json, results_json))
 
         # Trigger periodic backup (non-blocking, in background thread)
         _trigger_periodic_backup()
 
     def get_analysis_results(self, analysis_type: str = None, limit: int = 10) -> List[Dict]:
         """Retrieve analysis results."""
+        self.flush_writes()
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
             if analysis_type:
                 cursor.execute('''
-                    SELECT * FROM analysis_results
+                    SELECT id, analysis_type, artifact_ids, results_json, analysis_date
+                    FROM analysis_results
                     WHERE analysis_type = ?
                     ORDER BY analysis_date DESC
                     LIMIT ?
                 ''', (analysis_type, limit))
             else:
                 cursor.execute('''
-                    SELECT * FROM analysis_results
+                    SELECT id, analysis_type, artifact_ids, results_json, analysis_date
+                    FROM analysis_results
                     ORDER BY analysis_date DESC
                     LIMIT ?
                 ''', (limit,))
@@ -630,7 +1217,7 @@ class ArtifactDatabase:
             for row in cursor.fetchall():
                 data = dict(row)
                 data['artifact_ids'] = json.loads(data['artifact_ids'])
-                data['results'] = json.loads(data['results_json'])
+                data['results'] = _json_loads(data['results_json'])
                 del data['results_json']
                 results.append(data)
 
@@ -664,13 +1251,12 @@ class ArtifactDatabase:
             cursor.execute('''
                 INSERT OR REPLACE INTO ai_cache
                 (artifact_id, cache_type, content_json, model_used, created_date)
-                VALUES (?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'))
             ''', (
                 artifact_id,
                 cache_type,
                 json.dumps(content),
-                model,
-                datetime.now().isoformat()
+                model
             ))
 
         # Trigger periodic backup (non-blocking, in background thread)
@@ -694,54 +1280,72 @@ class ArtifactDatabase:
 
     def save_comparison(self, artifact1_id: str, artifact2_id: str,
                        similarity_score: float, comparison_data: Dict):
-        """Save a comparison result."""
+        """Save a comparison result on the background writer (replaces any earlier one)."""
+        # Pairs are unordered; store them as (min, max) so lookups are a single seek
+        if artifact2_id < artifact1_id:
+            artifact1_id, artifact2_id = artifact2_id, artifact1_id
+        self._writer.submit(self._insert_comparison, artifact1_id, artifact2_id,
+                            similarity_score, _pack(comparison_data))
+
+    def _insert_comparison(self, artifact1_id: str, artifact2_id: str,
+                           similarity_score: float, comparison_data):
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO comparisons
-                (artifact1_id, artifact2_id, similarity_score, comparison_data, comparison_date)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
+            cursor.execute(_SQL_UPSERT_COMPARISON, (
                 artifact1_id,
                 artifact2_id,
                 similarity_score,
-                json.dumps(comparison_data),
-                datetime.now().isoformat()
+                comparison_data
             ))
 
     def get_comparison(self, artifact1_id: str, artifact2_id: str) -> Optional[Dict]:
         """Retrieve cached comparison result."""
+        self.flush_writes()
+        if artifact2_id < artifact1_id:
+            artifact1_id, artifact2_id = artifact2_id, artifact1_id
+        key = ('comparison', artifact1_id, artifact2_id)
+        cached = self._read_cache.get(key)
+        if cached is not _ReadCache._MISS:
+            return cached
+        version = self._read_cache.version
+
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT * FROM comparisons
-                WHERE (artifact1_id = ? AND artifact2_id = ?)
-                   OR (artifact1_id = ? AND artifact2_id = ?)
-                ORDER BY comparison_date DESC
-                LIMIT 1
-            ''', (artifact1_id, artifact2_id, artifact2_id, artifact1_id))
+                SELECT id, artifact1_id, artifact2_id, similarity_score, comparison_data,
+                       comparison_date
+                FROM comparisons
+                WHERE artifact1_id = ? AND artifact2_id = ?
+            ''', (artifact1_id, artifact2_id))
 
             row = cursor.fetchone()
+            result = None
             if row:
-                data = dict(row)
-                data['comparison_data'] = json.loads(data['comparison_data'])
-                return data
-            return None
+                result = dict(row)
+                result['comparison_data'] = _unpack(result['comparison_data'])
+
+        self._read_cache.put(key, result, version)
+        return result
 
     def get_all_comparisons(self, artifact_id: str = None, limit: int = 100) -> List[Dict]:
         """Get all comparisons, optionally filtered by artifact."""
+        self.flush_writes()
         with self.get_connection() as conn:
             cursor = conn.cursor()
             if artifact_id:
                 cursor.execute('''
-                    SELECT * FROM comparisons
+                    SELECT id, artifact1_id, artifact2_id, similarity_score, comparison_data,
+                           comparison_date
+                    FROM comparisons
                     WHERE artifact1_id = ? OR artifact2_id = ?
                     ORDER BY comparison_date DESC
                     LIMIT ?
                 ''', (artifact_id, artifact_id, limit))
             else:
                 cursor.execute('''
-                    SELECT * FROM comparisons
+                    SELECT id, artifact1_id, artifact2_id, similarity_score, comparison_data,
+                           comparison_date
+                    FROM comparisons
                     ORDER BY comparison_date DESC
                     LIMIT ?
                 ''', (limit,))
@@ -750,7 +1354,7 @@ class ArtifactDatabase:
             for row in cursor.fetchall():
                 data = dict(row)
                 try:
-                    data['comparison_data'] = json.loads(data['comparison_data'])
+                    data['comparison_data'] = _unpack(data['comparison_data'])
                 except:
                     pass
                 results.append(data)
@@ -761,7 +1365,10 @@ class ArtifactDatabase:
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
-            query = 'SELECT * FROM ai_cache WHERE 1=1'
+            query = '''
+                SELECT id, artifact_id, cache_type, content_json, model_used, created_date
+                FROM ai_cache WHERE 1=1
+            '''
             params = []
 
             if artifact_id:
@@ -787,6 +1394,7 @@ class ArtifactDatabase:
 
     def get_cache_statistics(self) -> Dict:
         """Get statistics about all cached data for monitoring."""
+        self.flush_writes()
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
@@ -846,7 +1454,7 @@ class ArtifactDatabase:
             cursor.execute('''
                 INSERT INTO analysis_results
                 (analysis_type, artifact_ids, results_json, analysis_date)
-                VALUES (?, ?, ?, ?)
+                VALUES (?, ?, ?, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'))
             ''', (
                 'similarity_search',
                 json.dumps([query_id] + result_ids),
@@ -854,8 +1462,7 @@ class ArtifactDatabase:
                     'query_id': query_id,
                     'params': search_params or {},
                     'results': results
-                }),
-                datetime.now().isoformat()
+                })
             ))
             return cursor.lastrowid
 
@@ -864,7 +1471,8 @@ class ArtifactDatabase:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT * FROM analysis_results
+                SELECT id, analysis_type, artifact_ids, results_json, analysis_date
+                FROM analysis_results
                 WHERE analysis_type = 'similarity_search'
                 AND artifact_ids LIKE ?
                 ORDER BY analysis_date DESC
@@ -897,8 +1505,8 @@ class ArtifactDatabase:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO projects (project_id, project_name, description, owner_id, created_date, status)
-                VALUES (?, ?, ?, ?, ?, 'active')
-            ''', (project_id, name, description, owner_id, datetime.now().isoformat()))
+                VALUES (?, ?, ?, ?, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'), 'active')
+            ''', (project_id, name, description, owner_id))
 
         # Trigger SYNCHRONOUS backup to preserve project data
         _trigger_critical_backup(f"project created: {project_id}")
@@ -915,7 +1523,10 @@ class ArtifactDatabase:
         """Get project information."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM projects WHERE project_id = ?', (project_id,))
+            cursor.execute('''
+                SELECT project_id, project_name, description, owner_id, created_date, status
+                FROM projects WHERE project_id = ?
+            ''', (project_id,))
             row = cursor.fetchone()
             if row:
                 return dict(row)
@@ -927,10 +1538,14 @@ class ArtifactDatabase:
             cursor = conn.cursor()
             if status:
                 cursor.execute('''
-                    SELECT * FROM projects WHERE status = ? ORDER BY created_date DESC
+                    SELECT project_id, project_name, description, owner_id, created_date, status
+                    FROM projects WHERE status = ? ORDER BY created_date DESC
                 ''', (status,))
             else:
-                cursor.execute('SELECT * FROM projects ORDER BY created_date DESC')
+                cursor.execute('''
+                    SELECT project_id, project_name, description, owner_id, created_date, status
+                    FROM projects ORDER BY created_date DESC
+                ''')
 
             return [dict(row) for row in cursor.fetchall()]
 
@@ -947,7 +1562,9 @@ class ArtifactDatabase:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT * FROM artifacts WHERE project_id = ? ORDER BY upload_date DESC
+                SELECT artifact_id, project_id, mesh_path, upload_date, n_vertices, n_faces,
+                       is_watertight, metadata
+                FROM artifacts WHERE project_id = ? ORDER BY upload_date DESC
             ''', (project_id,))
 
             return [dict(row) for row in cursor.fetchall()]
@@ -971,8 +1588,8 @@ class ArtifactDatabase:
             if not cursor.fetchone():
                 cursor.execute('''
                     INSERT INTO projects (project_id, project_name, description, created_date, status)
-                    VALUES (?, ?, ?, ?, 'active')
-                ''', (target_project_id, target_name, target_description, datetime.now().isoformat()))
+                    VALUES (?, ?, ?, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'), 'active')
+                ''', (target_project_id, target_name, target_description))
 
             # Move all artifacts from source projects to target
             for source_id in source_project_ids:
@@ -986,86 +1603,100 @@ class ArtifactDatabase:
                     UPDATE projects SET status = 'merged' WHERE project_id = ?
                 ''', (source_id,))
 
-            conn.commit()
-
     def get_project_statistics(self, project_id: str) -> Dict:
         """Get statistics for a specific project."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
-            stats = {'project_id': project_id}
-
-            # Artifact count
-            cursor.execute('''
-                SELECT COUNT(*) as count FROM artifacts WHERE project_id = ?
-            ''', (project_id,))
-            stats['total_artifacts'] = cursor.fetchone()['count']
-
-            # Classifications count
+            # One statement: artifact count plus a single pass over the project's classifications
             cursor.execute('''
-                SELECT COUNT(*) as count FROM classifications c
+                SELECT
+                    (SELECT COUNT(*) FROM artifacts WHERE project_id = ?) as total_artifacts,
+                    COUNT(c.id) as total_classifications,
+                    COALESCE(SUM(c.validated = 1), 0) as validated_classifications
+                FROM classifications c
                 JOIN artifacts a ON c.artifact_id = a.artifact_id
                 WHERE a.project_id = ?
-            ''', (project_id,))
-            stats['total_classifications'] = cursor.fetchone()['count']
-
-            # Validated classifications
-            cursor.execute('''
-                SELECT COUNT(*) as count FROM classifications c
-                JOIN artifacts a ON c.artifact_id = a.artifact_id
-                WHERE a.project_id = ? AND c.validated = 1
-            ''', (project_id,))
-            stats['validated_classifications'] = cursor.fetchone()['count']
+            ''', (project_id, project_id))
+            row = cursor.fetchone()
 
-            return stats
+            return {
+                'project_id': project_id,
+                'total_artifacts': row['total_artifacts'],
+                'total_classifications': row['total_classifications'],
+                'validated_classifications': row['validated_classifications']
+            }
 
     # ========== UTILITY OPERATIONS ==========
 
     def get_statistics(self) -> Dict:
         """Get overall database statistics."""
+        self.flush_writes()
         with self.get_connection() as conn:
             cursor = conn.cursor()
-
-            stats = {}
-
-            # Artifact count
-            cursor.execute('SELECT COUNT(*) as count FROM artifacts')
-            stats['total_artifacts'] = cursor.fetchone()['count']
-
-            # Classification count
-            cursor.execute('SELECT COUNT(*) as count FROM classifications')
-            stats['total_classifications'] = cursor.fetchone()['count']
-
-            # Validated classifications
-            cursor.execute('SELECT COUNT(*) as count FROM classifications WHERE validated = 1')
-            stats['validated_classifications'] = cursor.fetchone()['count']
-
-            # Training samples
-            cursor.execute('SELECT COUNT(*) as count FROM training_data WHERE is_validated = 1')
-            stats['training_samples'] = cursor.fetchone()['count']
-
-            # Analysis results
-            cursor.execute('SELECT COUNT(*) as count FROM analysis_results')
-            stats['analysis_results'] = cursor.fetchone()['count']
-
-            # Comparisons
-            cursor.execute('SELECT COUNT(*) as count FROM comparisons')
-            stats['comparisons'] = cursor.fetchone()['count']
-
-            return stats
+            cursor.execute(_SQL_STATISTICS)
+            return dict(cursor.fetchone())
 
     def export_data(self, output_path: str):
-        """Export entire database to JSON."""
-        data = {
-            'artifacts': self.get_all_artifacts(),
-            'features': self.get_all_features(),
-            'validated_classifications': self.get_validated_classifications(),
-            'training_data': self.get_training_data(),
-            'statistics': self.get_statistics()
-        }
+        """Export entire database to JSON.
 
-        with open(output_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        Rows are streamed to the file one at a time inside a single read
+        transaction, so memory use doesn't grow with the size of the database.
+        """
+        self.flush_writes()
+        with self.get_connection() as conn, open(output_path, 'w') as f:
+            f.write('{\n"artifacts": ')
+            _write_json_array(f, (dict(row) for row in conn.execute('''
+                SELECT artifact_id, project_id, mesh_path, upload_date, n_vertices, n_faces,
+                       is_watertight, metadata
+                FROM artifacts ORDER BY upload_date DESC
+            ''')))
+
+            # Both tables are read in artifact order (merged from their unique indexes),
+            # so only one artifact's features are held at a time
+            f.write(',\n"features": {')
+            rows = conn.execute('''
+                SELECT artifact_id, feature_name, feature_value, 0 FROM features
+                UNION ALL
+                SELECT artifact_id, feature_category, features_json, 1 FROM stylistic_features
+                ORDER BY 1
+            ''')
+            for i, (artifact_id, group) in enumerate(groupby(rows, key=lambda row: row[0])):
+                features = {name: _unpack(value) if is_stylistic else value
+                            for _, name, value, is_stylistic in group}
+                f.write(',\n  ' if i else '\n  ')
+                f.write(f'{json.dumps(artifact_id)}: {json.dumps(features)}')
+            f.write('\n}')
+
+            f.write(',\n"validated_classifications": ')
+            _write_json_array(f, (dict(row) for row in conn.execute('''
+                SELECT id, artifact_id, class_id, class_name, confidence, classification_date,
+                       validated, validator_notes
+                FROM classifications
+                WHERE validated = 1
+                ORDER BY classification_date DESC
+            ''')))
+
+            f.write(',\n"training_data": ')
+            _write_json_array(f, ({
+                'id': row['id'],
+                'artifact_id': row['artifact_id'],
+                'class_label': row['class_label'],
+                'validation_score': row['validation_score'],
+                'added_date': row['added_date'],
+                'is_validated': row['is_validated'],
+                'features': _unpack(row['features_json'])
+            } for row in conn.execute('''
+                SELECT id, artifact_id, class_label, features_json, validation_score, added_date,
+                       is_validated
+                FROM training_data
+                WHERE is_validated = 1
+                ORDER BY added_date DESC
+            ''')))
+
+            f.write(',\n"statistics": ')
+            f.write(json.dumps(dict(conn.execute(_SQL_STATISTICS).fetchone())))
+            f.write('\n}\n')
 
         return output_path
 
@@ -1092,51 +1723,88 @@ class ArtifactDatabase:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO users (username, email, password_hash, role, full_name, created_date, is_active)
-                VALUES (?, ?, ?, ?, ?, ?, 1)
-            ''', (username, email, password_hash, role, full_name, datetime.now().isoformat()))
+                VALUES (?, ?, ?, ?, ?, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'), 1)
+            ''', (username, email, password_hash, role, full_name))
             return cursor.lastrowid
 
-    def get_user_by_username(self, username: str) -> Optional[Dict]:
-        """Get user by username."""
-        with self.get_connection() as conn:
+    def get_user_by_username(self, username: str, with_hash: bool = False) -> Optional[Dict]:
+        """Get active user by username (password_hash only included if with_hash)."""
+        key = ('user_by_username', username, with_hash)
+        cached = self._read_cache.get(key)
+        if cached is not _ReadCache._MISS:
+            return cached
+        version = self._read_cache.version
+
+        columns = _USER_COLUMNS + (', password_hash' if with_hash else '')
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM users WHERE username = ? AND is_active = 1', (username,))
+            cursor.execute(f'''
+                SELECT {columns}
+                FROM users WHERE username = ? AND is_active = 1
+            ''', (username,))
             row = cursor.fetchone()
-            if row:
-                return dict(row)
-            return None
+            result = dict(row) if row else None
 
-    def get_user_by_email(self, email: str) -> Optional[Dict]:
-        """Get user by email."""
-        with self.get_connection() as conn:
+        self._read_cache.put(key, result, version)
+        return result
+
+    def get_user_by_email(self, email: str, with_hash: bool = False) -> Optional[Dict]:
+        """Get active user by email (password_hash only included if with_hash)."""
+        columns = _USER_COLUMNS + (', password_hash' if with_hash else '')
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM users WHERE email = ? AND is_active = 1', (email,))
+            cursor.execute(f'''
+                SELECT {columns}
+                FROM users WHERE email = ? AND is_active = 1
+            ''', (email,))
             row = cursor.fetchone()
             if row:
                 return dict(row)
             return None
 
-    def get_user_by_id(self, user_id: int) -> Optional[Dict]:
-        """Get user by ID."""
-        with self.get_connection() as conn:
+    def get_user_by_id(self, user_id: int, with_hash: bool = False) -> Optional[Dict]:
+        """Get user by ID (password_hash only included if with_hash)."""
+        key = ('user_by_id', user_id, with_hash)
+        cached = self._read_cache.get(key)
+        if cached is not _ReadCache._MISS:
+            return cached
+        version = self._read_cache.version
+
+        columns = _USER_COLUMNS + (', password_hash' if with_hash else '')
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM users WHERE user_id = ?', (user_id,))
+            cursor.execute(f'''
+                SELECT {columns}
+                FROM users WHERE user_id = ?
+            ''', (user_id,))
             row = cursor.fetchone()
-            if row:
-                return dict(row)
-            return None
+            result = dict(row) if row else None
+
+        self._read_cache.put(key, result, version)
+        return result
+
+    def get_password_hash(self, username: str) -> Optional[str]:
+        """Get an active user's password hash, for authentication only."""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT password_hash FROM users WHERE username = ? AND is_active = 1',
+                (username,)
+            )
+            row = cursor.fetchone()
+            return row[0] if row else None
 
     def update_last_login(self, user_id: int):
         """Update user's last login timestamp."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                UPDATE users SET last_login = ? WHERE user_id = ?
-            ''', (datetime.now().isoformat(), user_id))
+                UPDATE users SET last_login = strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime') WHERE user_id = ?
+            ''', (user_id,))
 
     def get_all_users(self) -> List[Dict]:
         """Get all active users (exclude password hashes)."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT user_id, username, email, role, full_name, created_date, last_login
@@ -1205,7 +1873,7 @@ class ArtifactDatabase:
 
     def get_all_users_including_inactive(self) -> List[Dict]:
         """Get all users including inactive ones (admin only)."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT user_id, username, email, role, full_name, created_date, last_login, is_active
@@ -1223,8 +1891,8 @@ class ArtifactDatabase:
             try:
                 cursor.execute('''
                     INSERT INTO project_collaborators (project_id, user_id, role, invited_date)
-                    VALUES (?, ?, ?, ?)
-                ''', (project_id, user_id, role, datetime.now().isoformat()))
+                    VALUES (?, ?, ?, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'))
+                ''', (project_id, user_id, role))
             except sqlite3.IntegrityError:
                 # User already a collaborator
                 raise ValueError(f"User {user_id} is already a collaborator on project {project_id}")
@@ -1232,6 +1900,29 @@ class ArtifactDatabase:
         # Trigger SYNCHRONOUS backup to preserve collaborator associations
         _trigger_critical_backup(f"collaborator added: user {user_id} to project {project_id}")
 
+    def add_collaborators(self, project_id: str, entries: List[Tuple[int, str]]) -> int:
+        """
+        Add several collaborators to a project in one transaction.
+
+        Args:
+            project_id: Project ID
+            entries: (user_id, role) pairs; existing collaborators are skipped
+
+        Returns:
+            Number of collaborators added
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT OR IGNORE INTO project_collaborators (project_id, user_id, role, invited_date)
+                VALUES (?, ?, ?, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'))
+            ''', [(project_id, user_id, role) for user_id, role in entries])
+            added = cursor.rowcount
+
+        if added:
+            _trigger_critical_backup(f"{added} collaborators added to project {project_id}")
+        return added
+
     def remove_collaborator(self, project_id: str, user_id: int):
         """Remove a collaborator from a project."""
         with self.get_connection() as conn:
@@ -1246,10 +1937,11 @@ class ArtifactDatabase:
 
     def get_project_collaborators(self, project_id: str) -> List[Dict]:
         """Get all collaborators for a project."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT pc.*, u.username, u.email, u.full_name
+                SELECT pc.id, pc.project_id, pc.user_id, pc.role, pc.invited_date,
+                       u.username, u.email, u.full_name
                 FROM project_collaborators pc
                 JOIN users u ON pc.user_id = u.user_id
                 WHERE pc.project_id = ? AND u.is_active = 1
@@ -1259,52 +1951,81 @@ class ArtifactDatabase:
 
     def get_user_projects(self, user_id: int) -> List[Dict]:
         """Get all projects where user is owner or collaborator."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
 
-            # Get owned projects
+            # Owned projects first, then collaborated ones
             cursor.execute('''
-                SELECT p.*, 'owner' as user_role
+                SELECT p.project_id, p.project_name, p.description, p.owner_id, p.created_date,
+                       p.status, 'owner' as user_role
                 FROM projects p
                 WHERE p.owner_id = ? AND p.status = 'active'
-            ''', (user_id,))
-            owned = [dict(row) for row in cursor.fetchall()]
-
-            # Get collaborated projects
-            cursor.execute('''
-                SELECT p.*, pc.role as user_role
+                UNION ALL
+                SELECT p.project_id, p.project_name, p.description, p.owner_id, p.created_date,
+                       p.status, pc.role as user_role
                 FROM projects p
                 JOIN project_collaborators pc ON p.project_id = pc.project_id
                 WHERE pc.user_id = ? AND p.status = 'active'
-            ''', (user_id,))
-            collaborated = [dict(row) for row in cursor.fetchall()]
-
-            return owned + collaborated
+            ''', (user_id, user_id))
+            return [dict(row) for row in cursor.fetchall()]
 
     def is_project_owner(self, project_id: str, user_id: int) -> bool:
         """Check if user is the owner of a project."""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT owner_id FROM projects WHERE project_id = ?
-            ''', (project_id,))
-            row = cursor.fetchone()
-            return row and row['owner_id'] == user_id
+        key = ('project_owner', project_id)
+        owner_id = self._read_cache.get(key)
+        if owner_id is _ReadCache._MISS:
+            version = self._read_cache.version
+            with self.get_read_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT owner_id FROM projects WHERE project_id = ?
+                ''', (project_id,))
+                row = cursor.fetchone()
+                owner_id = row['owner_id'] if row else None
+            self._read_cache.put(key, owner_id, version)
+
+        return owner_id is not None and owner_id == user_id
 
     def is_project_collaborator(self, project_id: str, user_id: int) -> bool:
         """Check if user is a collaborator on a project."""
-        with self.get_connection() as conn:
+        key = ('project_collaborator', project_id, user_id)
+        cached = self._read_cache.get(key)
+        if cached is not _ReadCache._MISS:
+            return cached
+        version = self._read_cache.version
+
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT id FROM project_collaborators
                 WHERE project_id = ? AND user_id = ?
             ''', (project_id, user_id))
-            return cursor.fetchone() is not None
+            result = cursor.fetchone() is not None
+
+        self._read_cache.put(key, result, version)
+        return result
 
     def can_access_project(self, project_id: str, user_id: int) -> bool:
         """Check if user can access a project (owner or collaborator)."""
-        return self.is_project_owner(project_id, user_id) or \
-               self.is_project_collaborator(project_id, user_id)
+        key = ('project_access', project_id, user_id)
+        cached = self._read_cache.get(key)
+        if cached is not _ReadCache._MISS:
+            return cached
+        version = self._read_cache.version
+
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT EXISTS (
+                    SELECT 1 FROM projects WHERE project_id = ? AND owner_id = ?
+                    UNION ALL
+                    SELECT 1 FROM project_collaborators WHERE project_id = ? AND user_id = ?
+                )
+            ''', (project_id, user_id, project_id, user_id))
+            result = bool(cursor.fetchone()[0])
+
+        self._read_cache.put(key, result, version)
+        return result
 
 
 # Global database instance
@@ -1383,15 +2104,21 @@ def get_database() -> ArtifactDatabase:
 def backup_database_to_storage(db_path: str = None, update_latest: bool = True) -> dict:
     """Backup database to configured storage (Google Drive or local).
 
+    Uploads are skipped when the database content is identical to the last
+    successful backup to the same storage backend.
+
     Args:
         db_path: Path to database file (default: from environment)
         update_latest: If True, also update 'latest.db' for reliable restore
 
     Returns:
         dict with backup info: {'status': 'success', 'backup_path': '...', 'timestamp': '...'}
+        or {'status': 'skipped', 'reason': 'unchanged'}
     """
     import os
     import shutil
+    import hashlib
+    import tempfile
     from datetime import datetime
     from acs.core.storage import get_default_storage
     import logging
@@ -1420,20 +2147,50 @@ def backup_database_to_storage(db_path: str = None, update_latest: bool = True)
         backup_filename = f"acs_artifacts_backup_{timestamp}.db"
         remote_path = f"backups/database/{backup_filename}"
 
-        # Upload timestamped backup
-        logger.info(f"[Backup] Uploading timestamped backup: {remote_path}")
-        storage_id = storage.upload_file(db_path, remote_path)
-        logger.info(f"[Backup] ✅ Timestamped backup successful: {backup_filename}")
-
-        # Also upload as 'latest.db' for reliable restore
-        if update_latest:
-            latest_path = "backups/database/latest.db"
+        # Take a consistent, compacted snapshot (including pages still in the WAL, minus
+        # free pages) with VACUUM INTO rather than uploading the live file, which may be
+        # mid-write. VACUUM INTO refuses to overwrite, so write into a fresh directory.
+        snapshot_dir = tempfile.mkdtemp()
+        snapshot_path = os.path.join(snapshot_dir, 'snapshot.db')
+        try:
+            src = sqlite3.connect(db_path)
             try:
-                logger.info(f"[Backup] Updating latest.db...")
-                storage.upload_file(db_path, latest_path)
-                logger.info(f"[Backup] ✅ latest.db updated")
-            except Exception as e:
-                logger.warning(f"[Backup] Failed to update latest.db: {e}")
+                src.execute('VACUUM INTO ?', (snapshot_path,))
+            finally:
+                src.close()
+
+            # Snapshots of unchanged data are byte-identical; don't re-upload them
+            sha256 = hashlib.sha256()
+            with open(snapshot_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    sha256.update(chunk)
+            fingerprint = f"{os.getenv('STORAGE_BACKEND', 'local')} {sha256.hexdigest()}"
+            hash_path = f"{db_path}.last_backup.sha256"
+            if os.path.exists(hash_path):
+                with open(hash_path) as f:
+                    if f.read().strip() == fingerprint:
+                        logger.info("[Backup] Database unchanged since last backup, skipping upload")
+                        return {'status': 'skipped', 'reason': 'unchanged'}
+
+            # Upload timestamped backup
+            logger.info(f"[Backup] Uploading timestamped backup: {remote_path}")
+            storage_id = storage.upload_file(snapshot_path, remote_path)
+            logger.info(f"[Backup] ✅ Timestamped backup successful: {backup_filename}")
+
+            # Also upload as 'latest.db' for reliable restore
+            if update_latest:
+                latest_path = "backups/database/latest.db"
+                try:
+                    logger.info(f"[Backup] Updating latest.db...")
+                    storage.upload_file(snapshot_path, latest_path)
+                    logger.info(f"[Backup] ✅ latest.db updated")
+                except Exception as e:
+                    logger.warning(f"[Backup] Failed to update latest.db: {e}")
+
+            with open(hash_path, 'w') as f:
+                f.write(fingerprint)
+        finally:
+            shutil.rmtree(snapshot_dir, ignore_errors=True)
 
         return {
             'status': 'success',
@@ -1463,8 +2220,8 @@ def restore_database_from_storage(db_path: str = None) -> dict:
     Returns:
         dict with restore info: {'status': 'success'/'skipped'/'error', ...}
     """
+    global _connection_generation
     import os
-    import shutil
     import tempfile
     from datetime import datetime
     from acs.core.storage import get_default_storage, LocalStorage
@@ -1488,11 +2245,9 @@ def restore_database_from_storage(db_path: str = None) -> dict:
         local_user_count = 0
         if os.path.exists(db_path):
             try:
-                import sqlite3
                 conn = sqlite3.connect(db_path)
                 cursor = conn.cursor()
-                cursor.execute('SELECT COUNT(*) FROM artifacts')
-                local_artifact_count = cursor.fetchone()[0]
+                local_artifact_count = _artifact_count(cursor)
                 # Also check for users (excluding default admin)
                 try:
                     cursor.execute("SELECT COUNT(*) FROM users WHERE username != 'admin'")
@@ -1524,69 +2279,76 @@ def restore_database_from_storage(db_path: str = None) -> dict:
             logger.info("Using local storage, no cloud backup to restore from")
             return {'status': 'skipped', 'reason': 'local_storage'}
 
-        # First try to restore from 'latest.db' (most reliable)
-        logger.info("[Restore] Looking for latest.db in cloud storage...")
-        latest_path = "backups/database/latest.db"
-        use_latest = False
+        # Ensure target directory exists
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
 
-        try:
-            # Try to check if latest.db exists
-            backups = storage.list_files('backups/database')
-            latest_exists = any(b['name'] == 'latest.db' for b in backups)
-            if latest_exists:
-                logger.info("[Restore] Found latest.db - will use it for restore")
-                use_latest = True
-        except Exception as e:
-            logger.warning(f"[Restore] Could not check for latest.db: {e}")
-
-        if not use_latest:
-            # Fall back to timestamped backups
-            logger.info("[Restore] latest.db not found, looking for timestamped backups...")
-            try:
-                if not backups:
-                    backups = storage.list_files('backups/database')
-            except Exception as e:
-                logger.warning(f"Could not list backups: {e}")
-                return {'status': 'skipped', 'reason': 'no_backups_found', 'error': str(e)}
-
-            if not backups:
-                logger.info("No backups found in cloud storage")
-                return {'status': 'skipped', 'reason': 'no_backups'}
-
-            # Sort by name (timestamp) to get most recent, excluding latest.db
-            db_backups = [b for b in backups if b['name'].endswith('.db') and b['name'] != 'latest.db']
-            if not db_backups:
-                logger.info("No database backups found")
-                return {'status': 'skipped', 'reason': 'no_db_backups'}
-
-            db_backups.sort(key=lambda x: x['name'], reverse=True)
-            latest_backup = db_backups[0]
-            logger.info(f"[Restore] Found latest timestamped backup: {latest_backup['name']}")
-
-        # Download to temp file first
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.db') as tmp:
+        # Download to a temp file next to the database, so the final move is an atomic
+        # rename rather than a cross-filesystem copy
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.db',
+                                         dir=os.path.dirname(db_path) or '.') as tmp:
             tmp_path = tmp.name
 
         try:
-            if use_latest:
-                remote_path = latest_path
-                backup_name = 'latest.db'
-            else:
-                remote_path = f"backups/database/{latest_backup['name']}"
-                backup_name = latest_backup['name']
-
-            logger.info(f"[Restore] Downloading {backup_name}...")
-            storage.download_file(remote_path, tmp_path)
-
-            # Verify downloaded file
-            if os.path.getsize(tmp_path) < 1000:
-                raise ValueError("Downloaded backup file is too small, may be corrupted")
-
-            # Ensure target directory exists
-            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            # latest.db is refreshed by every backup, so fetch it directly; listing the
+            # (ever-growing) backup folder is only needed when it's missing
+            latest_path = "backups/database/latest.db"
+            backup_name = 'latest.db'
+            try:
+                logger.info("[Restore] Downloading latest.db...")
+                storage.download_file(latest_path, tmp_path)
+            except Exception as e:
+                # Fall back to timestamped backups
+                logger.info(f"[Restore] latest.db not available ({e}), looking for timestamped backups...")
+                try:
+                    backups = storage.list_files('backups/database')
+                except Exception as e:
+                    logger.warning(f"Could not list backups: {e}")
+                    return {'status': 'skipped', 'reason': 'no_backups_found', 'error': str(e)}
 
-            # Move temp file to target location
-            shutil.move(tmp_path, db_path)
+                if not backups:
+                    logger.info("No backups found in cloud storage")
+                    return {'status': 'skipped', 'reason': 'no_backups'}
+
+                # Names embed the timestamp, so the newest backup is the largest name
+                db_backups = [b['name'] for b in backups
+                              if b['name'].endswith('.db') and b['name'] != 'latest.db']
+                if not db_backups:
+                    logger.info("No database backups found")
+                    return {'status': 'skipped', 'reason': 'no_db_backups'}
+
+                backup_name = max(db_backups)
+                logger.info(f"[Restore] Found latest timestamped backup: {backup_name}")
+                logger.info(f"[Restore] Downloading {backup_name}...")
+                storage.download_file(f"backups/database/{backup_name}", tmp_path)
+
+            # Verify downloaded file is an intact ACS database before replacing anything
+            check = sqlite3.connect(tmp_path)
+            try:
+                integrity = check.execute('PRAGMA integrity_check').fetchone()[0]
+                has_schema = check.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'artifacts'"
+                ).fetchone() is not None
+            finally:
+                check.close()
+            if integrity != 'ok':
+                raise ValueError(f"Downloaded backup failed integrity check: {integrity}")
+            if not has_schema:
+                raise ValueError("Downloaded backup is not an ACS database")
+
+            # Drop WAL/SHM sidecars of the old database so they aren't replayed on the restored file
+            for suffix in ('-wal', '-shm'):
+                if os.path.exists(db_path + suffix):
+                    os.unlink(db_path + suffix)
+
+            # Move temp file to target location (same directory: atomic rename)
+            os.replace(tmp_path, db_path)
+
+            # Cached connections still point at the replaced file
+            _connection_generation += 1
+            _get_read_cache(db_path).clear()
+
+            # Backups from older versions lack newer indexes/migrations (user_version < SCHEMA_VERSION)
+            ArtifactDatabase(db_path).close()
 
             logger.info(f"[Restore] ✅ Database restored from: {backup_name}")
 
@@ -1658,8 +2420,7 @@ def auto_sync_database() -> dict:
                         import sqlite3
                         conn = sqlite3.connect(db_path)
                         cursor = conn.cursor()
-                        cursor.execute('SELECT COUNT(*) FROM artifacts')
-                        local_artifact_count = cursor.fetchone()[0]
+                        local_artifact_count = _artifact_count(cursor)
                         # Also count non-admin users
                         try:
                             cursor.execute("SELECT COUNT(*) FROM users WHERE username != 'admin'")
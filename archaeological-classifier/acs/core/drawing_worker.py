@@ -8,14 +8,125 @@ matplotlib threading issues on macOS.
 
 import os
 import sys
+import atexit
+import threading
 
+# Persistent pool of spawned workers, created on first use so that interpreter
+# startup and the matplotlib/trimesh imports are paid once per worker, not per drawing
+_drawing_pool = None
+_drawing_pool_lock = threading.Lock()
 
-def generate_drawing_worker(mesh_data, artifact_id, features, view_type='complete_sheet'):
+# Drawings each pool is running whose callers are still waiting, so a pool
+# retired after a hung job is only terminated once its other jobs are done
+_drawing_jobs = {}
+_drawing_jobs_done = threading.Condition(_drawing_pool_lock)
+
+# Workers are recycled after this many drawings to bound matplotlib memory growth
+_DRAWING_TASKS_PER_WORKER = 50
+
+
+def _drawing_worker_init():
+    """Pool initializer: load the heavy drawing dependencies once per worker."""
+    # An initializer that raises makes the pool respawn workers forever; leave
+    # import errors to generate_drawing_worker, which reports them per job
+    try:
+        import trimesh  # noqa: F401
+        import numpy  # noqa: F401
+        import matplotlib
+        matplotlib.use('Agg')  # Must be set before importing pyplot
+        import matplotlib.pyplot  # noqa: F401
+        from acs.core.technical_drawing import TechnicalDrawingGenerator  # noqa: F401
+    except ImportError:
+        pass
+
+
+def _acquire_drawing_pool():
+    """Return the shared drawing pool (starting it if needed) and count a job on it."""
+    global _drawing_pool
+    with _drawing_pool_lock:
+        if _drawing_pool is None:
+            import multiprocessing
+            # Note: We use 'spawn' context to ensure clean process on macOS
+            ctx = multiprocessing.get_context('spawn')
+            processes = int(os.getenv('ACS_DRAWING_WORKERS', max(1, (os.cpu_count() or 2) - 1)))
+            _drawing_pool = ctx.Pool(processes=processes, initializer=_drawing_worker_init,
+                                     maxtasksperchild=_DRAWING_TASKS_PER_WORKER)
+        _drawing_jobs[_drawing_pool] = _drawing_jobs.get(_drawing_pool, 0) + 1
+        return _drawing_pool
+
+
+def _release_drawing_pool(pool):
+    """Uncount a job whose caller stopped waiting on pool."""
+    with _drawing_jobs_done:
+        _drawing_jobs[pool] -= 1
+        _drawing_jobs_done.notify_all()
+
+
+def _retire_drawing_pool(pool):
+    """
+    Replace a pool with a hung worker.
+
+    Later drawings get a new pool at once. The old one takes no new jobs
+    and is terminated in the background when every other job on it has
+    finished or timed out, so one stuck drawing doesn't fail the others.
+    """
+    global _drawing_pool
+    with _drawing_pool_lock:
+        if _drawing_pool is not pool:
+            return  # already retired by another timed-out job (or shut down)
+        _drawing_pool = None
+    threading.Thread(target=_reap_drawing_pool, args=(pool,), daemon=True,
+                     name='drawing-pool-reaper').start()
+
+
+def _reap_drawing_pool(pool):
+    """Terminate a retired pool once no caller is waiting on it."""
+    with _drawing_jobs_done:
+        _drawing_jobs_done.wait_for(lambda: not _drawing_jobs.get(pool))
+        _drawing_jobs.pop(pool, None)
+    pool.terminate()
+    pool.join()
+
+
+def _shutdown_drawing_pool():
+    """Terminate the shared drawing pool (after a hung job, or at exit)."""
+    global _drawing_pool
+    with _drawing_pool_lock:
+        pool, _drawing_pool = _drawing_pool, None
+    if pool is not None:
+        pool.terminate()
+        pool.join()
+
+
+atexit.register(_shutdown_drawing_pool)
+
+
+def _load_shared_mesh(mesh_spec):
+    """Rebuild a mesh from vertex/face arrays placed in shared memory by the parent."""
+    import numpy as np
+    import trimesh
+    from multiprocessing import shared_memory
+
+    # The parent owns and unlinks the segment; spawned workers share its resource tracker
+    shm_name, v_shape, v_dtype, f_shape, f_dtype = mesh_spec
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        v_nbytes = int(np.prod(v_shape)) * np.dtype(v_dtype).itemsize
+        # Copy out of the shared pages so the segment can be closed while the mesh lives on
+        vertices = np.ndarray(v_shape, dtype=v_dtype, buffer=shm.buf).copy()
+        faces = np.ndarray(f_shape, dtype=f_dtype, buffer=shm.buf, offset=v_nbytes).copy()
+    finally:
+        shm.close()
+
+    return trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+
+
+def generate_drawing_worker(mesh_spec, artifact_id, features, view_type='complete_sheet'):
     """
     Worker function that runs in a separate process.
 
     Args:
-        mesh_data: Serialized mesh data
+        mesh_spec: (shared memory name, vertices shape/dtype, faces shape/dtype)
         artifact_id: Artifact identifier
         features: Feature dictionary
         view_type: Type of view to generate
@@ -25,16 +136,12 @@ def generate_drawing_worker(mesh_data, artifact_id, features, view_type='complet
     """
     try:
         # Import here to avoid loading in main process
-        import pickle
-        import trimesh
-        import numpy as np
         import matplotlib
         matplotlib.use('Agg')  # Must be set before importing pyplot
 
         from acs.core.technical_drawing import TechnicalDrawingGenerator
 
-        # Deserialize mesh
-        mesh = pickle.loads(mesh_data)
+        mesh = _load_shared_mesh(mesh_spec)
 
         # Generate drawing
         drawer = TechnicalDrawingGenerator()
@@ -74,41 +181,47 @@ def generate_drawing_safe(mesh, artifact_id, features, view_type='complete_sheet
     Raises:
         Exception: On generation failure
     """
-    import pickle
-    from multiprocessing import Pool
+    import multiprocessing
+    import numpy as np
+    from multiprocessing import shared_memory
 
-    # Serialize mesh for IPC
+    # Hand the geometry to the worker through shared memory instead of pickling the
+    # whole mesh through the pool's pipe (drawings only need vertices and faces)
     try:
-        mesh_data = pickle.dumps(mesh)
+        vertices = np.ascontiguousarray(mesh.vertices)
+        faces = np.ascontiguousarray(mesh.faces)
     except Exception as e:
-        raise Exception(f"Failed to serialize mesh: {str(e)}")
+        raise Exception(f"Failed to read mesh geometry: {str(e)}")
 
-    # Create a pool with a single worker
-    # Note: We use 'spawn' context to ensure clean process on macOS
-    import multiprocessing
-    ctx = multiprocessing.get_context('spawn')
+    shm = shared_memory.SharedMemory(create=True, size=max(1, vertices.nbytes + faces.nbytes))
+    try:
+        np.ndarray(vertices.shape, dtype=vertices.dtype, buffer=shm.buf)[...] = vertices
+        np.ndarray(faces.shape, dtype=faces.dtype, buffer=shm.buf,
+                   offset=vertices.nbytes)[...] = faces
+        mesh_spec = (shm.name, vertices.shape, vertices.dtype.str, faces.shape, faces.dtype.str)
 
-    with ctx.Pool(processes=1) as pool:
         # Submit job
-        result = pool.apply_async(
-            generate_drawing_worker,
-            args=(mesh_data, artifact_id, features, view_type)
-        )
-
+        pool = _acquire_drawing_pool()
         try:
+            result = pool.apply_async(
+                generate_drawing_worker,
+                args=(mesh_spec, artifact_id, features, view_type)
+            )
+
             # Wait for result with timeout
             success, data = result.get(timeout=timeout)
-
-            if success:
-                return data
-            else:
-                raise Exception(data)
-
         except multiprocessing.TimeoutError:
-            pool.terminate()
-            pool.join()
+            # The worker is stuck; replace the pool it runs in, letting the
+            # pool's other drawings finish first
+            _retire_drawing_pool(pool)
             raise Exception(f"Drawing generation timed out after {timeout} seconds")
-        except Exception as e:
-            pool.terminate()
-            pool.join()
-            raise
+        finally:
+            _release_drawing_pool(pool)
+    finally:
+        shm.close()
+        shm.unlink()
+
+    if success:
+        return data
+    else:
+        raise Exception(data)
@@ -10,13 +10,131 @@ Protects against:
 - Corrupted meshes
 """
 
+import hashlib
+import io
+import multiprocessing
 import os
 import re
-from typing import Tuple, Optional
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Tuple, Optional
+import numpy as np
 from werkzeug.utils import secure_filename
 from werkzeug.datastructures import FileStorage
 import trimesh
 
+# resource (rlimits) is Unix-only; elsewhere mesh parsing is bounded by time alone
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Optional Magika content-type model for uploads without a known signature
+try:
+    from magika import Magika
+    MAGIKA_AVAILABLE = True
+except ImportError:
+    MAGIKA_AVAILABLE = False
+
+_magika = None
+_magika_lock = threading.Lock()
+
+
+def _content_label(header: bytes) -> Optional[str]:
+    """Magika's content-type label for a file header, or None without Magika."""
+    global _magika
+    if not MAGIKA_AVAILABLE:
+        return None
+    with _magika_lock:
+        if _magika is None:
+            _magika = Magika()  # loads the model once per process
+    output = _magika.identify_bytes(header).output
+    # Magika >= 0.6 names the field `label`, older releases `ct_label`
+    return str(getattr(output, 'label', None) or output.ct_label)
+
+
+_parse_context = None
+_parse_context_lock = threading.Lock()
+
+
+def _get_parse_context():
+    """
+    Multiprocessing context for mesh parse workers.
+
+    A fork server with this module preloaded starts each worker as a fork of a
+    small single-threaded process (cheap, and safe from a threaded web server);
+    platforms without one spawn a fresh interpreter.
+    """
+    global _parse_context
+    with _parse_context_lock:
+        if _parse_context is None:
+            if 'forkserver' in multiprocessing.get_all_start_methods():
+                _parse_context = multiprocessing.get_context('forkserver')
+                _parse_context.set_forkserver_preload([__name__])
+            else:
+                _parse_context = multiprocessing.get_context('spawn')
+    return _parse_context
+
+
+def _parse_mesh(file_path: str, conn, memory_limit: int) -> None:
+    """Worker: load a mesh under an address-space limit and send back (mesh, error)."""
+    if resource is not None:
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+        except (ValueError, OSError):
+            pass  # the hard limit is already lower
+    try:
+        result = (trimesh.load(file_path), None)
+    except MemoryError:
+        result = (None, "Mesh parse exceeded memory budget")
+    except Exception as e:
+        result = (None, f"Failed to load mesh: {str(e)}")
+    conn.send(result)
+    conn.close()
+
+
+def _stream_size(file) -> int:
+    """
+    Size of an uploaded file's payload without reading it.
+
+    Uses fstat() when the upload is backed by a real file. Werkzeug spools
+    uploads in a SpooledTemporaryFile, whose fileno() would force an in-memory
+    spool out to disk, so its underlying buffer is inspected directly; only
+    in-memory buffers fall back to seek/tell, which is cheap for them.
+    """
+    stream = getattr(file, 'stream', file)
+    stream = getattr(stream, '_file', stream)  # SpooledTemporaryFile's backing file
+    try:
+        return os.fstat(stream.fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        # io.UnsupportedOperation (BytesIO) is both an OSError and a ValueError
+        pass
+    position = stream.tell()
+    stream.seek(0, io.SEEK_END)
+    size = stream.tell()
+    stream.seek(position)
+    return size
+
+
+def _content_key(file_path: str) -> Tuple[str, int, str]:
+    """(extension, size, BLAKE2b digest) identifying a mesh file's content."""
+    digest = hashlib.blake2b()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    ext = os.path.splitext(file_path)[1].lower()  # decides how trimesh parses it
+    return ext, os.path.getsize(file_path), digest.hexdigest()
+
+
+# Content keys of recently validated meshes, so re-uploads of the same file skip
+# the parse. Only the verdict is kept: meshes can be hundreds of MB each.
+_VALIDATED_CACHE_SIZE = 1024
+_validated_contents: 'OrderedDict[Tuple[str, int, str], None]' = OrderedDict()
+_validated_contents_lock = threading.Lock()
+
 
 class FileValidationError(Exception):
     """Custom exception for file validation errors."""
@@ -54,6 +172,13 @@ class FileValidator:
         'model/gltf-binary'
     }
 
+    # Chunk size for copying uploads to disk
+    COPY_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+    # Budget for parsing an uploaded mesh in its worker process
+    PARSE_TIMEOUT = 120  # seconds
+    PARSE_MEMORY_LIMIT = 8 * 1024 * 1024 * 1024  # 8 GB address space
+
     # Magic bytes for common 3D formats
     MAGIC_BYTES = {
         b'solid ': 'stl_ascii',
@@ -65,6 +190,18 @@ class FileValidator:
         b'v ': 'obj',
         b'glTF': 'gltf'
     }
+    # Distinct signature lengths, longest first: detection is one dict lookup per length
+    _MAGIC_LENGTHS = tuple(sorted({len(magic) for magic in MAGIC_BYTES}, reverse=True))
+
+    # Lines marking an ASCII mesh without a recognized signature: PLY element
+    # declarations and OBJ vertex/normal/texture/face records
+    ASCII_MESH_LINE = re.compile(rb'^(?:element\s+(?:vertex|face)\b|v[nt]?\s+[-+.\d]|f\s+\d)', re.MULTILINE)
+
+    # Mesh words outside record lines (e.g. indented records) are only a hint
+    ASCII_MESH_KEYWORD = re.compile(rb'\b(?:vertex|face|element)\b')
+
+    # Magika labels that don't rule out a headerless mesh
+    MAGIKA_MESH_LABELS = {'txt', 'unknown', 'undefined', 'empty', 'stl'}
 
     @staticmethod
     def validate_file_size(file: FileStorage, max_size: int) -> None:
@@ -78,10 +215,10 @@ class FileValidator:
         Raises:
             FileValidationError: If file is too large
         """
-        # Get file size
-        file.seek(0, 2)  # Seek to end
-        size = file.tell()
-        file.seek(0)  # Reset to beginning
+        # A declared part length over the limit is enough to reject; a smaller one
+        # is client-supplied and can't be trusted to accept
+        declared = getattr(file, 'content_length', None) or 0
+        size = declared if declared > max_size else _stream_size(file)
 
         if size > max_size:
             size_mb = size / (1024 * 1024)
@@ -150,23 +287,26 @@ class FileValidator:
 
         # Check magic bytes
         detected_type = None
-        for magic, file_type in FileValidator.MAGIC_BYTES.items():
-            if header.startswith(magic):
-                detected_type = file_type
+        for length in FileValidator._MAGIC_LENGTHS:
+            detected_type = FileValidator.MAGIC_BYTES.get(header[:length])
+            if detected_type:
                 break
 
         # OBJ files might not start with # or v (could have comments/blanks)
         if not detected_type and b'v ' in header[:500]:
             detected_type = 'obj'
 
+        # No signature: mesh records at line starts identify an ASCII mesh.
+        # Mesh words elsewhere are ambiguous; Magika (when installed) decides
+        # those, accepting only content it can't place as another type.
+        # Without Magika the keyword alone is enough, as before.
         if not detected_type:
-            # Try to decode as text to check if it looks like OBJ/PLY
-            try:
-                text = header.decode('utf-8', errors='ignore')
-                if any(keyword in text for keyword in ['vertex', 'face', 'element']):
+            if FileValidator.ASCII_MESH_LINE.search(header):
+                detected_type = 'ascii_mesh'
+            elif FileValidator.ASCII_MESH_KEYWORD.search(header):
+                label = _content_label(header)
+                if label is None or label in FileValidator.MAGIKA_MESH_LABELS:
                     detected_type = 'ascii_mesh'
-            except:
-                pass
 
         if not detected_type:
             raise FileValidationError(
@@ -177,42 +317,138 @@ class FileValidator:
         return detected_type
 
     @staticmethod
-    def validate_mesh_integrity(file_path: str) -> Tuple[bool, Optional[str]]:
+    def validate_mesh_integrity(file_path: str) -> Tuple[bool, Optional[str], Optional[Any]]:
         """
         Validate mesh can be loaded and is valid.
 
+        The file is parsed in a separate process limited to PARSE_TIMEOUT and
+        PARSE_MEMORY_LIMIT, so a crafted file can't stall or exhaust the server.
+
         Args:
             file_path: Path to the mesh file
 
         Returns:
-            Tuple of (is_valid, error_message)
+            Tuple of (is_valid, error_message, mesh). The loaded mesh (or scene)
+            is returned when valid so callers don't have to parse the file again;
+            it is None when identical content was already validated.
         """
+        # Hashing is far cheaper than parsing; identical content was valid before
         try:
-            # Try to load mesh with trimesh
-            mesh = trimesh.load(file_path)
+            content_key = _content_key(file_path)
+        except OSError as e:
+            return False, f"Failed to load mesh: {str(e)}", None
+        with _validated_contents_lock:
+            if content_key in _validated_contents:
+                _validated_contents.move_to_end(content_key)
+                return True, None, None
+
+        mesh, error = FileValidator._load_isolated(file_path)
+        if error:
+            return False, error, None
 
+        try:
             # Check if mesh is empty
             if isinstance(mesh, trimesh.Scene):
                 # Handle scenes (multiple meshes)
                 if len(mesh.geometry) == 0:
-                    return False, "Mesh file is empty (no geometry)"
+                    return False, "Mesh file is empty (no geometry)", None
 
                 # Check first geometry
                 first_geom = list(mesh.geometry.values())[0]
                 if not hasattr(first_geom, 'vertices') or len(first_geom.vertices) == 0:
-                    return False, "Mesh has no vertices"
+                    return False, "Mesh has no vertices", None
             else:
                 # Single mesh
                 if not hasattr(mesh, 'vertices') or len(mesh.vertices) == 0:
-                    return False, "Mesh has no vertices"
+                    return False, "Mesh has no vertices", None
 
                 if not hasattr(mesh, 'faces') or len(mesh.faces) == 0:
-                    return False, "Mesh has no faces"
+                    return False, "Mesh has no faces", None
 
-            return True, None
+            with _validated_contents_lock:
+                _validated_contents[content_key] = None
+                while len(_validated_contents) > _VALIDATED_CACHE_SIZE:
+                    _validated_contents.popitem(last=False)
+            return True, None, mesh
 
         except Exception as e:
-            return False, f"Failed to load mesh: {str(e)}"
+            return False, f"Failed to load mesh: {str(e)}", None
+
+    @staticmethod
+    def _load_isolated(file_path: str) -> Tuple[Optional[Any], Optional[str]]:
+        """
+        Load a mesh with trimesh in a resource-limited worker process.
+
+        Returns:
+            Tuple of (mesh, error_message); mesh is None on failure
+        """
+        ctx = _get_parse_context()
+        receiver, sender = ctx.Pipe(duplex=False)
+        worker = ctx.Process(
+            target=_parse_mesh,
+            args=(file_path, sender, FileValidator.PARSE_MEMORY_LIMIT),
+            daemon=True
+        )
+        worker.start()
+        sender.close()  # so a worker that dies unexpectedly shows up as EOF
+        try:
+            # Receive before joining: a large mesh fills the pipe until read
+            if not receiver.poll(FileValidator.PARSE_TIMEOUT):
+                return None, "Mesh parse exceeded time budget"
+            return receiver.recv()
+        except EOFError:
+            # Killed without replying, e.g. by the memory limit
+            return None, "Mesh parse exceeded memory budget"
+        finally:
+            receiver.close()
+            if worker.is_alive():
+                worker.kill()
+            worker.join()
+
+    @staticmethod
+    def save_stream(file: FileStorage, dest_path: str) -> None:
+        """
+        Copy an upload to disk in large chunks.
+
+        Uses sendfile() (kernel-side copy) when the upload is backed by a real
+        file, otherwise copies in COPY_CHUNK_SIZE chunks. FileStorage.save()
+        copies in 16 KB chunks.
+
+        Args:
+            file: The uploaded file
+            dest_path: Destination path
+        """
+        stream = getattr(file, 'stream', file)
+        source = getattr(stream, '_file', stream)  # SpooledTemporaryFile's backing file
+        chunk_size = FileValidator.COPY_CHUNK_SIZE
+
+        try:
+            in_fd = source.fileno()
+        except (AttributeError, OSError, ValueError):
+            in_fd = None
+
+        with open(dest_path, 'wb', buffering=chunk_size) as out:
+            copied = False
+            if in_fd is not None and hasattr(os, 'sendfile'):
+                try:
+                    size = os.fstat(in_fd).st_size
+                    offset = 0
+                    while offset < size:
+                        sent = os.sendfile(out.fileno(), in_fd, offset, size - offset)
+                        if sent == 0:
+                            break
+                        offset += sent
+                    copied = True
+                except OSError:
+                    # e.g. unsupported by the filesystem: start over with a plain copy
+                    out.seek(0)
+                    out.truncate()
+
+            if not copied:
+                source.seek(0)
+                shutil.copyfileobj(source, out, chunk_size)
+
+        stream.seek(0)  # Reset for potential re-use
 
     @staticmethod
     def validate_upload(
@@ -220,7 +456,7 @@ class FileValidator:
         max_size: int = MAX_SIZE_WEB,
         check_integrity: bool = True,
         save_path: Optional[str] = None
-    ) -> Tuple[str, str]:
+    ) -> Tuple[str, str, Optional[Any]]:
         """
         Perform complete file validation.
 
@@ -231,7 +467,8 @@ class FileValidator:
             save_path: Path to save file for integrity check (if None, uses temp)
 
         Returns:
-            Tuple of (safe_filename, detected_type)
+            Tuple of (safe_filename, detected_type, mesh); mesh is the loaded
+            mesh when check_integrity is set, otherwise None
 
         Raises:
             FileValidationError: If any validation fails
@@ -246,10 +483,9 @@ class FileValidator:
         detected_type = FileValidator.validate_magic_bytes(file)
 
         # 4. Validate mesh integrity (optional)
+        mesh = None
         if check_integrity:
             # Save to temp location for validation
-            import tempfile
-
             if save_path is None:
                 # Create temp file
                 fd, temp_path = tempfile.mkstemp(suffix=os.path.splitext(safe_filename)[1])
@@ -259,11 +495,10 @@ class FileValidator:
 
             try:
                 # Save file
-                file.save(temp_path)
-                file.seek(0)  # Reset for potential re-use
+                FileValidator.save_stream(file, temp_path)
 
                 # Validate mesh
-                is_valid, error_msg = FileValidator.validate_mesh_integrity(temp_path)
+                is_valid, error_msg, mesh = FileValidator.validate_mesh_integrity(temp_path)
 
                 if not is_valid:
                     raise FileValidationError(
@@ -276,28 +511,38 @@ class FileValidator:
                 if save_path is None and os.path.exists(temp_path):
                     os.remove(temp_path)
 
-        return safe_filename, detected_type
+        return safe_filename, detected_type, mesh
 
     @staticmethod
-    def validate_batch_upload(files: list, max_total_size: int = MAX_SIZE_BATCH) -> None:
+    def validate_batch_upload(files: list, max_total_size: int = MAX_SIZE_BATCH,
+                              max_file_size: Optional[int] = None) -> None:
         """
-        Validate batch upload doesn't exceed total size limit.
+        Validate batch upload doesn't exceed total or per-file size limits.
+
+        Sizes are taken from file metadata in one pass; no payload is read.
 
         Args:
             files: List of FileStorage objects
             max_total_size: Maximum total size in bytes
+            max_file_size: Maximum size of any single file in bytes (optional)
 
         Raises:
-            FileValidationError: If total size exceeds limit
+            FileValidationError: If total size exceeds limit, or any file does
         """
-        total_size = 0
-
-        for file in files:
-            file.seek(0, 2)
-            size = file.tell()
-            file.seek(0)
-            total_size += size
-
+        sizes = np.fromiter((_stream_size(file) for file in files), dtype=np.int64, count=len(files))
+
+        if max_file_size is not None:
+            oversized = np.flatnonzero(sizes > max_file_size)
+            if len(oversized):
+                first = oversized[0]
+                size_mb = sizes[first] / (1024 * 1024)
+                max_mb = max_file_size / (1024 * 1024)
+                raise FileValidationError(
+                    f"File too large: {files[first].filename} is {size_mb:.2f} MB (max: {max_mb:.0f} MB)",
+                    error_code="FILE_TOO_LARGE"
+                )
+
+        total_size = int(sizes.sum())
         if total_size > max_total_size:
             total_mb = total_size / (1024 * 1024)
             max_mb = max_total_size / (1024 * 1024)
@@ -310,7 +555,7 @@ class FileValidator:
 # Rate limiting helper (simple in-memory implementation)
 class RateLimiter:
     """
-    Simple in-memory rate limiter for upload endpoints.
+    Simple in-memory sliding-window rate limiter for upload endpoints.
 
     Note: In production, use Redis for distributed rate limiting.
     """
@@ -318,7 +563,24 @@ class RateLimiter:
     def __init__(self, max_requests: int = 10, window_seconds: int = 60):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests = {}  # {user_id: [(timestamp, count), ...]}
+        self.requests: Dict[str, Deque[float]] = {}  # {user_id: deque of request timestamps}
+        self._lock = threading.Lock()
+        self._last_sweep = time.time()
+
+    def _expire(self, timestamps: Deque[float], cutoff: float) -> None:
+        """Drop timestamps that fell out of the window (oldest first)."""
+        while timestamps and timestamps[0] <= cutoff:
+            timestamps.popleft()
+
+    def _sweep(self, now: float, cutoff: float) -> None:
+        """Forget idle users, at most once per window."""
+        if now - self._last_sweep < self.window_seconds:
+            return
+        self._last_sweep = now
+        idle = [user_id for user_id, timestamps in self.requests.items()
+                if not timestamps or timestamps[-1] <= cutoff]
+        for user_id in idle:
+            del self.requests[user_id]
 
     def is_allowed(self, user_id: str) -> bool:
         """
@@ -330,47 +592,32 @@ class RateLimiter:
         Returns:
             True if allowed, False if rate limited
         """
-        import time
-
         now = time.time()
         cutoff = now - self.window_seconds
 
-        # Clean old requests
-        if user_id in self.requests:
-            self.requests[user_id] = [
-                (ts, count) for ts, count in self.requests[user_id]
-                if ts > cutoff
-            ]
-        else:
-            self.requests[user_id] = []
+        with self._lock:
+            self._sweep(now, cutoff)
 
-        # Count requests in window
-        total_requests = sum(count for _, count in self.requests[user_id])
+            timestamps = self.requests.setdefault(user_id, deque())
+            self._expire(timestamps, cutoff)
 
-        if total_requests >= self.max_requests:
-            return False
+            if len(timestamps) >= self.max_requests:
+                return False
 
-        # Add new request
-        self.requests[user_id].append((now, 1))
-        return True
+            timestamps.append(now)
+            return True
 
     def get_remaining(self, user_id: str) -> int:
         """Get remaining requests for user."""
-        import time
-
-        now = time.time()
-        cutoff = now - self.window_seconds
-
-        if user_id not in self.requests:
-            return self.max_requests
+        cutoff = time.time() - self.window_seconds
 
-        # Count requests in window
-        total_requests = sum(
-            count for ts, count in self.requests[user_id]
-            if ts > cutoff
-        )
+        with self._lock:
+            timestamps = self.requests.get(user_id)
+            if not timestamps:
+                return self.max_requests
 
-        return max(0, self.max_requests - total_requests)
+            self._expire(timestamps, cutoff)
+            return max(0, self.max_requests - len(timestamps))
 
 
 # Global rate limiter instance
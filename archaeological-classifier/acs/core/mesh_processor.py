@@ -6,11 +6,386 @@ Handles loading, processing, and feature extraction from 3D mesh files.
 Supports OBJ, PLY, STL formats.
 """
 
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 from pathlib import Path
+from scipy.spatial import ConvexHull, cKDTree
 import json
+import mmap
+import multiprocessing
 import os
+import threading
+
+# trimesh is checked in load_mesh, so this module imports without it
+try:
+    import trimesh
+    from trimesh.sample import sample_surface
+    TRIMESH_AVAILABLE = True
+except ImportError:
+    TRIMESH_AVAILABLE = False
+
+# Optional orjson for faster feature export
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# Recently loaded meshes keyed by (path, mtime, size), so a file that was just
+# validated or is loaded again (re-upload, reload) isn't parsed twice
+_MESH_CACHE_SIZE = 8
+_mesh_cache: 'OrderedDict[tuple, object]' = OrderedDict()
+_mesh_cache_lock = threading.Lock()
+
+
+# Binary STL: 80-byte header, uint32 triangle count, then 50-byte triangle records
+_STL_HEADER_SIZE = 84
+_STL_TRIANGLE = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('vertices', '<f4', (3, 3)),
+    ('attributes', '<u2'),
+])
+
+
+def _binary_stl_count(filepath: str) -> Optional[int]:
+    """Triangle count if filepath is a binary STL, else None."""
+    if not filepath.lower().endswith('.stl'):
+        return None
+    size = os.path.getsize(filepath)
+    if size < _STL_HEADER_SIZE:
+        return None
+    with open(filepath, 'rb') as f:
+        f.seek(80)
+        count = int(np.frombuffer(f.read(4), dtype='<u4')[0])
+    # ASCII STL files essentially never match the exact binary length
+    return count if size == _STL_HEADER_SIZE + count * _STL_TRIANGLE.itemsize else None
+
+
+def _load_binary_stl(filepath: str, count: int):
+    """
+    Load a binary STL by viewing the memory-mapped file as a triangle array.
+
+    Shared corners are merged on their exact float32 coordinates (as the
+    STL writer stored them) with one lexsort, instead of trimesh's generic
+    loader and vertex merging.
+    """
+    with open(filepath, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            triangles = np.frombuffer(mm, dtype=_STL_TRIANGLE, count=count, offset=_STL_HEADER_SIZE)
+            # Copies out of the map; adding 0 also turns -0.0 into 0.0 so they merge
+            corners = triangles['vertices'].reshape(-1, 3) + np.float32(0)
+            del triangles
+
+    # Sort corners by their bit patterns and number each distinct one
+    bits = corners.view(np.uint32).astype(np.uint64)
+    order = np.lexsort((bits[:, 2], (bits[:, 0] << 32) | bits[:, 1]))
+    sorted_bits = bits[order]
+    is_new = np.empty(len(order), dtype=bool)
+    is_new[:1] = True
+    np.any(sorted_bits[1:] != sorted_bits[:-1], axis=1, out=is_new[1:])
+    inverse = np.empty(len(order), dtype=np.int64)
+    inverse[order] = np.cumsum(is_new) - 1
+
+    return trimesh.Trimesh(
+        vertices=corners[order[is_new]].astype(np.float64),
+        faces=inverse.reshape(-1, 3),
+        process=False
+    )
+
+
+def _load_trimesh(filepath: str, mesh=None):
+    """
+    Load a mesh file through the recently-loaded mesh cache.
+
+    Args:
+        filepath: Path to mesh file
+        mesh: Already loaded mesh for this file, stored instead of parsing it
+
+    Returns:
+        Loaded trimesh object
+    """
+    stat = os.stat(filepath)
+    key = (os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size)
+
+    if mesh is None:
+        with _mesh_cache_lock:
+            mesh = _mesh_cache.get(key)
+            if mesh is not None:
+                _mesh_cache.move_to_end(key)
+                return mesh
+        stl_count = _binary_stl_count(filepath)
+        if stl_count:
+            mesh = _load_binary_stl(filepath, stl_count)
+        else:
+            mesh = trimesh.load(filepath)
+
+    with _mesh_cache_lock:
+        _mesh_cache[key] = mesh
+        _mesh_cache.move_to_end(key)
+        while len(_mesh_cache) > _MESH_CACHE_SIZE:
+            _mesh_cache.popitem(last=False)
+    return mesh
+
+
+# Extracted features are cached next to the mesh file, keyed by its mtime and size
+FEATURES_SIDECAR_SUFFIX = '.features.json'
+# Bump whenever _extract_features changes its output, so older sidecars are recomputed
+FEATURES_VERSION = 2
+
+
+def _features_cache_key(filepath: str) -> str:
+    stat = os.stat(filepath)
+    return f"v{FEATURES_VERSION}-{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def _read_features_sidecar(filepath: str) -> Optional[Dict]:
+    """Cached features for a mesh file, or None if missing or stale."""
+    try:
+        with open(filepath + FEATURES_SIDECAR_SUFFIX) as f:
+            cached = json.load(f)
+        if cached.get('key') == _features_cache_key(filepath):
+            return cached['features']
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    return None
+
+
+def _write_features_sidecar(filepath: str, features: Dict) -> None:
+    """Atomically cache features next to the mesh file (best effort)."""
+    sidecar = filepath + FEATURES_SIDECAR_SUFFIX
+    temp_path = f"{sidecar}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w') as f:
+            json.dump({'key': _features_cache_key(filepath), 'features': features}, f)
+        os.replace(temp_path, sidecar)
+    except (OSError, TypeError, ValueError):
+        # Read-only upload folder or unserializable value: just don't cache
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def _mesh_workers(n_items: int) -> int:
+    """Number of worker processes for n_items independent mesh jobs."""
+    workers = int(os.getenv('ACS_MESH_WORKERS', os.cpu_count() or 1))
+    return max(1, min(workers, n_items))
+
+
+def _map_in_processes(func, items: List, parallel: bool = True) -> List:
+    """
+    Map func over items in spawned worker processes (func must be module-level).
+
+    Falls back to a plain map for a single item or worker, where process
+    startup would cost more than it saves.
+    """
+    workers = _mesh_workers(len(items)) if parallel else 1
+    if workers == 1:
+        return [func(item) for item in items]
+
+    # 'spawn' as in drawing_worker: forking a threaded web server isn't safe
+    ctx = multiprocessing.get_context('spawn')
+    chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as executor:
+        return list(executor.map(func, items, chunksize=chunksize))
+
+
+def _process_file(filepath: str) -> Dict:
+    """Worker job for batch_process: extract features for one file."""
+    try:
+        return {
+            'status': 'success',
+            'filepath': filepath,
+            'features': MeshProcessor().load_mesh(filepath)
+        }
+    except Exception as e:
+        return {
+            'status': 'error',
+            'filepath': filepath,
+            'error': str(e)
+        }
+
+
+def _feature_matrix_index_path(filepath: str) -> str:
+    """Path of the ids/columns index written next to an .npy feature matrix."""
+    return os.path.splitext(filepath)[0] + '.ids.json'
+
+
+def load_feature_matrix(filepath: str) -> Tuple[List[str], List[str], np.ndarray]:
+    """
+    Load a feature matrix written by MeshProcessor.export_features(format='npy').
+
+    The matrix is memory-mapped, so loading takes constant time regardless of
+    the number of artifacts.
+
+    Returns:
+        Tuple of (artifact ids, column names, read-only (N, D) float32 array)
+    """
+    with open(_feature_matrix_index_path(filepath)) as f:
+        index = json.load(f)
+    return index['ids'], index['columns'], np.load(filepath, mmap_mode='r')
+
+
+def _farthest_point_sample(points: np.ndarray, n: int) -> np.ndarray:
+    """
+    Pick n of the points by farthest-point sampling, starting from the first.
+
+    Each pick is the point farthest from all picked so far, so the subset
+    covers the cloud evenly and keeps its extremities.
+    """
+    if len(points) <= n:
+        return points
+    chosen = np.empty(n, dtype=np.intp)
+    chosen[0] = 0
+    # Squared distance from each point to its nearest chosen point
+    nearest = np.sum((points - points[0]) ** 2, axis=1)
+    for i in range(1, n):
+        chosen[i] = nearest.argmax()
+        np.minimum(nearest, np.sum((points - points[chosen[i]]) ** 2, axis=1), out=nearest)
+    return points[chosen]
+
+
+def _section_segments(vertices: np.ndarray, faces: np.ndarray, heights: np.ndarray) -> np.ndarray:
+    """
+    Segments where mesh faces cross a plane, for all faces at once.
+
+    Args:
+        vertices: (v, 3) mesh vertices
+        faces: (n, 3) vertex indices per face
+        heights: (v,) signed distance of each vertex from the plane
+
+    Returns:
+        (m, 2, 3) segment end points, one segment per crossing face; an edge
+        shared by two faces yields bitwise-identical points from both
+    """
+    heights = heights[faces]
+    above = heights > 0
+    # Only faces with corners on both sides cross the plane; gather just their corners
+    crossing = (above[:, 0] != above[:, 1]) | (above[:, 1] != above[:, 2])
+    triangles = vertices[faces[crossing]]
+    heights, above = heights[crossing], above[crossing]
+
+    rows = np.arange(len(triangles))
+    points = np.empty((len(triangles), 3, 3))
+    crosses = np.empty((len(triangles), 3), dtype=bool)
+    for edge, (i, j) in enumerate(((0, 1), (1, 2), (2, 0))):
+        crosses[:, edge] = above[:, i] != above[:, j]
+        # Always interpolate from the lower corner to the upper one, so both
+        # triangles sharing an edge compute exactly the same point
+        swap = above[:, i]
+        lo = np.where(swap, j, i)
+        hi = np.where(swap, i, j)
+        v_lo, v_hi = triangles[rows, lo], triangles[rows, hi]
+        h_lo, h_hi = heights[rows, lo], heights[rows, hi]
+        t = -h_lo / np.where(crosses[:, edge], h_hi - h_lo, 1.0)
+        points[:, edge] = v_lo + t[:, None] * (v_hi - v_lo)
+    # Exactly two edges of a crossing face cross the plane
+    return points[crosses].reshape(-1, 2, 3)
+
+
+def _chain_loops(segments: np.ndarray) -> List[np.ndarray]:
+    """
+    Join 2D segments sharing end points into polylines.
+
+    Args:
+        segments: (m, 2, 2) segment end points
+
+    Returns:
+        Point arrays, one per loop (or open chain, where the mesh has holes),
+        each counterclockwise, largest enclosed area first
+    """
+    nodes, inverse = np.unique(segments.reshape(-1, 2), axis=0, return_inverse=True)
+    edges = inverse.reshape(-1, 2)
+    edges = edges[edges[:, 0] != edges[:, 1]].tolist()  # a corner lying on the plane
+
+    node_edges = [[] for _ in range(len(nodes))]
+    for e, (a, b) in enumerate(edges):
+        node_edges[a].append(e)
+        node_edges[b].append(e)
+    used = [False] * len(edges)
+
+    def walk(start):
+        chain, node = [start], start
+        while True:
+            e = next((e for e in node_edges[node] if not used[e]), None)
+            if e is None:
+                return chain
+            used[e] = True
+            a, b = edges[e]
+            node = b if a == node else a
+            if node == start:
+                return chain  # closed
+            chain.append(node)
+
+    # Open chains are walked from an end, so each comes out in one piece
+    ends = [n for n, node in enumerate(node_edges) if len(node) % 2]
+    chains = []
+    for start in ends + list(range(len(nodes))):
+        while any(not used[e] for e in node_edges[start]):
+            chains.append(nodes[walk(start)])
+
+    loops = []
+    for chain in chains:
+        x, y = chain[:, 0], chain[:, 1]
+        area = 0.5 * (np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+        loops.append((abs(area), chain if area >= 0 else chain[::-1]))
+    loops.sort(key=lambda loop: -loop[0])
+    return [chain for _, chain in loops]
+
+
+class LazyMeshDict(MutableMapping):
+    """
+    Artifact ID -> mesh mapping whose entries may be backed by a file.
+
+    Meshes assigned directly are held in memory. Entries added with
+    register() hold only the path and are parsed on access through the
+    recently-loaded mesh cache, so at most a few of them are in memory at once.
+    Each entry has a token that changes whenever the entry is replaced, for
+    caches of per-mesh results that must not keep the mesh itself alive.
+    """
+
+    def __init__(self):
+        self._meshes: Dict[str, object] = {}
+        self._paths: Dict[str, str] = {}
+        self._tokens: Dict[str, object] = {}
+
+    def register(self, artifact_id: str, filepath: str) -> None:
+        """Add a mesh that is loaded from filepath when accessed."""
+        self._meshes.pop(artifact_id, None)
+        self._paths[artifact_id] = filepath
+        self._tokens[artifact_id] = object()
+
+    def token(self, artifact_id: str) -> object:
+        """Identity of the current entry for artifact_id."""
+        return self._tokens[artifact_id]
+
+    def __getitem__(self, artifact_id: str):
+        if artifact_id in self._meshes:
+            return self._meshes[artifact_id]
+        return _load_trimesh(self._paths[artifact_id])
+
+    def __setitem__(self, artifact_id: str, mesh) -> None:
+        self._paths.pop(artifact_id, None)
+        self._meshes[artifact_id] = mesh
+        self._tokens[artifact_id] = object()
+
+    def __delitem__(self, artifact_id: str) -> None:
+        del self._tokens[artifact_id]
+        self._meshes.pop(artifact_id, None)
+        self._paths.pop(artifact_id, None)
+
+    def __contains__(self, artifact_id) -> bool:
+        return artifact_id in self._tokens
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._tokens)
+
+    def __len__(self) -> int:
+        return len(self._tokens)
 
 
 class MeshProcessor:
@@ -18,25 +393,45 @@ class MeshProcessor:
 
     SUPPORTED_FORMATS = ['.obj', '.ply', '.stl']
 
+    # Convex hulls of larger meshes are computed on a seeded subset of this many vertices
+    HULL_MAX_POINTS = 50000
+
+    # Surface samples per mesh for distance computation; seeded so distances are reproducible.
+    # They are thinned by farthest-point sampling from DISTANCE_OVERSAMPLE times as many
+    # random ones, so protruding regions that decide the Hausdorff distance are kept
+    DISTANCE_SAMPLES = 1000
+    DISTANCE_OVERSAMPLE = 4
+    SAMPLE_SEED = 0
+
+    # Scalar features, in the column order of feature_matrix()
+    SCALAR_FEATURES = (
+        'volume', 'surface_area', 'length', 'width', 'thickness',
+        'length_width_ratio', 'length_thickness_ratio', 'width_thickness_ratio',
+        'convex_volume', 'convexity', 'compactness', 'n_vertices', 'n_faces',
+    )
+
     def __init__(self):
         """Initialize mesh processor."""
-        self.meshes: Dict[str, 'Mesh'] = {}
+        self.meshes = LazyMeshDict()
         self.mesh_paths: Dict[str, str] = {}  # Track file paths for persistence
+        # {artifact_id: (entry token, samples, cKDTree)}, reused across pairwise distances
+        self._sample_cache: Dict[str, Tuple] = {}
+        # {artifact_id: (entry token, features)}, so exports don't recompute features
+        self._features_cache: Dict[str, Tuple] = {}
 
-    def load_mesh(self, filepath: str, artifact_id: Optional[str] = None) -> Dict:
+    def load_mesh(self, filepath: str, artifact_id: Optional[str] = None, mesh=None) -> Dict:
         """
         Load a 3D mesh file and extract basic features.
 
         Args:
             filepath: Path to mesh file
             artifact_id: Optional ID for the artifact
+            mesh: Mesh already loaded from filepath (e.g. by FileValidator), to skip parsing
 
         Returns:
             Dictionary with mesh features
         """
-        try:
-            import trimesh
-        except ImportError:
+        if not TRIMESH_AVAILABLE:
             raise ImportError(
                 "trimesh is required for mesh processing. "
                 "Install with: pip install trimesh"
@@ -53,7 +448,7 @@ class MeshProcessor:
             )
 
         # Load mesh
-        mesh = trimesh.load(filepath)
+        mesh = _load_trimesh(filepath, mesh)
 
         # Generate ID if not provided
         if artifact_id is None:
@@ -63,15 +458,72 @@ class MeshProcessor:
         self.meshes[artifact_id] = mesh
         self.mesh_paths[artifact_id] = str(filepath)
 
-        # Extract features
-        features = self._extract_features(mesh, artifact_id)
+        # Extract features, unless cached for this version of the file
+        features = _read_features_sidecar(str(filepath))
+        if features is None:
+            features = self._extract_features(mesh, artifact_id)
+            _write_features_sidecar(str(filepath), features)
+        else:
+            features['id'] = artifact_id
 
+        self._features_cache[artifact_id] = (self.meshes.token(artifact_id), features)
         return features
 
+    def get_features(self, artifact_id: str) -> Dict:
+        """
+        Features of a loaded mesh, extracted once per mesh.
+
+        Args:
+            artifact_id: Artifact ID
+
+        Returns:
+            Dictionary with mesh features
+        """
+        token = self.meshes.token(artifact_id)
+        cached = self._features_cache.get(artifact_id)
+        if cached is not None and cached[0] is token:
+            return cached[1]
+
+        # The sidecar spares even loading a file-backed mesh
+        features = None
+        filepath = self.mesh_paths.get(artifact_id)
+        if filepath and os.path.exists(filepath):
+            features = _read_features_sidecar(filepath)
+        if features is None:
+            features = self._extract_features(self.meshes[artifact_id], artifact_id)
+        else:
+            features['id'] = artifact_id
+
+        self._features_cache[artifact_id] = (token, features)
+        return features
+
+    def feature_matrix(self, artifact_ids: Optional[List[str]] = None) -> Tuple[List[str], np.ndarray]:
+        """
+        Scalar features of loaded meshes as one contiguous array.
+
+        Args:
+            artifact_ids: Rows to include (default: all loaded meshes)
+
+        Returns:
+            Tuple of (artifact ids, (N, len(SCALAR_FEATURES)) float32 array)
+        """
+        if artifact_ids is None:
+            artifact_ids = list(self.meshes)
+
+        matrix = np.empty((len(artifact_ids), len(self.SCALAR_FEATURES)), dtype=np.float32)
+        for row, artifact_id in enumerate(artifact_ids):
+            features = self.get_features(artifact_id)
+            matrix[row] = [features.get(name, 0.0) for name in self.SCALAR_FEATURES]
+
+        return list(artifact_ids), matrix
+
     def reload_from_database(self, db) -> Dict[str, int]:
         """
         Reload all meshes from database on startup.
 
+        Meshes are only registered by path here; each is parsed when first
+        accessed, so startup costs a database scan and a stat() per artifact.
+
         Args:
             db: Database instance
 
@@ -101,16 +553,10 @@ class MeshProcessor:
                 stats['errors'].append(f"{artifact_id}: File not found at {mesh_path}")
                 continue
 
-            try:
-                # Reload mesh silently (already in database, just restore to memory)
-                import trimesh
-                mesh = trimesh.load(mesh_path)
-                self.meshes[artifact_id] = mesh
-                self.mesh_paths[artifact_id] = mesh_path
-                stats['loaded'] += 1
-            except Exception as e:
-                stats['failed'] += 1
-                stats['errors'].append(f"{artifact_id}: {str(e)}")
+            # Register mesh silently (already in database, loaded on first use)
+            self.meshes.register(artifact_id, mesh_path)
+            self.mesh_paths[artifact_id] = mesh_path
+            stats['loaded'] += 1
 
         return stats
 
@@ -128,10 +574,13 @@ class MeshProcessor:
 
         # Bounding box dimensions
         bbox = mesh.bounding_box_oriented
-        dimensions = bbox.primitive.extents
-        features['length'] = float(max(dimensions))
-        features['width'] = float(sorted(dimensions)[-2])
-        features['thickness'] = float(min(dimensions))
+        dimensions = np.asarray(bbox.primitive.extents)
+        longest, shortest = int(dimensions.argmax()), int(dimensions.argmin())
+        # The middle extent is the remaining index (argmax == argmin only for a cube)
+        middle = 3 - longest - shortest if longest != shortest else longest
+        features['length'] = float(dimensions[longest])
+        features['width'] = float(dimensions[middle])
+        features['thickness'] = float(dimensions[shortest])
         features['height'] = features['thickness']  # Alias for compatibility
 
         # Calculate dimensional ratios (important for classification)
@@ -151,10 +600,15 @@ class MeshProcessor:
         features['principal_axes'] = mesh.principal_inertia_components.tolist()
         features['inertia'] = mesh.moment_inertia.tolist()
 
-        # Convexity
-        convex_hull = mesh.convex_hull
-        features['convex_volume'] = float(convex_hull.volume)
-        features['convexity'] = float(mesh.volume / convex_hull.volume)
+        # Convexity (a convex mesh is its own hull, so skip building one)
+        if mesh.is_convex:
+            features['convex_volume'] = features['volume']
+            features['convexity'] = 1.0
+        else:
+            hull_volume = self._convex_hull_volume(mesh)
+            features['convex_volume'] = hull_volume
+            # A subset hull can be marginally smaller than the true one
+            features['convexity'] = float(min(1.0, mesh.volume / hull_volume))
 
         # Compactness (sphericity measure: 1.0 = perfect sphere)
         # Formula: (36 * pi * V^2) / (A^3) where V = volume, A = surface area
@@ -175,98 +629,113 @@ class MeshProcessor:
 
         return features
 
-    def _extract_profiles(self, mesh) -> Dict[str, List]:
-        """Extract 2D profiles from mesh for morphometric analysis."""
-        import trimesh
-
-        profiles = {}
+    # Profile planes: (slice normal, projected vertex columns for the fast outline)
+    PROFILE_PLANES = {
+        'xy': (np.array([0.0, 0.0, 1.0]), [0, 1]),  # top view
+        'xz': (np.array([0.0, 1.0, 0.0]), [0, 2]),  # side view
+        'yz': (np.array([1.0, 0.0, 0.0]), [1, 2]),  # front view
+    }
+
+    def _convex_hull_volume(self, mesh) -> float:
+        """Convex hull volume, from a vertex subset for large meshes."""
+        if len(mesh.vertices) <= self.HULL_MAX_POINTS:
+            return float(mesh.convex_hull.volume)
+
+        # QuickHull cost grows with the point count; a large random subset
+        # changes the hull volume negligibly
+        rng = np.random.default_rng(self.SAMPLE_SEED)
+        subset = rng.choice(len(mesh.vertices), self.HULL_MAX_POINTS, replace=False)
+        return float(trimesh.convex.convex_hull(mesh.vertices[subset]).volume)
+
+    def _extract_profiles(self, mesh, fast: bool = False) -> Dict[str, List]:
+        """
+        Extract 2D profiles from mesh for morphometric analysis.
 
-        # XY plane (top view)
-        xy_profile = self._extract_planar_profile(mesh, plane='xy')
-        if xy_profile is not None:
-            profiles['xy'] = xy_profile
+        Args:
+            mesh: Mesh to profile
+            fast: Approximate each profile by the convex hull of the vertices
+                projected onto the plane (outer silhouette) instead of slicing
+                the mesh through its center
 
-        # XZ plane (side view)
-        xz_profile = self._extract_planar_profile(mesh, plane='xz')
-        if xz_profile is not None:
-            profiles['xz'] = xz_profile
+        Returns:
+            Dictionary mapping plane name to a list of 2D points
+        """
+        center = (mesh.bounds[0] + mesh.bounds[1]) * 0.5
 
-        # YZ plane (front view)
-        yz_profile = self._extract_planar_profile(mesh, plane='yz')
-        if yz_profile is not None:
-            profiles['yz'] = yz_profile
+        profiles = {}
+        for plane, (normal, axes) in self.PROFILE_PLANES.items():
+            if fast:
+                profile = self._project_outline(mesh, axes)
+            else:
+                profile = self._extract_planar_profile(mesh, plane, center)
+            if profile is not None:
+                profiles[plane] = profile
 
         return profiles
 
-    def _extract_planar_profile(self, mesh, plane: str = 'xy') -> Optional[List]:
-        """Extract 2D outline from a planar slice."""
-        import trimesh
-
-        # Get mesh bounds
-        bounds = mesh.bounds
-        center = (bounds[0] + bounds[1]) / 2
-
-        # Define slice plane
-        if plane == 'xy':
-            plane_origin = [center[0], center[1], center[2]]
-            plane_normal = [0, 0, 1]
-        elif plane == 'xz':
-            plane_origin = [center[0], center[1], center[2]]
-            plane_normal = [0, 1, 0]
-        elif plane == 'yz':
-            plane_origin = [center[0], center[1], center[2]]
-            plane_normal = [1, 0, 0]
-        else:
-            return None
-
-        # Get slice
-        try:
-            slice_2d = mesh.section(
-                plane_origin=plane_origin,
-                plane_normal=plane_normal
-            )
-
-            if slice_2d is None:
-                return None
+    def _extract_planar_profile(self, mesh, plane: str = 'xy',
+                                center: Optional[np.ndarray] = None) -> Optional[List]:
+        """
+        Extract the 2D outline where a plane through the mesh center cuts it.
 
-            # Get 2D path
-            path_2d, _ = slice_2d.to_planar()
+        The section is computed with array operations over the faces rather
+        than through trimesh's path construction. Points are given in the
+        plane's two axes, loop by loop: each loop of the section (a socket
+        or hollow adds inner loops) follows the cut counterclockwise, and the
+        loop enclosing the largest area comes first.
+        """
+        if plane not in self.PROFILE_PLANES:
+            return None
+        normal, axes = self.PROFILE_PLANES[plane]
+
+        if center is None:
+            center = (mesh.bounds[0] + mesh.bounds[1]) * 0.5
+        # The profile planes are axis-aligned: heights are one coordinate column
+        axis = int(np.argmax(np.abs(normal)))
+        # Plain arrays: trimesh's tracked arrays add bookkeeping to every operation
+        vertices = np.asarray(mesh.vertices).view(np.ndarray)
+        faces = np.asarray(mesh.faces).view(np.ndarray)
+        segments = _section_segments(vertices, faces, vertices[:, axis] - center[axis])
+        loops = _chain_loops(segments[:, :, axes])
+        if sum(map(len, loops)) < 3:
+            return None
 
-            # Extract vertices
-            if hasattr(path_2d, 'vertices'):
-                return path_2d.vertices.tolist()
+        return np.concatenate(loops).tolist()
 
+    @staticmethod
+    def _project_outline(mesh, axes: List[int]) -> Optional[List]:
+        """Convex outline of the vertices projected onto two axes (approximate profile)."""
+        points = mesh.vertices[:, axes]
+        try:
+            hull = ConvexHull(points)
         except Exception:
+            # Fewer than 3 points, or all collinear in this projection
             return None
+        return points[hull.vertices].tolist()
 
-        return None
-
-    def batch_process(self, filepaths: List[str]) -> List[Dict]:
+    def batch_process(self, filepaths: List[str], parallel: bool = True) -> List[Dict]:
         """
         Process multiple mesh files in batch.
 
         Args:
             filepaths: List of paths to mesh files
+            parallel: Extract features in worker processes
 
         Returns:
             List of feature dictionaries
         """
-        results = []
-
-        for filepath in filepaths:
-            try:
-                features = self.load_mesh(filepath)
-                results.append({
-                    'status': 'success',
-                    'filepath': filepath,
-                    'features': features
-                })
-            except Exception as e:
-                results.append({
-                    'status': 'error',
-                    'filepath': filepath,
-                    'error': str(e)
-                })
+        filepaths = [str(filepath) for filepath in filepaths]
+        results = _map_in_processes(_process_file, filepaths, parallel)
+
+        # Workers return features only (and leave them in the sidecar cache);
+        # the meshes themselves are loaded from their files when first needed
+        for result in results:
+            if result['status'] == 'success':
+                artifact_id = result['features']['id']
+                self.meshes.register(artifact_id, result['filepath'])
+                self.mesh_paths[artifact_id] = result['filepath']
+                self._features_cache[artifact_id] = (self.meshes.token(artifact_id),
+                                                     result['features'])
 
         return results
 
@@ -290,37 +759,41 @@ class MeshProcessor:
         if id1 not in self.meshes or id2 not in self.meshes:
             raise ValueError("Both meshes must be loaded first")
 
-        mesh1 = self.meshes[id1]
-        mesh2 = self.meshes[id2]
-
-        if method == 'hausdorff':
-            # Sample points from both meshes
-            points1 = mesh1.sample(1000)
-            points2 = mesh2.sample(1000)
-
-            # Compute Hausdorff distance
-            from scipy.spatial.distance import directed_hausdorff
-            dist1 = directed_hausdorff(points1, points2)[0]
-            dist2 = directed_hausdorff(points2, points1)[0]
-            return float(max(dist1, dist2))
-
-        elif method == 'chamfer':
-            # Sample points
-            points1 = mesh1.sample(1000)
-            points2 = mesh2.sample(1000)
-
-            # Compute Chamfer distance
-            from scipy.spatial import cKDTree
-            tree1 = cKDTree(points1)
-            tree2 = cKDTree(points2)
+        if method not in ('hausdorff', 'chamfer'):
+            raise ValueError(f"Unknown distance method: {method}")
 
-            dist1 = np.mean(tree2.query(points1)[0])
-            dist2 = np.mean(tree1.query(points2)[0])
+        points1, tree1 = self._get_samples(id1)
+        points2, tree2 = self._get_samples(id2)
 
-            return float((dist1 + dist2) / 2)
+        # Nearest-neighbour distances in both directions
+        dist1 = tree2.query(points1)[0]
+        dist2 = tree1.query(points2)[0]
 
-        else:
-            raise ValueError(f"Unknown distance method: {method}")
+        if method == 'hausdorff':
+            return float(max(dist1.max(), dist2.max()))
+
+        # Chamfer distance
+        return float((np.mean(dist1) + np.mean(dist2)) / 2)
+
+    def _get_samples(self, artifact_id: str) -> Tuple[np.ndarray, cKDTree]:
+        """Surface samples of a loaded mesh and their KD-tree, computed once per mesh."""
+        token = self.meshes.token(artifact_id)
+        cached = self._sample_cache.get(artifact_id)
+        if cached is not None and cached[0] is token:
+            return cached[1], cached[2]
+
+        mesh = self.meshes[artifact_id]
+        candidates = sample_surface(mesh, self.DISTANCE_SAMPLES * self.DISTANCE_OVERSAMPLE,
+                                    seed=self.SAMPLE_SEED)[0]
+        points = _farthest_point_sample(np.asarray(candidates), self.DISTANCE_SAMPLES)
+        tree = cKDTree(points)
+
+        # Forget samples of meshes that were unloaded or replaced
+        for stale_id in list(self._sample_cache):
+            if stale_id not in self.meshes:
+                self._sample_cache.pop(stale_id, None)
+        self._sample_cache[artifact_id] = (token, points, tree)
+        return points, tree
 
     def export_features(self, filepath: str, format: str = 'json'):
         """
@@ -328,17 +801,31 @@ class MeshProcessor:
 
         Args:
             filepath: Output file path
-            format: Export format ('json', 'csv')
+            format: Export format ('json', 'csv', 'parquet', 'npy')
+
+        The 'npy' format writes the scalar feature matrix only (see
+        feature_matrix()), with its ids and columns in a '.ids.json' file
+        alongside; read it back with load_feature_matrix().
         """
-        features_list = []
+        if format == 'npy':
+            artifact_ids, matrix = self.feature_matrix()
+            np.save(filepath, matrix)
+            with open(_feature_matrix_index_path(filepath), 'w') as f:
+                json.dump({'ids': artifact_ids, 'columns': list(self.SCALAR_FEATURES)}, f)
+            return
 
-        for artifact_id, mesh in self.meshes.items():
-            features = self._extract_features(mesh, artifact_id)
-            features_list.append(features)
+        features_list = [self.get_features(artifact_id) for artifact_id in list(self.meshes)]
 
         if format == 'json':
-            with open(filepath, 'w') as f:
-                json.dump(features_list, f, indent=2)
+            if ORJSON_AVAILABLE:
+                with open(filepath, 'wb') as f:
+                    f.write(orjson.dumps(
+                        features_list,
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+                    ))
+            else:
+                with open(filepath, 'w') as f:
+                    json.dump(features_list, f, indent=2)
 
         elif format == 'csv':
             import pandas as pd
@@ -351,5 +838,17 @@ class MeshProcessor:
             df = pd.DataFrame(flat_features)
             df.to_csv(filepath, index=False)
 
+        elif format == 'parquet':
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError(
+                    "pyarrow is required for Parquet export. "
+                    "Install with: pip install pyarrow"
+                )
+            # Columnar, with profiles kept as nested list columns
+            pq.write_table(pa.Table.from_pylist(features_list), filepath, compression='zstd')
+
         else:
             raise ValueError(f"Unsupported format: {format}")
@@ -6,10 +6,21 @@ Generates 2D images from 3D meshes for reports and documentation.
 Uses trimesh with pyrender for high-quality offline rendering.
 """
 
+import hashlib
+import io
+import logging
 import os
+import shutil
+import time
 import numpy as np
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 from typing import Optional, Tuple, Any, List
 import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
 
 # Conditional imports - pyrender may not be available in all environments
 RENDERING_AVAILABLE = False
@@ -19,14 +30,123 @@ Image = None
 
 try:
     import trimesh as _trimesh
-    import pyrender as _pyrender
+    trimesh = _trimesh  # also used by the fallback renderers
     from PIL import Image as _Image
-    trimesh = _trimesh
+    Image = _Image  # likewise
+    import pyrender as _pyrender
     pyrender = _pyrender
-    Image = _Image
     RENDERING_AVAILABLE = True
 except ImportError:
-    print("Warning: pyrender or PIL not installed. 3D rendering disabled.")
+    logger.warning("pyrender or PIL not installed. 3D rendering disabled.")
+
+# Optional simplejpeg (libjpeg-turbo) for faster JPEG encoding
+try:
+    import simplejpeg
+    SIMPLEJPEG_AVAILABLE = True
+except ImportError:
+    SIMPLEJPEG_AVAILABLE = False
+
+# zlib level for saved PNGs: renders are mostly flat background, so level 2
+# is nearly as small as PIL's default of 6 and several times faster
+PNG_COMPRESS_LEVEL = 2
+JPEG_QUALITY = 90
+
+
+def _save_image(image, output_path: str, image_format: str = 'png', dpi: int = 300) -> None:
+    """
+    Save a rendered PIL image as PNG or JPEG.
+
+    The image is written to a temporary file and renamed into place, so
+    readers (renders are shared by geometry) never see a partial file and
+    a crash mid-write leaves nothing behind.
+
+    Args:
+        image: PIL Image (RGB)
+        output_path: Output file path
+        image_format: 'png' or 'jpeg'
+        dpi: Resolution stored in the file (PIL encoders only)
+    """
+    if image_format not in ('png', 'jpeg', 'jpg'):
+        raise ValueError(f"Unsupported image format: {image_format}")
+
+    # Unique per process and render thread
+    temp_path = f"{output_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            if image_format == 'png':
+                image.save(f, 'PNG', dpi=(dpi, dpi), compress_level=PNG_COMPRESS_LEVEL)
+            elif SIMPLEJPEG_AVAILABLE:
+                f.write(simplejpeg.encode_jpeg(np.ascontiguousarray(np.asarray(image)),
+                                               quality=JPEG_QUALITY, colorspace='RGB'))
+            else:
+                image.save(f, 'JPEG', dpi=(dpi, dpi), quality=JPEG_QUALITY)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+# Mesh placement shared by a render's cameras and lights, computed once per render
+CameraCtx = namedtuple('CameraCtx', 'center extent')
+
+# Views are rendered concurrently on a process-wide pool, each worker thread
+# with its own offscreen renderer (GL context). Every MeshRenderer uses the
+# same threads, so contexts and the shaders compiled in them are created once
+# per thread rather than per instance or image size.
+RENDER_WORKERS = 4
+_render_pool = None
+_render_lock = threading.Lock()
+_render_local = threading.local()
+_offscreen_renderers = []  # every worker's renderer, for release_render_contexts()
+
+
+def _get_render_pool() -> ThreadPoolExecutor:
+    """Thread pool that renders views, created on first use."""
+    global _render_pool
+    with _render_lock:
+        if _render_pool is None:
+            _render_pool = ThreadPoolExecutor(max_workers=RENDER_WORKERS,
+                                              thread_name_prefix='mesh-render')
+        return _render_pool
+
+
+def _get_offscreen_renderer(width: int, height: int) -> Any:
+    """
+    Offscreen renderer of the calling thread.
+
+    A GL context can only be current on one thread, so each worker keeps
+    its own renderer and reuses it for every view it renders. Creating a
+    context and compiling its shaders costs far more than rendering a small
+    mesh; after a size change only the framebuffer is resized.
+    """
+    renderer = getattr(_render_local, 'renderer', None)
+    if renderer is None:
+        renderer = pyrender.OffscreenRenderer(width, height)
+        _render_local.renderer = renderer
+        with _render_lock:
+            _offscreen_renderers.append(renderer)
+    elif (renderer.viewport_width, renderer.viewport_height) != (width, height):
+        renderer.viewport_width = width
+        renderer.viewport_height = height
+    return renderer
+
+
+def release_render_contexts() -> None:
+    """Stop the render threads and release their GL contexts."""
+    global _render_pool, _offscreen_renderers
+    with _render_lock:
+        pool, _render_pool = _render_pool, None
+        renderers, _offscreen_renderers = _offscreen_renderers, []
+    if pool is not None:
+        pool.shutdown(wait=True)
+    for renderer in renderers:
+        try:
+            renderer.delete()
+        except Exception:
+            pass  # context already gone (e.g. at interpreter exit)
 
 
 class MeshRenderer:
@@ -34,6 +154,32 @@ class MeshRenderer:
     Renders 3D meshes to 2D images for documentation.
     """
 
+    # Pose matrices start as a copy of this (not a shared scratch buffer: views render in parallel)
+    _IDENTITY = np.eye(4, dtype=np.float32)
+
+    # Lighting presets: (color, intensity, position offset from the mesh center
+    # in units of the light distance) per light
+    LIGHTING_PRESETS = {
+        # Bright lighting for clear visibility: key (main) and fill lights
+        'bright': [
+            ([1.0, 1.0, 1.0], 10.0, (1.0, 1.0, 1.0)),
+            ([1.0, 1.0, 1.0], 5.0, (-0.5, 0.5, 0.5)),
+        ],
+        # Soft, diffuse lighting for archaeological documentation:
+        # multiple soft lights from different angles
+        'archaeological': [
+            ([1.0, 0.98, 0.95], 4.8, (1.0, 1.0, 0.0)),
+            ([1.0, 0.98, 0.95], 4.8, (-0.7, 0.7, 0.7)),
+            ([1.0, 0.98, 0.95], 4.8, (0.0, 1.0, 1.0)),
+        ],
+        # Standard 3-point lighting: key, fill and back
+        'default': [
+            ([1.0, 1.0, 1.0], 8.0, (0.7, 0.7, 1.0)),
+            ([1.0, 1.0, 1.0], 3.2, (-0.5, 0.3, 0.5)),
+            ([1.0, 1.0, 1.0], 2.4, (0.0, 0.5, -0.5)),
+        ],
+    }
+
     def __init__(self, width: int = 800, height: int = 600):
         """
         Initialize renderer.
@@ -48,11 +194,15 @@ class MeshRenderer:
         self.width = width
         self.height = height
 
+        # {preset: [(light, offset), ...]}, built on first use of each preset
+        self._light_cache = {}
+
     def render_mesh_views(self,
                           mesh,
                           output_path: str,
                           views: list = None,
-                          lighting: str = 'default') -> str:
+                          lighting: str = 'default',
+                          image_format: str = 'png') -> str:
         """
         Render mesh from multiple viewpoints and create composite image.
 
@@ -61,6 +211,7 @@ class MeshRenderer:
             output_path: Path to save output image
             views: List of view angles ('front', 'side', 'top', '3quarter')
             lighting: Lighting setup ('default', 'bright', 'archaeological')
+            image_format: Output format ('png', or 'jpeg' for smaller, faster files)
 
         Returns:
             Path to generated image
@@ -68,84 +219,103 @@ class MeshRenderer:
         if views is None:
             views = ['front', 'side', 'top', '3quarter']
 
-        # Render each view
-        view_images = []
-        for view in views:
-            img = self._render_single_view(mesh, view, lighting)
-            if img is not None:
-                view_images.append(img)
+        bounds = mesh.bounds
+        ctx = CameraCtx(center=np.asarray(mesh.centroid), extent=float(np.max(bounds[1] - bounds[0])))
+
+        # Convert to pyrender once (normals, float32 buffers); views share the arrays
+        mesh_pr = pyrender.Mesh.from_trimesh(mesh, smooth=True)
+
+        # Each view is rendered at its size in the composite, so the GPU fills
+        # and reads back only those pixels and the tiles need no resizing
+        tile_size = self._tile_size(len(views))
+
+        # Light nodes are the same in every view (without shadows lights hold no GL state)
+        lights = self._setup_lighting(ctx, views[0], lighting)
 
-        if not view_images:
-            raise ValueError("No views could be rendered")
+        # Views are independent: render them concurrently, keeping their order.
+        # A failed view raises here and fails the whole render, so callers can
+        # fall back instead of getting a composite with missing tiles.
+        view_images = list(_get_render_pool().map(self._render_single_view, repeat(mesh_pr), views,
+                                                  repeat(lights), repeat(ctx), repeat(tile_size)))
 
         # Create composite image
         composite = self._create_composite(view_images, views)
 
         # Save
-        composite.save(output_path, 'PNG', dpi=(300, 300))
+        _save_image(composite, output_path, image_format)
 
         return output_path
 
     def _render_single_view(self,
-                           mesh,
+                           mesh_pr,
                            view: str,
-                           lighting: str) -> Optional[Any]:
+                           lights: List[Any],
+                           ctx: CameraCtx,
+                           size: Optional[Tuple[int, int]] = None) -> Any:
         """
         Render mesh from single viewpoint.
 
         Args:
-            mesh: Trimesh object
+            mesh_pr: Pyrender mesh converted for this render
             view: View angle name
-            lighting: Lighting setup
+            lights: Light nodes (see _setup_lighting)
+            ctx: Mesh center and extent
+            size: Image (width, height), by default the renderer's size
 
         Returns:
-            PIL Image or None
+            PIL Image
         """
-        try:
-            # Create pyrender scene
-            scene = pyrender.Scene(ambient_light=[0.1, 0.1, 0.1],
-                                  bg_color=[1.0, 1.0, 1.0, 1.0])
-
-            # Convert trimesh to pyrender mesh
-            mesh_pr = pyrender.Mesh.from_trimesh(mesh, smooth=True)
-            mesh_node = scene.add(mesh_pr)
-
-            # Setup camera based on view
-            camera = self._setup_camera(mesh, view)
-            scene.add(camera)
-
-            # Setup lighting
-            lights = self._setup_lighting(mesh, view, lighting)
-            for light in lights:
-                scene.add(light)
-
-            # Render
-            renderer = pyrender.OffscreenRenderer(self.width, self.height)
-            color, depth = renderer.render(scene)
-            renderer.delete()
+        # Create pyrender scene
+        scene = pyrender.Scene(ambient_light=[0.1, 0.1, 0.1],
+                              bg_color=[1.0, 1.0, 1.0, 1.0])
 
-            # Convert to PIL Image
-            return Image.fromarray(color)
+        mesh_node = scene.add(self._view_mesh(mesh_pr))
 
-        except Exception as e:
-            print(f"Failed to render view '{view}': {e}")
-            return None
+        # Setup camera based on view
+        camera = self._setup_camera(ctx, view)
+        scene.add_node(camera)
+
+        for light in lights:
+            scene.add_node(light)
 
-    def _setup_camera(self, mesh, view: str) -> Any:
+        # Render
+        width, height = size or (self.width, self.height)
+        color, depth = _get_offscreen_renderer(width, height).render(scene)
+
+        # Wrap pyrender's buffer as a PIL Image without copying it
+        color = np.ascontiguousarray(color)
+        return Image.frombuffer('RGB', (color.shape[1], color.shape[0]), color, 'raw', 'RGB', 0, 1)
+
+    @staticmethod
+    def _view_mesh(mesh_pr) -> Any:
+        """
+        Copy of a converted mesh for one view's scene.
+
+        A primitive keeps its GL buffers once bound to a context, and views
+        render on different contexts, so each view gets new primitives built
+        from the converted arrays (normals are not recomputed).
+        """
+        primitives = [
+            pyrender.Primitive(positions=p.positions, normals=p.normals, tangents=p.tangents,
+                               texcoord_0=p.texcoord_0, texcoord_1=p.texcoord_1,
+                               color_0=p.color_0, indices=p.indices, material=p.material,
+                               mode=p.mode, poses=p.poses)
+            for p in mesh_pr.primitives
+        ]
+        return pyrender.Mesh(primitives=primitives, name=mesh_pr.name, is_visible=mesh_pr.is_visible)
+
+    def _setup_camera(self, ctx: CameraCtx, view: str) -> Any:
         """
         Setup camera position and orientation for view.
 
         Args:
-            mesh: Trimesh object
+            ctx: Mesh center and extent
             view: View name
 
         Returns:
             Pyrender camera with node
         """
-        # Get mesh bounds and center
-        bounds = mesh.bounds
-        center = mesh.centroid
-        extent = np.max(bounds[1] - bounds[0])
+        center, extent = ctx
 
         # Camera distance (enough to see whole object)
         distance = extent * 2.5
@@ -177,7 +347,8 @@ class MeshRenderer:
 
         return pyrender.Node(camera=camera, matrix=camera_pose)
 
-    def _look_at(self, eye: np.ndarray, target: np.ndarray, up: np.ndarray) -> np.ndarray:
+    @staticmethod
+    def _look_at(eye: np.ndarray, target: np.ndarray, up: np.ndarray) -> np.ndarray:
         """
         Create look-at matrix for camera.
 
@@ -189,15 +360,20 @@ class MeshRenderer:
         Returns:
             4x4 transformation matrix
         """
-        forward = target - eye
-        forward = forward / np.linalg.norm(forward)
+        forward = np.subtract(target, eye, dtype=np.float32)
+        forward *= 1.0 / np.sqrt(forward @ forward)
 
-        right = np.cross(forward, up)
-        right = right / np.linalg.norm(right)
+        right = np.cross(forward, up).astype(np.float32, copy=False)
+        norm = right @ right
+        if norm < 1e-12:
+            # Looking along up (the top view): any perpendicular up will do
+            right = np.cross(forward, np.array([0, 0, -1], dtype=np.float32))
+            norm = right @ right
+        right *= 1.0 / np.sqrt(norm)
 
         up = np.cross(right, forward)
 
-        matrix = np.eye(4)
+        matrix = MeshRenderer._IDENTITY.copy()
         matrix[:3, 0] = right
         matrix[:3, 1] = up
         matrix[:3, 2] = -forward
@@ -205,127 +381,89 @@ class MeshRenderer:
 
         return matrix
 
-    def _setup_lighting(self, mesh, view: str, lighting: str) -> List[Any]:
+    def _setup_lighting(self, ctx: CameraCtx, view: str, lighting: str) -> List[Any]:
         """
         Setup scene lighting.
 
+        The lights themselves are created once per preset and renderer;
+        only their placement depends on the mesh. Lights don't depend on the
+        view, so one call serves every view of a render.
+
         Args:
-            mesh: Trimesh object
+            ctx: Mesh center and extent
             view: View name
             lighting: Lighting preset
 
         Returns:
             List of pyrender lights with nodes
         """
-        center = mesh.centroid
-        bounds = mesh.bounds
-        extent = np.max(bounds[1] - bounds[0])
-        distance = extent * 3
-
-        lights = []
-
-        if lighting == 'bright':
-            # Bright lighting for clear visibility
-            intensity = 10.0
-
-            # Key light (main)
-            key_pos = center + np.array([distance, distance, distance])
-            key_light = pyrender.DirectionalLight(color=[1.0, 1.0, 1.0], intensity=intensity)
-            lights.append(pyrender.Node(light=key_light, matrix=self._translation_matrix(key_pos)))
-
-            # Fill light
-            fill_pos = center + np.array([-distance*0.5, distance*0.5, distance*0.5])
-            fill_light = pyrender.DirectionalLight(color=[1.0, 1.0, 1.0], intensity=intensity*0.5)
-            lights.append(pyrender.Node(light=fill_light, matrix=self._translation_matrix(fill_pos)))
-
-        elif lighting == 'archaeological':
-            # Soft, diffuse lighting for archaeological documentation
-            intensity = 8.0
-
-            # Multiple soft lights from different angles
-            positions = [
-                center + np.array([distance, distance, 0]),
-                center + np.array([-distance*0.7, distance*0.7, distance*0.7]),
-                center + np.array([0, distance, distance]),
+        if lighting not in self.LIGHTING_PRESETS:
+            lighting = 'default'
+        lights = self._light_cache.get(lighting)
+        if lights is None:
+            lights = [
+                (pyrender.DirectionalLight(color=color, intensity=intensity), offset)
+                for color, intensity, offset in self.LIGHTING_PRESETS[lighting]
             ]
+            self._light_cache[lighting] = lights
 
-            for pos in positions:
-                light = pyrender.DirectionalLight(color=[1.0, 0.98, 0.95], intensity=intensity*0.6)
-                lights.append(pyrender.Node(light=light, matrix=self._translation_matrix(pos)))
-
-        else:  # default
-            # Standard 3-point lighting
-            intensity = 8.0
-
-            # Key
-            key_pos = center + np.array([distance*0.7, distance*0.7, distance])
-            key_light = pyrender.DirectionalLight(color=[1.0, 1.0, 1.0], intensity=intensity)
-            lights.append(pyrender.Node(light=key_light, matrix=self._translation_matrix(key_pos)))
-
-            # Fill
-            fill_pos = center + np.array([-distance*0.5, distance*0.3, distance*0.5])
-            fill_light = pyrender.DirectionalLight(color=[1.0, 1.0, 1.0], intensity=intensity*0.4)
-            lights.append(pyrender.Node(light=fill_light, matrix=self._translation_matrix(fill_pos)))
-
-            # Back
-            back_pos = center + np.array([0, distance*0.5, -distance*0.5])
-            back_light = pyrender.DirectionalLight(color=[1.0, 1.0, 1.0], intensity=intensity*0.3)
-            lights.append(pyrender.Node(light=back_light, matrix=self._translation_matrix(back_pos)))
+        center, extent = ctx
+        distance = extent * 3
 
-        return lights
+        # All light poses in one broadcast: translations to center + offset * distance
+        offsets = np.array([offset for _, offset in lights], dtype=np.float32)
+        poses = np.repeat(self._IDENTITY[None], len(lights), axis=0)
+        poses[:, :3, 3] = center + offsets * distance
 
-    def _translation_matrix(self, translation: np.ndarray) -> np.ndarray:
-        """Create 4x4 translation matrix."""
-        matrix = np.eye(4)
-        matrix[:3, 3] = translation
-        return matrix
+        return [pyrender.Node(light=light, matrix=pose) for (light, _), pose in zip(lights, poses)]
 
     def _create_composite(self, images: list, view_names: list) -> Any:
         """
         Create composite image from multiple views.
 
         Args:
-            images: List of PIL Images
+            images: List of PIL Images (RGB), one per view, each rendered at
+                the composite's tile size (a failed view fails the render)
             view_names: List of view names for labels
 
         Returns:
             Composite PIL Image
         """
-        # Calculate layout (2x2 grid for 4 views, or adapt based on count)
         n_images = len(images)
-
         if n_images == 1:
             return images[0]
-        elif n_images == 2:
-            cols, rows = 2, 1
-        elif n_images <= 4:
-            cols, rows = 2, 2
-        else:
-            cols = 3
-            rows = (n_images + cols - 1) // cols
-
-        # Resize images if needed
-        target_w = self.width // cols
-        target_h = self.height // rows
 
-        resized = []
-        for img in images:
-            resized.append(img.resize((target_w, target_h), Image.Resampling.LANCZOS))
+        cols, rows = self._grid(n_images)
+        target_w, target_h = self._tile_size(n_images)
 
-        # Create composite
-        composite_w = target_w * cols
-        composite_h = target_h * rows
-        composite = Image.new('RGB', (composite_w, composite_h), 'white')
+        # Tiles are written into one white canvas, converted to an image once
+        canvas = np.full((target_h * rows, target_w * cols, 3), 255, dtype=np.uint8)
 
-        # Paste images
-        for idx, img in enumerate(resized):
+        for idx, img in enumerate(images):
             col = idx % cols
             row = idx // cols
             x = col * target_w
             y = row * target_h
-            composite.paste(img, (x, y))
+            canvas[y:y + target_h, x:x + target_w] = np.asarray(img, dtype=np.uint8)
 
-        return composite
+        return Image.fromarray(canvas, 'RGB')
+
+    @staticmethod
+    def _grid(n_images: int) -> Tuple[int, int]:
+        """Composite layout (cols, rows): 2x2 grid for 4 views, or adapt based on count."""
+        if n_images == 1:
+            return 1, 1
+        elif n_images == 2:
+            return 2, 1
+        elif n_images <= 4:
+            return 2, 2
+        cols = 3
+        return cols, (n_images + cols - 1) // cols
+
+    def _tile_size(self, n_images: int) -> Tuple[int, int]:
+        """Size (width, height) of each image in a composite of n_images."""
+        cols, rows = self._grid(n_images)
+        return self.width // cols, self.height // rows
 
     def render_technical_drawing(self,
                                  mesh,
@@ -347,14 +485,262 @@ class MeshRenderer:
         return self.render_mesh_views(mesh, output_path, views=views, lighting='bright')
 
 
-# Global instance
-_renderer = None
+# Renderer of each calling thread (see get_mesh_renderer)
+_renderer_tls = threading.local()
+
+
+# Software fallback: per-view tile size (width, height) and views as
+# (title, azimuth, elevation) in degrees, z up as in the original plots
+FALLBACK_TILE_SIZE = (600, 450)
+FALLBACK_VIEWS = [
+    ('Front View', 0, 0),
+    ('Side View', 90, 0),
+    ('Top View', 0, 90),
+    ('3/4 View', 45, 45),
+]
+BRONZE_RGB = np.array([212, 167, 106], dtype=np.float64)  # #D4A76A
+
+# Fragments (candidate pixels) rasterized per batch of triangles, to bound memory
+RASTER_FRAGMENT_CHUNK = 1 << 20
+
+# Meshes above FALLBACK_MAX_FACES are decimated to about FALLBACK_TARGET_FACES
+FALLBACK_MAX_FACES = 5000
+FALLBACK_TARGET_FACES = 2500
+
+# Decimated meshes by geometry, since decimation costs far more than rendering
+_SIMPLIFIED_CACHE_SIZE = 64
+_simplified_meshes: 'OrderedDict[Tuple[str, int], Any]' = OrderedDict()
+_simplified_lock = threading.Lock()
+
 
+def _geometry_key(mesh) -> str:
+    """Digest of a mesh's vertices and faces."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(mesh.vertices).tobytes())
+    digest.update(np.ascontiguousarray(mesh.faces).tobytes())
+    return digest.hexdigest()
 
-def _render_matplotlib_fallback(mesh, output_path: str) -> str:
+
+def _simplify_cached(mesh, target_faces: int, cache_dir: Optional[str] = None):
     """
-    Optimized fallback renderer using matplotlib for 3D visualization.
-    Used when pyrender is unavailable or fails.
+    Quadric-decimate a mesh, reusing earlier results for the same geometry.
+
+    Results are kept in memory and, with cache_dir, as PLY files that load
+    much faster than decimating again.
+    """
+    key = (_geometry_key(mesh), target_faces)
+    with _simplified_lock:
+        simplified = _simplified_meshes.get(key)
+        if simplified is not None:
+            _simplified_meshes.move_to_end(key)
+            return simplified
+
+    cache_path = None
+    if cache_dir:
+        cache_path = os.path.join(cache_dir, f"simplified_{key[0]}_{target_faces}.ply")
+    simplified = None
+    if cache_path and os.path.exists(cache_path):
+        try:
+            simplified = trimesh.load(cache_path, process=False)
+            if not isinstance(simplified, trimesh.Trimesh) or not len(simplified.faces):
+                raise ValueError("no faces")
+        except Exception:
+            # Unreadable cache file: drop it and decimate again
+            simplified = None
+            try:
+                os.remove(cache_path)
+            except OSError:
+                pass
+    if simplified is None:
+        simplified = mesh.simplify_quadric_decimation(face_count=target_faces)
+        if cache_path:
+            # Written aside and renamed into place, so readers never load a partial file
+            temp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                simplified.export(temp_path, file_type='ply')
+                os.replace(temp_path, cache_path)
+            except OSError:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass  # the in-memory copy still helps
+
+    with _simplified_lock:
+        _simplified_meshes[key] = simplified
+        while len(_simplified_meshes) > _SIMPLIFIED_CACHE_SIZE:
+            _simplified_meshes.popitem(last=False)
+    return simplified
+
+
+def _view_rotation(azim: float, elev: float) -> np.ndarray:
+    """
+    Rotation from world to view coordinates for a camera at (azim, elev).
+
+    Rows are the screen right and up directions and the direction towards
+    the viewer, so the third view coordinate grows towards the camera.
+    """
+    azim, elev = np.radians(azim), np.radians(elev)
+    right = [-np.sin(azim), np.cos(azim), 0.0]
+    up = [-np.sin(elev) * np.cos(azim), -np.sin(elev) * np.sin(azim), np.cos(elev)]
+    towards = [np.cos(elev) * np.cos(azim), np.cos(elev) * np.sin(azim), np.sin(elev)]
+    return np.array([right, up, towards])
+
+
+def _project_views(vertices: np.ndarray, center: np.ndarray, rotations: np.ndarray) -> np.ndarray:
+    """
+    View-space vertices for several views at once.
+
+    Args:
+        vertices: (V, 3) vertex positions
+        center: Point placed at the view origin
+        rotations: (N, 3, 3) world-to-view rotations
+
+    Returns:
+        (N, V, 3) array, from a single batched matmul
+    """
+    return (vertices - center) @ rotations.transpose(0, 2, 1)
+
+
+def _rasterize(view: np.ndarray, faces: np.ndarray, scale: float,
+               size: Tuple[int, int], cull_backfaces: bool = False) -> np.ndarray:
+    """
+    Z-buffer rasterize a mesh in orthographic projection with flat shading.
+
+    Every triangle's candidate pixels (its bounding box) are expanded into
+    arrays and tested with barycentric coordinates at once; the closest
+    fragment per pixel wins. Triangles are processed in batches of about
+    RASTER_FRAGMENT_CHUNK fragments.
+
+    Args:
+        view: (V, 3) view-space vertices (see _project_views); the view
+            origin is drawn at the center of the image. Fragments are
+            computed in the same precision (float32 or float64)
+        faces: (F, 3) vertex indices
+        scale: Half the extent shown across the shorter image side
+        size: Image (width, height)
+        cull_backfaces: Skip faces turned away from the camera; only valid
+            for closed meshes with outward-facing normals, whose back faces
+            are always hidden
+
+    Returns:
+        (height, width, 3) uint8 RGB image on a white background
+    """
+    width, height = size
+    image = np.full((height * width, 3), 255, dtype=np.uint8)
+    zbuffer = np.full(height * width, -np.inf)
+    if len(faces) == 0:
+        return image.reshape(height, width, 3)
+
+    # Triangle corners gathered once into one (F, 3) array per axis; everything
+    # per face below is computed from these contiguous columns
+    view_x, view_y, tri_z = (np.ascontiguousarray(view[:, axis])[faces] for axis in range(3))
+    pixels_per_unit = 0.5 * min(width, height) / scale
+    tri_x = view_x * pixels_per_unit + 0.5 * width
+    tri_y = 0.5 * height - view_y * pixels_per_unit
+
+    # Face normals from the edge vectors
+    e1x, e1y, e1z = view_x[:, 1] - view_x[:, 0], view_y[:, 1] - view_y[:, 0], tri_z[:, 1] - tri_z[:, 0]
+    e2x, e2y, e2z = view_x[:, 2] - view_x[:, 0], view_y[:, 2] - view_y[:, 0], tri_z[:, 2] - tri_z[:, 0]
+    normal_x = e1y * e2z - e1z * e2y
+    normal_y = e1z * e2x - e1x * e2z
+    normal_z = e1x * e2y - e1y * e2x
+
+    # Two-sided Lambert shading with the light at the camera
+    lengths = np.sqrt(normal_x * normal_x + normal_y * normal_y + normal_z * normal_z)
+    facing = np.abs(normal_z) / np.where(lengths > 0, lengths, 1.0)
+    colors = (BRONZE_RGB * (0.35 + 0.65 * facing)[:, None]).astype(np.uint8)
+
+    # Signed doubled area in pixels (y points down); zero for triangles seen edge-on
+    area = -normal_z * pixels_per_unit ** 2
+
+    # Pixel-center bounding boxes, clipped to the image
+    x_min = np.maximum(np.ceil(tri_x.min(axis=1) - 0.5), 0).astype(np.int64)
+    x_max = np.minimum(np.floor(tri_x.max(axis=1) - 0.5), width - 1).astype(np.int64)
+    y_min = np.maximum(np.ceil(tri_y.min(axis=1) - 0.5), 0).astype(np.int64)
+    y_max = np.minimum(np.floor(tri_y.max(axis=1) - 0.5), height - 1).astype(np.int64)
+    box_w = x_max - x_min + 1
+    box_h = y_max - y_min + 1
+    keep = (box_w > 0) & (box_h > 0) & (area != 0)
+    if cull_backfaces:
+        keep &= normal_z > 0
+    visible = np.flatnonzero(keep)
+    counts = box_w[visible] * box_h[visible]
+
+    ends = np.cumsum(counts)
+    batch_start = 0
+    while batch_start < len(visible):
+        # Whole triangles, at least one, up to about RASTER_FRAGMENT_CHUNK fragments
+        limit = ends[batch_start] - counts[batch_start] + RASTER_FRAGMENT_CHUNK
+        batch_end = max(batch_start + 1, int(np.searchsorted(ends, limit, side='right')))
+        batch_counts = counts[batch_start:batch_end]
+        tri = np.repeat(visible[batch_start:batch_end], batch_counts)
+        batch_start = batch_end
+
+        # Candidate pixels, row by row through each triangle's box
+        offsets = np.arange(len(tri)) - np.repeat(np.cumsum(batch_counts) - batch_counts, batch_counts)
+        px = x_min[tri] + offsets % box_w[tri]
+        py = y_min[tri] + offsets // box_w[tri]
+        # In the vertices' precision (float32 halves the traffic of these arrays)
+        sx, sy = px.astype(view.dtype) + 0.5, py.astype(view.dtype) + 0.5
+
+        # Barycentric coordinates of the pixel centers
+        x0, x1, x2 = tri_x[tri, 0], tri_x[tri, 1], tri_x[tri, 2]
+        y0, y1, y2 = tri_y[tri, 0], tri_y[tri, 1], tri_y[tri, 2]
+        w_a = ((x2 - x1) * (sy - y1) - (y2 - y1) * (sx - x1)) / area[tri]
+        w_b = ((x0 - x2) * (sy - y2) - (y0 - y2) * (sx - x2)) / area[tri]
+        w_c = 1.0 - w_a - w_b
+        inside = (w_a >= 0) & (w_b >= 0) & (w_c >= 0)
+
+        tri, pixel = tri[inside], (py * width + px)[inside]
+        depth = (w_a[inside] * tri_z[tri, 0] + w_b[inside] * tri_z[tri, 1] +
+                 w_c[inside] * tri_z[tri, 2])
+
+        # Closest fragment per pixel in this batch, then against earlier batches
+        order = np.lexsort((-depth, pixel))
+        first = order[np.unique(pixel[order], return_index=True)[1]]
+        closer = first[depth[first] > zbuffer[pixel[first]]]
+        zbuffer[pixel[closer]] = depth[closer]
+        image[pixel[closer]] = colors[tri[closer]]
+
+    return image.reshape(height, width, 3)
+
+
+def _save_tiles(canvas: np.ndarray, output_path: str) -> None:
+    """Title the 2x2 grid of FALLBACK_VIEWS tiles in canvas and save it."""
+    from PIL import Image as PILImage, ImageDraw
+
+    tile_w, tile_h = FALLBACK_TILE_SIZE
+    composite = PILImage.fromarray(canvas)
+    draw = ImageDraw.Draw(composite)
+    for idx, (title, _, _) in enumerate(FALLBACK_VIEWS):
+        row, col = divmod(idx, 2)
+        draw.text((col * tile_w + 10, row * tile_h + 8), title, fill=(0, 0, 0))
+    _save_image(composite, output_path, dpi=120)
+
+
+def _resample_filter(size: Tuple[int, int], target: Tuple[int, int]) -> Any:
+    """
+    Resampling filter for resizing an image to target size.
+
+    Lanczos is kept for enlarging. Shrinking by up to 2x looks the same
+    with bilinear filtering, and from 2x on a box filter (area average)
+    does, each at a fraction of the cost.
+    """
+    shrink = max(size[0] / target[0], size[1] / target[1])
+    if shrink >= 2:
+        return Image.Resampling.BOX
+    if shrink > 1:
+        return Image.Resampling.BILINEAR
+    return Image.Resampling.LANCZOS
+
+
+def _render_trimesh_gl(mesh, output_path: str) -> str:
+    """
+    Render FALLBACK_VIEWS with trimesh's own OpenGL viewer (pyglet, offscreen).
+
+    Used when pyrender fails: trimesh's viewer may still get a GL context
+    where pyrender's EGL/OSMesa setup doesn't, and it is far faster than
+    rasterizing on the CPU.
 
     Args:
         mesh: Trimesh object
@@ -363,88 +749,135 @@ def _render_matplotlib_fallback(mesh, output_path: str) -> str:
     Returns:
         Path to saved image
     """
-    import time
-    import matplotlib.pyplot as plt
-    from mpl_toolkits.mplot3d import Axes3D
-    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+    from PIL import Image as PILImage
+
+    tile_w, tile_h = FALLBACK_TILE_SIZE
+    canvas = np.empty((2 * tile_h, 2 * tile_w, 3), dtype=np.uint8)
+    scene = mesh.scene()
+
+    # Camera far enough back for the mesh's bounding sphere to fit the view
+    center = np.asarray(mesh.centroid)
+    scale = np.ptp(mesh.bounds, axis=0).max() / 2
+    distance = scale * np.sqrt(3) / np.tan(np.radians(min(scene.camera.fov)) / 2)
+
+    for idx, (title, azim, elev) in enumerate(FALLBACK_VIEWS):
+        rotation = _view_rotation(azim, elev)
+        # Camera-to-world: columns are screen right, up and back (the camera looks down -z)
+        transform = MeshRenderer._IDENTITY.astype(np.float64)
+        transform[:3, :3] = rotation.T
+        transform[:3, 3] = center + rotation[2] * distance
+        scene.camera_transform = transform
+
+        png = scene.save_image(resolution=(tile_w, tile_h), visible=False)
+        tile = PILImage.open(io.BytesIO(png)).convert('RGB')
+        if tile.size != (tile_w, tile_h):
+            tile = tile.resize((tile_w, tile_h), _resample_filter(tile.size, (tile_w, tile_h)))
+        row, col = divmod(idx, 2)
+        canvas[row * tile_h:(row + 1) * tile_h, col * tile_w:(col + 1) * tile_w] = \
+            np.asarray(tile, dtype=np.uint8)
+
+    _save_tiles(canvas, output_path)
+    return output_path
+
+
+def _render_software_fallback(mesh, output_path: str) -> str:
+    """
+    Fallback renderer drawing four views with a NumPy z-buffer rasterizer.
+    Used when pyrender is unavailable or fails.
+
+    Args:
+        mesh: Trimesh object
+        output_path: Path to save the rendered image
 
+    Returns:
+        Path to saved image
+    """
+    # Per-view timings are only measured when someone will read them
+    timed = logger.isEnabledFor(logging.DEBUG)
     start = time.time()
-    print(f"[MATPLOTLIB] Starting render...")
 
     # Simplify mesh if it has too many faces (optimization)
     original_faces = len(mesh.faces)
-    if original_faces > 5000:
-        print(f"[MATPLOTLIB] Simplifying mesh ({original_faces} faces -> ~2500 faces)...")
-        simplify_start = time.time()
+    if original_faces > FALLBACK_MAX_FACES:
         try:
-            # Simplify to approximately 2500 faces for faster rendering
-            mesh = mesh.simplify_quadric_decimation(2500)
-            print(f"[MATPLOTLIB] Simplified to {len(mesh.faces)} faces ({time.time() - simplify_start:.2f}s)")
+            # Decimated copies are cached next to the output image
+            mesh = _simplify_cached(mesh, FALLBACK_TARGET_FACES,
+                                    os.path.dirname(os.path.abspath(output_path)))
+            logger.debug("[SOFTWARE] Simplified %d faces to %d (%.2fs)",
+                         original_faces, len(mesh.faces), time.time() - start)
         except Exception as e:
-            print(f"[MATPLOTLIB] Simplification failed, using original mesh: {e}")
-
-    # Reduced figure size for faster rendering (10x7.5 instead of 12x9)
-    fig = plt.figure(figsize=(10, 7.5))
-    print(f"[MATPLOTLIB] Creating 4 views...")
-
-    # Create 4 subplots for different views
-    views = [
-        (1, 'Front View', (0, 0)),
-        (2, 'Side View', (90, 0)),
-        (3, 'Top View', (0, 90)),
-        (4, '3/4 View', (45, 45))
-    ]
-
-    for idx, title, (azim, elev) in views:
-        view_start = time.time()
-        ax = fig.add_subplot(2, 2, idx, projection='3d')
-
-        # Create mesh collection with no edges for faster rendering
-        mesh_collection = Poly3DCollection(
-            mesh.vertices[mesh.faces],
-            alpha=0.95,
-            facecolor='#D4A76A',  # Bronze color
-            edgecolor='none',  # No edges = faster rendering
-            linewidths=0
-        )
-        ax.add_collection3d(mesh_collection)
-
-        # Set limits
-        scale = np.ptp(mesh.bounds, axis=0).max() / 2
-        center = mesh.centroid
-        ax.set_xlim(center[0] - scale, center[0] + scale)
-        ax.set_ylim(center[1] - scale, center[1] + scale)
-        ax.set_zlim(center[2] - scale, center[2] + scale)
-
-        # Set view angle
-        ax.view_init(elev=elev, azim=azim)
-        ax.set_title(title, fontsize=9, pad=3)
-
-        # Minimal axes for faster rendering
-        ax.set_axis_off()  # Hide axes completely for speed
-
-        print(f"[MATPLOTLIB] {title}: {time.time() - view_start:.2f}s")
-
-    print(f"[MATPLOTLIB] Saving image...")
-    save_start = time.time()
-    plt.tight_layout(pad=0.5)
-    # Reduced DPI from 150 to 120 for faster save
-    plt.savefig(output_path, dpi=120, bbox_inches='tight', facecolor='white')
-    print(f"[MATPLOTLIB] Save complete: {time.time() - save_start:.2f}s")
-    plt.close()
-
-    total = time.time() - start
-    print(f"[MATPLOTLIB] Total rendering time: {total:.2f}s")
+            logger.warning("[SOFTWARE] Simplification failed, using original mesh: %s", e)
+
+    tile_w, tile_h = FALLBACK_TILE_SIZE
+    canvas = np.empty((2 * tile_h, 2 * tile_w, 3), dtype=np.uint8)
+    faces = np.asarray(mesh.faces)
+
+    # A closed, outward-facing mesh hides its back faces: skip them (about half)
+    cull_backfaces = bool(mesh.is_volume)
+
+    # Same center and limits in every view
+    center = np.asarray(mesh.centroid)
+    scale = float(np.ptp(mesh.bounds, axis=0).max()) * 0.5
+
+    # The geometry is the same in every view: rotate it into all views at once
+    rotations = np.stack([_view_rotation(azim, elev) for _, azim, elev in FALLBACK_VIEWS])
+    # float32 is ample for a few hundred pixels and halves the memory traffic
+    views = _project_views(np.asarray(mesh.vertices, dtype=np.float32),
+                           center.astype(np.float32), rotations.astype(np.float32))
+
+    for idx, (title, azim, elev) in enumerate(FALLBACK_VIEWS):
+        if timed:
+            view_start = time.time()
+        row, col = divmod(idx, 2)
+        canvas[row * tile_h:(row + 1) * tile_h, col * tile_w:(col + 1) * tile_w] = _rasterize(
+            views[idx], faces, scale, (tile_w, tile_h), cull_backfaces)
+        if timed:
+            logger.debug("[SOFTWARE] %s: %.2fs", title, time.time() - view_start)
+
+    _save_tiles(canvas, output_path)
+    logger.debug("[SOFTWARE] Total rendering time: %.2fs", time.time() - start)
 
     return output_path
 
 
 def get_mesh_renderer(width: int = 800, height: int = 600) -> MeshRenderer:
-    """Get or create global mesh renderer."""
-    global _renderer
-    if _renderer is None:
-        _renderer = MeshRenderer(width, height)
-    return _renderer
+    """
+    Get or create the mesh renderer of the calling thread.
+
+    Each request thread gets its own instance (and light cache), so
+    concurrent reports don't contend on one shared renderer.
+    """
+    renderer = getattr(_renderer_tls, 'inst', None)
+    if renderer is None:
+        renderer = MeshRenderer(width, height)
+        _renderer_tls.inst = renderer
+    return renderer
+
+
+def reset_renderer() -> None:
+    """
+    Release GL contexts and forget the calling thread's renderer.
+
+    Call before forking worker processes: a child that inherits a live
+    EGL/GPU context can crash when it uses or tears it down. Renderers
+    and contexts are recreated on the next render.
+    """
+    release_render_contexts()
+    _renderer_tls.__dict__.pop('inst', None)
+
+
+def _link_render(render_path: str, output_path: str) -> None:
+    """Point output_path at an existing render (symlink, or a copy where unsupported)."""
+    if render_path == output_path:
+        return  # rendered under the artifact ID itself
+    if os.path.lexists(output_path) and not os.path.exists(output_path):
+        os.remove(output_path)  # dangling link to a deleted render
+    try:
+        os.symlink(os.path.basename(render_path), output_path)
+    except FileExistsError:
+        pass  # linked concurrently
+    except OSError:
+        shutil.copyfile(render_path, output_path)
 
 
 def render_artifact_image(mesh, artifact_id: str, output_dir: str = '/tmp') -> Optional[str]:
@@ -459,32 +892,53 @@ def render_artifact_image(mesh, artifact_id: str, output_dir: str = '/tmp') -> O
     Returns:
         Path to saved image, or None if rendering failed
     """
-    import time
-    start = time.time()
-
     # Check if image is already cached
     output_path = os.path.join(output_dir, f"render_{artifact_id}.png")
     if os.path.exists(output_path):
-        elapsed = time.time() - start
-        print(f"[3D RENDER] {artifact_id} - Using cached render ({elapsed:.2f}s)")
+        logger.debug("[3D RENDER] %s - Using cached render", artifact_id)
+        return output_path
+
+    start = time.time()
+
+    # Renders are stored by geometry, so the same mesh under another ID isn't rendered
+    # again. Objects without plain vertex/face arrays (e.g. a trimesh.Scene) are
+    # rendered under their ID alone.
+    try:
+        render_path = os.path.join(output_dir, f"render_{_geometry_key(mesh)}.png")
+    except Exception:
+        render_path = output_path
+    if render_path != output_path and os.path.exists(render_path):
+        _link_render(render_path, output_path)
+        logger.debug("[3D RENDER] %s - Using cached render of identical mesh (%.2fs)",
+                     artifact_id, time.time() - start)
         return output_path
 
     try:
-        print(f"[3D RENDER] {artifact_id} - Attempting pyrender...")
+        logger.debug("[3D RENDER] %s - Attempting pyrender", artifact_id)
         renderer = get_mesh_renderer()
-        result = renderer.render_mesh_views(mesh, output_path, lighting='archaeological')
-        elapsed = time.time() - start
-        print(f"[3D RENDER] {artifact_id} - ✓ Pyrender success ({elapsed:.2f}s)")
-        return result
+        renderer.render_mesh_views(mesh, render_path, lighting='archaeological')
+        _link_render(render_path, output_path)
+        logger.info("[3D RENDER] %s - Pyrender success (%.2fs)", artifact_id, time.time() - start)
+        return output_path
     except Exception as e:
-        print(f"[3D RENDER] {artifact_id} - Pyrender failed: {e}")
-        print(f"[3D RENDER] {artifact_id} - Attempting matplotlib fallback...")
-        try:
-            result = _render_matplotlib_fallback(mesh, output_path)
-            elapsed = time.time() - start
-            print(f"[3D RENDER] {artifact_id} - ✓ Matplotlib fallback success ({elapsed:.2f}s)")
-            return result
-        except Exception as e2:
-            elapsed = time.time() - start
-            print(f"[3D RENDER] {artifact_id} - ✗ Both renderers failed ({elapsed:.2f}s): {e2}")
-            return None
+        logger.warning("[3D RENDER] %s - Pyrender failed: %s", artifact_id, e)
+
+    try:
+        logger.debug("[3D RENDER] %s - Attempting trimesh OpenGL viewer", artifact_id)
+        _render_trimesh_gl(mesh, render_path)
+        _link_render(render_path, output_path)
+        logger.info("[3D RENDER] %s - Trimesh OpenGL success (%.2fs)", artifact_id, time.time() - start)
+        return output_path
+    except Exception as e:
+        logger.warning("[3D RENDER] %s - Trimesh OpenGL failed: %s", artifact_id, e)
+
+    logger.debug("[3D RENDER] %s - Attempting software fallback", artifact_id)
+    try:
+        _render_software_fallback(mesh, render_path)
+        _link_render(render_path, output_path)
+        logger.info("[3D RENDER] %s - Software fallback success (%.2fs)", artifact_id, time.time() - start)
+        return output_path
+    except Exception as e:
+        logger.error("[3D RENDER] %s - All renderers failed (%.2fs): %s",
+                     artifact_id, time.time() - start, e)
+        return None
@@ -6,17 +6,38 @@ Learns from validated classifications to improve predictions.
 """
 
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.inspection import permutation_importance
 from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import cross_val_score, train_test_split
+from sklearn.base import clone
+from sklearn.model_selection import check_cv, train_test_split
 from sklearn.metrics import classification_report, confusion_matrix
 import joblib
+from joblib import Parallel, delayed
 import os
 import json
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional, Any
 
 
+# Layout of saved models: the estimator pickled at the model path, a legacy
+# model's scaler as .npy arrays and everything else as JSON next to it (see save_model)
+MODEL_FORMAT_VERSION = 2
+
+
+def _fit_fold(model, X: np.ndarray, y: np.ndarray, train: np.ndarray,
+              test: Optional[np.ndarray] = None):
+    """Fit a copy of model on the train rows; returns it and its accuracy on the test rows."""
+    model = clone(model).fit(X[train], y[train])
+    score = None if test is None else model.score(X[test], y[test])
+    return model, score
+
+
+def _model_sidecar(path: str, suffix: str) -> str:
+    """Path of a file saved alongside the model, e.g. acs_ml_model.meta.json."""
+    return f"{os.path.splitext(path)[0]}.{suffix}"
+
+
 class MLArtifactClassifier:
     """
     Machine Learning classifier that learns from validated archaeological classifications.
@@ -31,9 +52,15 @@ class MLArtifactClassifier:
     def __init__(self, model_path: str = None):
         """Initialize ML classifier."""
         self.model = None
-        self.scaler = StandardScaler()
+        # Feature scaling, only for models saved before tree models (all that
+        # train builds) stopped standardizing their input
+        self.scaler = None
+        self._uses_scaler = False
+        self._mean = self._inv_scale = None  # fitted scaler as float32 arrays (see _scale)
         self.feature_names = []
+        self._name_to_col = {}  # feature name -> column of the feature matrix
         self.class_labels = []
+        self.feature_importances = None  # one score per feature, in feature_names order
         self.is_trained = False
         self.training_history = []
         self.model_path = model_path or 'acs_ml_model.pkl'
@@ -63,9 +90,10 @@ class MLArtifactClassifier:
 
         # Extract features and labels
         X, y, self.feature_names = self._prepare_data(training_data)
+        self._name_to_col = {name: j for j, name in enumerate(self.feature_names)}
 
-        # Store class labels
-        self.class_labels = list(set(y))
+        # Store class labels, sorted like the model's classes_ (the columns of predict_proba)
+        self.class_labels = sorted(set(y))
 
         if len(self.class_labels) < 2:
             return {
@@ -78,10 +106,6 @@ class MLArtifactClassifier:
             X, y, test_size=validation_split, random_state=42, stratify=y
         )
 
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_val_scaled = self.scaler.transform(X_val)
-
         # Initialize model
         if algorithm == 'random_forest':
             self.model = RandomForestClassifier(
@@ -92,41 +116,50 @@ class MLArtifactClassifier:
                 n_jobs=-1
             )
         elif algorithm == 'gradient_boosting':
-            self.model = GradientBoostingClassifier(
-                n_estimators=100,
+            # Histogram-based boosting: bins each feature once and finds splits
+            # over the bins on all cores, much faster than GradientBoostingClassifier
+            self.model = HistGradientBoostingClassifier(
+                max_iter=100,
                 max_depth=5,
                 learning_rate=0.1,
+                min_samples_leaf=5,  # the default of 20 can't split collections of a few dozen
                 random_state=42
             )
         else:
             return {'error': f'Unknown algorithm: {algorithm}'}
 
-        # Train model
-        self.model.fit(X_train_scaled, y_train)
+        # Trees compare one feature at a time with a threshold, so scaling can't
+        # change them: features are passed as they are. X is float32, which
+        # trees split on anyway, so fitting needs no converted copy.
+        self.scaler = None
+        self._uses_scaler = False
+        self._mean = self._inv_scale = None
+
+        # Train the model and the cross-validation folds (the folds
+        # cross_val_score would use) in one pool, so the final fit runs
+        # alongside the folds instead of before them. joblib keeps the worker
+        # processes alive between calls: only the first training starts them.
+        y_train = np.asarray(y_train)
+        cv = check_cv(min(5, len(X_train)//2), y_train, classifier=True)
+        folds = list(cv.split(X_train, y_train))
+        fits = Parallel(n_jobs=min(len(folds) + 1, joblib.cpu_count()))(
+            delayed(_fit_fold)(self.model, X_train, y_train, train, test)
+            for train, test in [(np.arange(len(y_train)), None)] + folds
+        )
+        self.model = fits[0][0]
+        cv_scores = np.array([score for _, score in fits[1:]])
         self.is_trained = True
 
         # Evaluate
-        train_score = self.model.score(X_train_scaled, y_train)
-        val_score = self.model.score(X_val_scaled, y_val)
-
-        # Cross-validation
-        cv_scores = cross_val_score(
-            self.model, X_train_scaled, y_train, cv=min(5, len(X_train)//2)
-        )
+        train_score = self.model.score(X_train, y_train)
+        val_score = self.model.score(X_val, y_val)
 
         # Predictions on validation set
-        y_pred = self.model.predict(X_val_scaled)
+        y_pred = self.model.predict(X_val)
 
         # Feature importance
-        feature_importance = dict(zip(
-            self.feature_names,
-            self.model.feature_importances_
-        ))
-        feature_importance = dict(sorted(
-            feature_importance.items(),
-            key=lambda x: x[1],
-            reverse=True
-        ))
+        self.feature_importances = self._compute_importances(X_val, y_val)
+        feature_importance = self.get_feature_importance()
 
         # Store training history
         training_record = {
@@ -164,27 +197,80 @@ class MLArtifactClassifier:
             )
         }
 
+    def _compute_importances(self, X_val: np.ndarray, y_val: List[str]) -> np.ndarray:
+        """
+        Importance of each feature to the trained model, summing to 1.
+
+        Random forests provide impurity-based importances. Histogram gradient
+        boosting has none, so the drop in validation accuracy when a feature
+        is shuffled is used instead.
+        """
+        if hasattr(self.model, 'feature_importances_'):
+            return np.asarray(self.model.feature_importances_, dtype=float)
+
+        result = permutation_importance(self.model, X_val, y_val, n_repeats=5, random_state=42)
+        importances = np.clip(result.importances_mean, 0, None)
+        total = importances.sum()
+        return importances / total if total > 0 else importances
+
     def _prepare_data(self, training_data: List[Dict]) -> Tuple[np.ndarray, List[str], List[str]]:
-        """Prepare training data for ML."""
-        # Collect all feature names
-        feature_names_set = set()
-        for sample in training_data:
-            feature_names_set.update(sample['features'].keys())
+        """
+        Prepare training data for ML.
+
+        Columns are the sorted union of numeric feature names; features a
+        sample lacks stay 0.0. Only the features each sample has are visited.
+        """
+        feature_names = sorted({
+            name for sample in training_data
+            for name, value in sample['features'].items() if isinstance(value, (int, float))
+        })
+        column = {name: j for j, name in enumerate(feature_names)}
+
+        X = np.zeros((len(training_data), len(feature_names)), dtype=np.float32)
+        for i, sample in enumerate(training_data):
+            for name, value in sample['features'].items():
+                j = column.get(name)
+                if j is not None and isinstance(value, (int, float)):
+                    X[i, j] = value
+
+        y = [sample['class_label'] for sample in training_data]
 
-        feature_names = sorted(list(feature_names_set))
+        return X, y, feature_names
 
-        # Build feature matrix
-        X = []
-        y = []
+    def _cache_scaling(self):
+        """Cache the fitted scaler's mean and reciprocal scale for _scale."""
+        self._mean = np.asarray(self.scaler.mean_, dtype=np.float32)
+        self._inv_scale = np.reciprocal(np.asarray(self.scaler.scale_, dtype=np.float32))
 
-        for sample in training_data:
-            features = sample['features']
-            # Create feature vector with consistent ordering
-            feature_vector = [features.get(fname, 0.0) for fname in feature_names]
-            X.append(feature_vector)
-            y.append(sample['class_label'])
+    def _scale(self, X: np.ndarray) -> np.ndarray:
+        """
+        Standardize a float32 feature matrix in place.
+
+        Same result as scaler.transform, without sklearn's input validation,
+        which costs more than the arithmetic on the few rows predict scores.
+        """
+        np.subtract(X, self._mean, out=X)
+        X *= self._inv_scale
+        return X
 
-        return np.array(X), y, feature_names
+    def _feature_rows(self, feature_dicts: List[Dict[str, float]]) -> np.ndarray:
+        """
+        Feature matrix of the given samples in the trained model's column order.
+
+        Rows are filled as Python lists, whose item assignment is several times
+        cheaper than an array's, then converted to float32 in one call.
+        """
+        column = self._name_to_col
+        n_features = len(self.feature_names)
+        rows = []
+        for features in feature_dicts:
+            row = [0.0] * n_features
+            for name, value in features.items():
+                j = column.get(name)
+                if j is not None and isinstance(value, (int, float)):
+                    row[j] = value
+            rows.append(row)
+        return np.array(rows, dtype=np.float32).reshape(len(rows), n_features)
 
     def predict(self, features: Dict[str, float]) -> Dict:
         """
@@ -203,15 +289,14 @@ class MLArtifactClassifier:
             }
 
         # Prepare feature vector
-        feature_vector = [features.get(fname, 0.0) for fname in self.feature_names]
-        X = np.array([feature_vector])
+        X = self._feature_rows([features])
 
         # Scale
-        X_scaled = self.scaler.transform(X)
+        X_scaled = self._scale(X) if self._uses_scaler else X
 
-        # Predict
-        prediction = self.model.predict(X_scaled)[0]
+        # Predict (the predicted class is the most probable one)
         probabilities = self.model.predict_proba(X_scaled)[0]
+        prediction = self.class_labels[int(np.argmax(probabilities))]
 
         # Get top 3 predictions
         top_indices = np.argsort(probabilities)[::-1][:3]
@@ -233,6 +318,48 @@ class MLArtifactClassifier:
             }
         }
 
+    def predict_batch(self, features_list: List[Dict[str, float]]) -> List[Dict]:
+        """
+        Predict classes for many artifacts at once.
+
+        Scales and scores all samples in one model call instead of one per
+        artifact.
+
+        Args:
+            features_list: Feature dictionaries
+
+        Returns:
+            Prediction results in input order, as returned by predict
+        """
+        if not self.is_trained:
+            return [{'error': 'Model not trained yet', 'prediction': None} for _ in features_list]
+        if not features_list:
+            return []
+
+        X_scaled = self._feature_rows(features_list)
+        if self._uses_scaler:
+            self._scale(X_scaled)
+        probabilities = self.model.predict_proba(X_scaled)
+
+        # Top 3 per row: partition out the three largest, then sort just those
+        k = min(3, probabilities.shape[1])
+        top = np.argpartition(-probabilities, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(probabilities, top, axis=1), axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+
+        results = []
+        for row, top_indices in zip(probabilities.tolist(), top.tolist()):
+            results.append({
+                'prediction': self.class_labels[top_indices[0]],
+                'confidence': row[top_indices[0]],
+                'top_predictions': [
+                    {'class': self.class_labels[idx], 'confidence': row[idx]}
+                    for idx in top_indices
+                ],
+                'all_probabilities': dict(zip(self.class_labels, row))
+            })
+        return results
+
     def explain_prediction(self, features: Dict[str, float], prediction_result: Dict = None) -> Dict:
         """
         Explain why a particular prediction was made.
@@ -250,18 +377,8 @@ class MLArtifactClassifier:
         if prediction_result is None:
             prediction_result = self.predict(features)
 
-        # Get feature importance
-        feature_importance = dict(zip(
-            self.feature_names,
-            self.model.feature_importances_
-        ))
-
-        # Sort by importance
-        sorted_features = sorted(
-            feature_importance.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:5]  # Top 5 most important features
+        # Top 5 features by importance
+        sorted_features = list(self.get_feature_importance().items())[:5]
 
         # Get actual feature values
         feature_values = {
@@ -337,8 +454,11 @@ class MLArtifactClassifier:
         if not self.is_trained:
             return {'error': 'Model not trained yet'}
 
-        X_test, y_test, _ = self._prepare_data(test_data)
-        X_test_scaled = self.scaler.transform(X_test)
+        # Columns as in training, whatever features the test samples have
+        X_test_scaled = self._feature_rows([sample['features'] for sample in test_data])
+        y_test = [sample['class_label'] for sample in test_data]
+        if self._uses_scaler:
+            self._scale(X_test_scaled)
 
         # Predictions
         y_pred = self.model.predict(X_test_scaled)
@@ -375,30 +495,71 @@ class MLArtifactClassifier:
         }
 
     def save_model(self, path: str):
-        """Save model to disk."""
-        model_data = {
-            'model': self.model,
-            'scaler': self.scaler,
+        """
+        Save model to disk.
+
+        Only the estimator is pickled (at path). The feature names, labels and
+        history are saved as JSON, which loads far faster than unpickling them,
+        and a legacy model's scaler statistics as float32 .npy arrays.
+        """
+        joblib.dump(self.model, path)
+
+        if self._uses_scaler and self._mean is not None:
+            np.save(_model_sidecar(path, 'mean.npy'), self._mean)
+            np.save(_model_sidecar(path, 'scale.npy'),
+                    np.asarray(self.scaler.scale_, dtype=np.float32))
+
+        meta = {
+            'version': MODEL_FORMAT_VERSION,
             'feature_names': self.feature_names,
             'class_labels': self.class_labels,
+            'uses_scaler': self._uses_scaler,
+            'feature_importances': (None if self.feature_importances is None
+                                    else self.feature_importances.tolist()),
             'is_trained': self.is_trained,
             'training_history': self.training_history
         }
-
-        joblib.dump(model_data, path)
+        with open(_model_sidecar(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
 
     def load_model(self, path: str):
-        """Load model from disk."""
+        """Load model from disk (also models saved as one pickled dict)."""
         if not os.path.exists(path):
             return False
 
         try:
-            model_data = joblib.load(path)
+            meta_path = _model_sidecar(path, 'meta.json')
+            if os.path.exists(meta_path):
+                with open(meta_path) as f:
+                    model_data = json.load(f)
+                model_data['model'] = joblib.load(path)
+                model_data['scaler'] = None
+                if model_data['is_trained'] and model_data.get('uses_scaler', True):
+                    scaler = model_data['scaler'] = StandardScaler()
+                    # Arrays of a few dozen floats: read them outright rather than
+                    # memory-map them (a later save would truncate a mapped file)
+                    scaler.mean_ = np.load(_model_sidecar(path, 'mean.npy'))
+                    scaler.scale_ = np.load(_model_sidecar(path, 'scale.npy'))
+                    scaler.var_ = scaler.scale_ ** 2
+                    scaler.n_features_in_ = len(scaler.mean_)
+            else:
+                model_data = joblib.load(path)
 
             self.model = model_data['model']
             self.scaler = model_data['scaler']
+            # Models saved before tree models skipped the scaler were trained on scaled features
+            self._uses_scaler = model_data.get('uses_scaler', True)
+            if model_data['is_trained'] and self._uses_scaler:
+                self._cache_scaling()
             self.feature_names = model_data['feature_names']
-            self.class_labels = model_data['class_labels']
+            self._name_to_col = {name: j for j, name in enumerate(self.feature_names)}
+            # Models saved before labels were sorted: take the order of predict_proba
+            self.class_labels = list(getattr(self.model, 'classes_', model_data['class_labels']))
+            importances = model_data.get('feature_importances')
+            if importances is None:  # saved before importances were stored
+                importances = getattr(self.model, 'feature_importances_', None)
+            self.feature_importances = (None if importances is None
+                                        else np.asarray(importances, dtype=float))
             self.is_trained = model_data['is_trained']
             self.training_history = model_data.get('training_history', [])
 
@@ -409,12 +570,12 @@ class MLArtifactClassifier:
 
     def get_feature_importance(self) -> Dict:
         """Get feature importance scores."""
-        if not self.is_trained or not hasattr(self.model, 'feature_importances_'):
+        if not self.is_trained or self.feature_importances is None:
             return {}
 
         importance = dict(zip(
             self.feature_names,
-            self.model.feature_importances_
+            self.feature_importances.tolist()
         ))
 
         return dict(sorted(importance.items(), key=lambda x: x[1], reverse=True))
@@ -0,0 +1,689 @@
+"""Tests for SQLite artifact database."""
+
+import threading
+
+import pytest
+from acs.core.database import ArtifactDatabase, _artifact_count
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Fresh database in a temporary directory."""
+    database = ArtifactDatabase(str(tmp_path / "test.db"))
+    yield database
+    database.close()
+
+
+def test_connection_is_reused_per_thread(db):
+    """Test that a thread reuses its connection and other threads get their own."""
+    with db.get_connection() as conn1:
+        pass
+    with db.get_connection() as conn2:
+        pass
+
+    assert conn1 is conn2
+
+    other = []
+
+    def worker():
+        with db.get_connection() as conn:
+            other.append(conn)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+
+    assert other[0] is not conn1
+
+
+def test_wal_mode_enabled(db):
+    """Test that the database runs in WAL journal mode and waits on locks."""
+    with db.get_connection() as conn:
+        mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+        busy_timeout = conn.execute('PRAGMA busy_timeout').fetchone()[0]
+
+    assert mode == 'wal'
+    assert busy_timeout == 5000
+
+
+def test_failed_block_is_rolled_back(db):
+    """Test that an exception inside get_connection rolls back its writes."""
+    with pytest.raises(RuntimeError):
+        with db.get_connection() as conn:
+            conn.execute("INSERT INTO artifacts (artifact_id) VALUES ('AXE_1')")
+            raise RuntimeError("boom")
+
+    assert db.get_artifact('AXE_1') is None
+
+
+def test_artifact_roundtrip(db):
+    """Test artifact insert, lookup and delete."""
+    db.add_artifact('AXE_1', '/tmp/axe1.obj', 100, 200, True, metadata={'site': 'Savignano'})
+
+    artifact = db.get_artifact('AXE_1')
+    assert artifact['n_vertices'] == 100
+    assert artifact['is_watertight'] == 1
+
+    assert db.delete_artifact('AXE_1')
+    assert db.get_artifact('AXE_1') is None
+    assert not db.delete_artifact('AXE_1')
+
+
+def test_features_roundtrip(db):
+    """Test numeric and nested (stylistic) features are stored and retrieved."""
+    db.add_artifact('AXE_1', '/tmp/axe1.obj', 100, 200, True)
+    db.add_features('AXE_1', {
+        'volume': 145.0,
+        'length': 120,
+        'savignano': {'socket_depth': 12.5, 'has_flanges': True},
+    })
+
+    features = db.get_features('AXE_1')
+    assert features['volume'] == 145.0
+    assert features['length'] == 120.0
+    assert features['savignano'] == {'socket_depth': 12.5, 'has_flanges': True}
+
+    # Re-adding overwrites same-named values and keeps the others
+    db.add_features('AXE_1', {'volume': 150.0, 'savignano': {'socket_depth': 13.0}})
+    assert db.get_features('AXE_1') == {
+        'volume': 150.0, 'length': 120.0, 'savignano': {'socket_depth': 13.0}
+    }
+
+
+def test_features_accept_numpy_values(db):
+    """Test numpy scalars and arrays are stored without manual conversion."""
+    import numpy as np
+
+    db.add_artifact('AXE_1', '/tmp/axe1.obj', 100, 200, True)
+    db.add_features('AXE_1', {
+        'volume': np.float64(145.5),
+        'n_holes': np.int64(2),
+        'savignano': {'profile': np.array([1.0, 2.0]), 'is_symmetric': np.bool_(True)},
+    })
+
+    features = db.get_features('AXE_1')
+    assert features['volume'] == 145.5
+    assert features['n_holes'] == 2.0
+    assert features['savignano'] == {'profile': [1.0, 2.0], 'is_symmetric': True}
+
+
+def test_delete_artifact_cascades(db):
+    """Test deleting an artifact removes its dependent rows but not other artifacts'."""
+    for artifact_id in ('AXE_1', 'AXE_2'):
+        db.add_artifact(artifact_id, f'/tmp/{artifact_id}.obj', 100, 200, True)
+        db.add_features(artifact_id, {'volume': 145.0, 'savignano': {'socket_depth': 12.5}})
+        db.add_classification(artifact_id, 'C1', 'Class 1', 0.9)
+        db.add_training_sample(artifact_id, 'Class 1', {'volume': 145.0})
+    db.save_comparison('AXE_1', 'AXE_2', 0.8, {'method': 'chamfer'})
+
+    assert db.delete_artifact('AXE_1')
+
+    assert db.get_features('AXE_1') == {}
+    assert db.get_classifications('AXE_1') == []
+    assert db.get_comparison('AXE_1', 'AXE_2') is None
+    assert [s['artifact_id'] for s in db.get_training_data()] == ['AXE_2']
+    assert db.get_features('AXE_2')['volume'] == 145.0
+
+
+def test_replacing_artifact_keeps_features(db):
+    """Test INSERT OR REPLACE in add_artifact doesn't trigger the delete cascade."""
+    db.add_artifact('AXE_1', '/tmp/axe1.obj', 100, 200, True)
+    db.add_features('AXE_1', {'volume': 145.0})
+
+    db.add_artifact('AXE_1', '/tmp/axe1.obj', 120, 240, True)
+
+    assert db.get_features('AXE_1') == {'volume': 145.0}
+
+
+def test_project_statistics(db):
+    """Test project statistics count artifacts and (validated) classifications."""
+    db.add_artifact('AXE_1', '/tmp/axe1.obj', 100, 200, True, project_id='P1')
+    db.add_artifact('AXE_2', '/tmp/axe2.obj', 100, 200, True, project_id='P1')
+    db.add_artifact('AXE_3', '/tmp/axe3.obj', 100, 200, True, project_id='P2')
+    db.add_classification('AXE_1', 'C1', 'Class 1', 0.9, validated=True)
+    db.add_classification('AXE_2', 'C1', 'Class 1', 0.7)
+    db.add_classification('AXE_3', 'C1', 'Class 1', 0.7, validated=True)
+
+    assert db.get_project_statistics('P1') == {
+        'project_id': 'P1',
+        'total_artifacts': 2,
+        'total_classifications': 2,
+        'validated_classifications': 1
+    }
+    assert db.get_project_statistics('EMPTY') == {
+        'project_id': 'EMPTY',
+        'total_artifacts': 0,
+        'total_classifications': 0,
+        'validated_classifications': 0
+    }
+
+
+def test_get_all_features(db):
+    """Test features for all artifacts are grouped by artifact."""
+    db.add_artifact('AXE_1', '/tmp/axe1.obj', 100, 200, True)
+    db.add_artifact('AXE_2', '/tmp/axe2.obj', 100, 200, True)
+    db.add_features('AXE_1', {'volume': 145.0, 'savignano': {'socket_depth': 12.5}})
+    db.add_features('AXE_2', {'volume': 150.0, 'length': 120.0})
+
+    assert db.get_all_features() == {
+        'AXE_1': {'volume': 145.0, 'savignano': {'socket_depth': 12.5}},
+        'AXE_2': {'volume': 150.0, 'length': 120.0},
+    }
+    assert db.get_all_features(include_stylistic=False)['AXE_1'] == {'volume': 145.0}
+
+
+def test_get_all_features_skips_corrupt_payloads(db, monkeypatch):
+    """Test unreadable stylistic payloads are skipped instead of failing the whole read."""
+    pytest.importorskip('msgpack')
+    from acs.core import database
+
+    db.add_artifact('AXE_1', '/tmp/axe1.obj', 100, 200, True)
+    db.add_features('AXE_1', {'volume': 145.0, 'savignano': {'socket_depth': 12.5}})
+    with db.get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO stylistic_features (artifact_id, feature_category, features_json) "
+            "VALUES ('AXE_1', ?, ?)",
+            [('extra_data', b'\x01\x02'), ('truncated', b'\x92\x01'), ('bad_json', '{"socket')]
+        )
+
+    assert db.get_all_features() == {
+        'AXE_1': {'volume': 145.0, 'savignano': {'socket_depth': 12.5}}
+    }
+
+    # Without msgpack, BLOB payloads are skipped too
+    monkeypatch.setattr(database, 'MSGPACK_AVAILABLE', False)
+    assert db.get_all_features() == {'AXE_1': {'volume': 145.0}}
+
+
+def test_timestamps_are_iso_local_time(db):
+    """Test SQLite-generated timestamps keep the ISO-8601 format of existing rows."""
+    from datetime import datetime
+
+    db.add_artifact('AXE_1', '/tmp/axe1.obj', 100, 200, True)
+
+    upload_date = datetime.fromisoformat(db.get_artifact('AXE_1')['upload_date'])
+    assert abs((datetime.now() - upload_date).total_seconds()) < 60
+
+
+def test_add_features_bulk(db):
+    """Test storing a feature matrix for several artifacts."""
+    import numpy as np
+
+    db.add_features('AXE_1', {'old_feature': 1.0, 'savignano': {'socket_depth': 12.5}})
+    matrix = np.array([[145.0, 120.0], [150.0, 122.0]])
+
+    db.add_features_bulk(['AXE_1', 'AXE_2'], matrix, ['volume', 'length'])
+
+    assert db.get_features('AXE_1') == {
+        'old_feature': 1.0, 'volume': 145.0, 'length': 120.0, 'savignano': {'socket_depth': 12.5}
+    }
+    assert db.get_features('AXE_2') == {'volume': 150.0, 'length': 122.0}
+
+    with pytest.raises(ValueError):
+        db.add_features_bulk(['AXE_1'], matrix, ['volume', 'length'])
+
+
+def test_read_cache_invalidated_by_writes(db, tmp_path):
+    """Test cached reads are dropped after writes from any instance or raw SQL."""
+    db.add_artifact('AXE_1', '/tmp/axe1.obj', 100, 200, True)
+    db.add_features('AXE_1', {'volume': 145.0})
+    assert db.get_features('AXE_1') == {'volume': 145.0}
+
+    # Returned values are copies; mutating them doesn't poison the cache
+    db.get_features('AXE_1')['volume'] = 0.0
+    assert db.get_features('AXE_1') == {'volume': 145.0}
+
+    # Another instance on the same file shares the cache
+    other = ArtifactDatabase(str(tmp_path / "test.db"))
+    other.add_features('AXE_1', {'volume': 150.0})
+    assert db.get_features('AXE_1') == {'volume': 150.0}
+
+    # Raw SQL through get_connection also invalidates
+    assert db.get_artifact('AXE_1')['metadata'] is None
+    with other.get_connection() as conn:
+        conn.execute("UPDATE artifacts SET metadata = '{}' WHERE artifact_id = 'AXE_1'")
+    assert db.get_artifact('AXE_1')['metadata'] == '{}'
+
+    other.close()
+
+
+def test_artifacts_paginated(db):
+    """Test pagination totals follow inserts and deletes."""
+    for i in range(5):
+        db.add_artifact(f'AXE_{i}', f'/tmp/axe{i}.obj', 100, 200, True)
+
+    page = db.get_artifacts_paginated(page=2, per_page=2)
+    assert page['total'] == 5
+    assert page['pages'] == 3
+    assert len(page['artifacts']) == 2
+
+    db.delete_artifact('AXE_0')
+    assert db.get_artifacts_paginated(per_page=2)['total'] == 4
+
+
+def test_reads_legacy_json_with_nan(db):
+    """Test payloads written by json.dumps (with NaN literals) are still readable."""
+    db.add_artifact('AXE_1', '/tmp/axe1.obj', 100, 200, True)
+    with db.get_connection() as conn:
+        conn.execute(
+            "INSERT INTO stylistic_features (artifact_id, feature_category, features_json) "
+            "VALUES ('AXE_1', 'savignano', '{\"socket_depth\": NaN}')"
+        )
+
+    depth = db.get_features('AXE_1')['savignano']['socket_depth']
+    assert depth != depth  # NaN
+
+
+def test_get_training_matrix(db):
+    """Test training data is materialized as a dense float32 matrix."""
+    db.add_training_sample('AXE_1', 'TypeA', {'volume': 145.0, 'length': 120.0})
+    db.add_training_sample('AXE_2', 'TypeB', {'volume': 150.0, 'width': 64.0})
+
+    X, y, artifact_ids, feature_names = db.get_training_matrix()
+
+    assert X.dtype.name == 'float32'
+    assert feature_names == ['length', 'volume', 'width']
+    rows = dict(zip(artifact_ids, X.tolist()))
+    assert rows['AXE_1'] == [120.0, 145.0, 0.0]
+    assert rows['AXE_2'] == [0.0, 150.0, 64.0]
+    assert dict(zip(artifact_ids, y)) == {'AXE_1': 'TypeA', 'AXE_2': 'TypeB'}
+
+    X, y, artifact_ids, feature_names = db.get_training_matrix(class_label='TypeB')
+    assert artifact_ids == ['AXE_2']
+    assert feature_names == ['volume', 'width']
+
+
+def test_background_writes_are_visible_to_reads(db, tmp_path):
+    """Test queued comparison/analysis writes are flushed before dependent reads."""
+    data = {'method': 'chamfer'}
+    db.save_comparison('AXE_1', 'AXE_2', 0.8, data)
+    data['method'] = 'mutated after save'
+    db.save_analysis_result('pca', ['AXE_1', 'AXE_2'], {'explained_variance': [0.7, 0.2]})
+
+    # A different instance on the same file sees the writes too
+    other = ArtifactDatabase(str(tmp_path / "test.db"))
+    assert other.get_comparison('AXE_2', 'AXE_1')['comparison_data'] == {'method': 'chamfer'}
+    assert other.get_analysis_results('pca')[0]['results'] == {'explained_variance': [0.7, 0.2]}
+    other.close()
+
+
+def test_failed_background_write_is_logged_and_counted(db, caplog):
+    """Test a failed queued write is logged with its traceback and counted."""
+    def fail(*args):
+        raise ValueError("disk full")
+
+    db._writer.submit(fail)
+    db.save_analysis_result('pca', ['AXE_1'], {'explained_variance': [0.7]})
+    db.flush_writes()
+
+    assert db._writer.failed_writes == 1
+    record = next(r for r in caplog.records if r.message == "Background database write failed")
+    assert record.exc_info[0] is ValueError
+    # Later writes still go through
+    assert db.get_analysis_results('pca')[0]['results'] == {'explained_variance': [0.7]}
+
+
+def test_payloads_stored_as_msgpack_blobs(db):
+    """Test nested payloads are stored as msgpack BLOBs alongside legacy JSON TEXT rows."""
+    pytest.importorskip('msgpack')
+
+    db.add_artifact('AXE_1', '/tmp/axe1.obj', 100, 200, True)
+    db.add_features('AXE_1', {'savignano': {'socket_depth': 12.5}})
+    db.add_training_sample('AXE_1', 'TypeA', {'volume': 145.0})
+    with db.get_connection() as conn:
+        conn.execute(
+            "INSERT INTO stylistic_features (artifact_id, feature_category, features_json) "
+            "VALUES ('AXE_1', 'legacy', '{\"has_flanges\": true}')"
+        )
+        types = [row[0] for row in conn.execute(
+            "SELECT typeof(features_json) FROM stylistic_features ORDER BY feature_category DESC"
+        )]
+
+    assert types == ['blob', 'text']
+    assert db.get_features('AXE_1') == {
+        'savignano': {'socket_depth': 12.5}, 'legacy': {'has_flanges': True}
+    }
+    assert db.get_training_data()[0]['features'] == {'volume': 145.0}
+
+
+def test_comparisons_stored_once_per_pair(db, tmp_path):
+    """Test comparisons are unordered pairs and older duplicate rows are migrated."""
+    db.save_comparison('AXE_2', 'AXE_1', 0.8, {'method': 'chamfer'})
+    db.save_comparison('AXE_1', 'AXE_2', 0.9, {'method': 'icp'})
+
+    comparisons = db.get_all_comparisons()
+    assert len(comparisons) == 1
+    assert (comparisons[0]['artifact1_id'], comparisons[0]['artifact2_id']) == ('AXE_1', 'AXE_2')
+    assert db.get_comparison('AXE_2', 'AXE_1')['similarity_score'] == 0.9
+
+    # Databases created before the pair index kept every run in either orientation
+    with db.get_connection() as conn:
+        conn.execute('PRAGMA user_version = 0')
+        conn.execute('DROP INDEX idx_comparisons_pair')
+        conn.execute('DELETE FROM comparisons')
+        conn.executemany(
+            'INSERT INTO comparisons (artifact1_id, artifact2_id, similarity_score) VALUES (?, ?, ?)',
+            [('AXE_1', 'AXE_2', 0.5), ('AXE_2', 'AXE_1', 0.7), ('AXE_3', 'AXE_1', 0.6)]
+        )
+
+    migrated = ArtifactDatabase(str(tmp_path / "test.db"))
+    pairs = sorted((c['artifact1_id'], c['artifact2_id'], c['similarity_score'])
+                   for c in migrated.get_all_comparisons())
+    assert pairs == [('AXE_1', 'AXE_2', 0.7), ('AXE_1', 'AXE_3', 0.6)]
+    migrated.close()
+
+
+def test_schema_version_skips_initialization(db, tmp_path):
+    """Test an up-to-date database is not re-initialized, and an older one is."""
+    from acs.core.database import SCHEMA_VERSION
+
+    with db.get_connection() as conn:
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+        conn.execute('DROP INDEX idx_artifacts_upload')
+
+    ArtifactDatabase(str(tmp_path / "test.db")).close()
+    with db.get_connection() as conn:
+        assert conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'idx_artifacts_upload'").fetchone() is None
+        conn.execute('PRAGMA user_version = 0')
+
+    ArtifactDatabase(str(tmp_path / "test.db")).close()
+    with db.get_connection() as conn:
+        assert conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'idx_artifacts_upload'").fetchone() is not None
+
+
+def test_training_statistics(db):
+    """Test training statistics count validated samples per class."""
+    db.add_training_sample('AXE_1', 'TypeA', {'volume': 145.0})
+    db.add_training_sample('AXE_2', 'TypeA', {'volume': 150.0})
+    db.add_training_sample('AXE_3', 'TypeB', {'volume': 130.0})
+
+    assert db.get_training_statistics() == {
+        'total_samples': 3,
+        'class_distribution': {'TypeA': 2, 'TypeB': 1},
+        'n_classes': 2
+    }
+
+
+def test_statistics(db):
+    """Test overall statistics count every table in one query."""
+    db.add_artifact('AXE_1', '/tmp/axe1.obj', 100, 200, True)
+    db.add_artifact('AXE_2', '/tmp/axe2.obj', 100, 200, True)
+    db.add_classification('AXE_1', 'C1', 'Class 1', 0.9, validated=True)
+    db.add_classification('AXE_2', 'C1', 'Class 1', 0.7)
+    db.add_training_sample('AXE_1', 'Class 1', {'volume': 145.0})
+    db.save_analysis_result('pca', ['AXE_1', 'AXE_2'], {})
+    db.save_comparison('AXE_1', 'AXE_2', 0.8, {})
+
+    assert db.get_statistics() == {
+        'total_artifacts': 2,
+        'total_classifications': 2,
+        'validated_classifications': 1,
+        'training_samples': 1,
+        'analysis_results': 1,
+        'comparisons': 1
+    }
+
+
+def test_table_counts_follow_writes(db):
+    """Test trigger-maintained row counts match COUNT(*) across replace, upsert and cascade."""
+    db.add_artifact('AXE_1', '/tmp/axe1.obj', 100, 200, True)
+    db.add_artifact('AXE_1', '/tmp/axe1.obj', 120, 240, True)  # INSERT OR REPLACE
+    db.add_artifact('AXE_2', '/tmp/axe2.obj', 100, 200, True)
+    db.add_classification('AXE_1', 'C1', 'Class 1', 0.9)
+    db.add_training_sample('AXE_1', 'Class 1', {'volume': 145.0})
+    db.save_comparison('AXE_1', 'AXE_2', 0.8, {})
+    db.save_comparison('AXE_2', 'AXE_1', 0.9, {})  # upsert
+    db.delete_artifact('AXE_1')
+    db.flush_writes()
+
+    with db.get_connection() as conn:
+        counts = dict(conn.execute('SELECT table_name, row_count FROM table_counts').fetchall())
+        for table, count in counts.items():
+            assert count == conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0], table
+
+    assert counts['artifacts'] == 1
+    assert db.get_statistics()['total_artifacts'] == 1
+
+
+def test_read_connection_skips_transaction(db):
+    """Test reads run without an explicit transaction but see enclosing uncommitted writes."""
+    with db.get_read_connection() as conn:
+        assert not conn.in_transaction
+
+    with db.get_connection():
+        user_id = db.add_user('alice', 'alice@example.com', 'hash', role='archaeologist')
+        assert db.get_user_by_id(user_id)['username'] == 'alice'
+
+    assert db.get_user_by_username('alice')['user_id'] == user_id
+
+
+def test_user_and_project_role_lookups_are_cached(db):
+    """Test cached user/role lookups reflect user and collaborator changes."""
+    owner_id = db.add_user('alice', 'alice@example.com', 'hash', role='archaeologist')
+    user_id = db.add_user('bob', 'bob@example.com', 'hash')
+    db.create_project('P1', 'Savignano', owner_id)
+
+    assert db.get_user_by_id(user_id)['role'] == 'viewer'
+    assert db.is_project_owner('P1', owner_id)
+    assert not db.can_access_project('P1', user_id)
+
+    db.update_user_role(user_id, 'archaeologist')
+    db.add_collaborator('P1', user_id)
+    assert db.get_user_by_id(user_id)['role'] == 'archaeologist'
+    assert db.can_access_project('P1', user_id)
+
+    db.deactivate_user(user_id)
+    assert db.get_user_by_username('bob') is None
+    assert not db.is_project_owner('MISSING', owner_id)
+
+
+def test_get_user_projects(db):
+    """Test a user's projects list owned projects first, then collaborations."""
+    alice = db.add_user('alice', 'alice@example.com', 'hash', role='archaeologist')
+    bob = db.add_user('bob', 'bob@example.com', 'hash', role='archaeologist')
+    db.create_project('P1', 'Savignano', alice)
+    db.create_project('P2', 'Baragalla', bob)
+    db.add_collaborator('P2', alice, role='editor')
+
+    projects = db.get_user_projects(alice)
+    assert [(p['project_id'], p['user_role']) for p in projects] == [('P1', 'owner'), ('P2', 'editor')]
+    assert db.get_user_projects(9999) == []
+
+
+def test_export_data(db, tmp_path):
+    """Test the streamed export matches what the getters return."""
+    import json
+
+    db.add_artifact('AXE_1', '/tmp/axe1.obj', 100, 200, True)
+    db.add_artifact('AXE_2', '/tmp/axe2.obj', 100, 200, True)
+    db.add_features('AXE_1', {'volume': 145.0, 'savignano': {'socket_depth': 12.5}})
+    db.add_features('AXE_2', {'volume': 150.0})
+    db.add_classification('AXE_1', 'C1', 'Class 1', 0.9, validated=True)
+    db.add_training_sample('AXE_1', 'Class 1', {'volume': 145.0})
+
+    output_path = db.export_data(str(tmp_path / 'export.json'))
+    with open(output_path) as f:
+        exported = json.load(f)
+
+    assert exported == {
+        'artifacts': db.get_all_artifacts(),
+        'features': db.get_all_features(),
+        'validated_classifications': db.get_validated_classifications(),
+        'training_data': db.get_training_data(),
+        'statistics': db.get_statistics()
+    }
+
+
+def test_backup_snapshot_includes_uncheckpointed_writes(db, tmp_path, monkeypatch):
+    """Test backups are complete SQLite snapshots even while rows are still in the WAL."""
+    import sqlite3
+    from acs.core.database import backup_database_to_storage
+
+    monkeypatch.setenv('STORAGE_BACKEND', 'local')
+    monkeypatch.setenv('STORAGE_BASE_PATH', str(tmp_path / 'storage'))
+    db.add_artifact('AXE_1', '/tmp/axe1.obj', 100, 200, True)
+
+    result = backup_database_to_storage(db.db_path)
+    assert result['status'] == 'success'
+
+    for name in (result['backup_filename'], 'latest.db'):
+        backup = sqlite3.connect(str(tmp_path / 'storage' / 'backups' / 'database' / name))
+        assert backup.execute('SELECT artifact_id FROM artifacts').fetchall() == [('AXE_1',)]
+        backup.close()
+
+
+def test_backup_snapshot_is_compacted(db, tmp_path, monkeypatch):
+    """Test backups leave out pages freed by deletes."""
+    import sqlite3
+    from acs.core.database import backup_database_to_storage
+
+    monkeypatch.setenv('STORAGE_BACKEND', 'local')
+    monkeypatch.setenv('STORAGE_BASE_PATH', str(tmp_path / 'storage'))
+    for i in range(200):
+        db.add_artifact(f'AXE_{i}', '/tmp/axe.obj' * 50, 100, 200, True)
+    for i in range(1, 200):
+        db.delete_artifact(f'AXE_{i}')
+
+    result = backup_database_to_storage(db.db_path)
+    backup = sqlite3.connect(str(tmp_path / 'storage' / 'backups' / 'database' / 'latest.db'))
+    assert backup.execute('PRAGMA freelist_count').fetchone()[0] == 0
+    assert backup.execute('SELECT artifact_id FROM artifacts').fetchall() == [('AXE_0',)]
+    backup.close()
+    assert result['status'] == 'success'
+
+
+def test_backup_skipped_when_unchanged(db, tmp_path, monkeypatch):
+    """Test an unchanged database isn't uploaded again, and a changed one is."""
+    from acs.core.database import backup_database_to_storage
+
+    monkeypatch.setenv('STORAGE_BACKEND', 'local')
+    monkeypatch.setenv('STORAGE_BASE_PATH', str(tmp_path / 'storage'))
+    db.add_artifact('AXE_1', '/tmp/axe1.obj', 100, 200, True)
+
+    assert backup_database_to_storage(db.db_path)['status'] == 'success'
+    db.get_artifact('AXE_1')
+    assert backup_database_to_storage(db.db_path) == {'status': 'skipped', 'reason': 'unchanged'}
+
+    db.add_artifact('AXE_2', '/tmp/axe2.obj', 100, 200, True)
+    assert backup_database_to_storage(db.db_path)['status'] == 'success'
+
+
+def test_delete_user_cascades_to_collaborations(db):
+    """Test deleting a user removes their project memberships."""
+    owner_id = db.add_user('alice', 'alice@example.com', 'hash', role='archaeologist')
+    user_id = db.add_user('bob', 'bob@example.com', 'hash')
+    db.create_project('P1', 'Savignano', owner_id)
+    db.add_collaborator('P1', user_id)
+
+    db.delete_user(user_id)
+
+    with db.get_connection() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM project_collaborators').fetchone()[0] == 0
+
+
+def test_user_getters_omit_password_hash(db):
+    """Test user dicts only carry the password hash when asked for."""
+    user_id = db.add_user('bob', 'bob@example.com', 'secret-hash')
+
+    assert 'password_hash' not in db.get_user_by_username('bob')
+    assert 'password_hash' not in db.get_user_by_email('bob@example.com')
+    assert 'password_hash' not in db.get_user_by_id(user_id)
+    assert db.get_user_by_id(user_id, with_hash=True)['password_hash'] == 'secret-hash'
+    assert db.get_password_hash('bob') == 'secret-hash'
+
+    db.deactivate_user(user_id)
+    assert db.get_password_hash('bob') is None
+
+
+def test_add_collaborators_in_bulk(db):
+    """Test bulk collaborator inserts skip existing members."""
+    owner_id = db.add_user('alice', 'alice@example.com', 'hash', role='archaeologist')
+    bob = db.add_user('bob', 'bob@example.com', 'hash')
+    carol = db.add_user('carol', 'carol@example.com', 'hash')
+    db.create_project('P1', 'Savignano', owner_id)
+    db.add_collaborator('P1', bob)
+
+    added = db.add_collaborators('P1', [(bob, 'viewer'), (carol, 'collaborator')])
+
+    assert added == 1
+    assert db.can_access_project('P1', carol)
+    roles = {c['user_id']: c['role'] for c in db.get_project_collaborators('P1')}
+    assert roles == {bob: 'collaborator', carol: 'collaborator'}
+
+
+def test_artifact_count_fallback_uses_count_opcode(db):
+    """Test the COUNT(*) fallback compiles to SQLite's Count opcode."""
+    with db.get_read_connection() as conn:
+        conn.execute('DROP TABLE table_counts')
+        opcodes = [row[1] for row in conn.execute('EXPLAIN SELECT COUNT(*) FROM artifacts')]
+        assert 'Count' in opcodes
+        assert _artifact_count(conn.cursor()) == 0
+
+    db.close()  # runs PRAGMA optimize
+
+
+class _FolderStorage:
+    """Cloud-like storage backend over a local folder that records listings."""
+
+    def __init__(self, root):
+        from acs.core.storage import LocalStorage
+        self._local = LocalStorage(base_path=str(root))
+        self.listed = 0
+
+    def upload_file(self, local_path, remote_path):
+        return self._local.upload_file(local_path, remote_path)
+
+    def download_file(self, remote_path, local_path):
+        self._local.download_file(remote_path, local_path)
+
+    def list_files(self, folder_path=""):
+        self.listed += 1
+        return self._local.list_files(folder_path)
+
+
+def test_restore_prefers_latest_without_listing(db, tmp_path, monkeypatch):
+    """Test restore downloads latest.db directly and only lists backups as a fallback."""
+    import os
+    import acs.core.storage
+    from acs.core.database import backup_database_to_storage, restore_database_from_storage
+
+    storage = _FolderStorage(tmp_path / 'storage')
+    monkeypatch.setattr(acs.core.storage, 'get_default_storage', lambda: storage)
+    db.add_artifact('AXE_1', '/tmp/axe1.obj', 100, 200, True)
+    backup = backup_database_to_storage(db.db_path)
+    assert backup['status'] == 'success'
+
+    restored_path = str(tmp_path / 'restored' / 'acs.db')
+    result = restore_database_from_storage(restored_path)
+    assert result['status'] == 'success'
+    assert result['restored_from'] == 'latest.db'
+    assert storage.listed == 0
+
+    os.unlink(tmp_path / 'storage' / 'backups' / 'database' / 'latest.db')
+    result = restore_database_from_storage(str(tmp_path / 'restored2' / 'acs.db'))
+    assert result['restored_from'] == backup['backup_filename']
+    restored = ArtifactDatabase(str(tmp_path / 'restored2' / 'acs.db'))
+    assert restored.get_artifact('AXE_1') is not None
+    restored.close()
+
+
+def test_restore_rejects_corrupt_backup(db, tmp_path, monkeypatch):
+    """Test a corrupt download is rejected and nothing is written to the target."""
+    import os
+    import acs.core.storage
+    from acs.core.database import restore_database_from_storage
+
+    storage = _FolderStorage(tmp_path / 'storage')
+    monkeypatch.setattr(acs.core.storage, 'get_default_storage', lambda: storage)
+    latest = tmp_path / 'storage' / 'backups' / 'database' / 'latest.db'
+    latest.parent.mkdir(parents=True)
+    latest.write_bytes(b'not a database' * 200)
+
+    restored_path = tmp_path / 'restored' / 'acs.db'
+    result = restore_database_from_storage(str(restored_path))
+
+    assert result['status'] == 'error'
+    assert not restored_path.exists()
+    assert os.listdir(restored_path.parent) == []
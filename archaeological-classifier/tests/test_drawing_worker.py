@@ -0,0 +1,44 @@
+"""Tests for the drawing worker pool."""
+
+import threading
+import time
+
+from acs.core import drawing_worker
+
+
+class FakePool:
+    def __init__(self):
+        self.terminated = threading.Event()
+
+    def terminate(self):
+        self.terminated.set()
+
+    def join(self):
+        pass
+
+
+def test_hung_job_retires_only_its_pool(monkeypatch):
+    """Test a timed-out job replaces its pool once the pool's other jobs are done."""
+    pools = [FakePool(), FakePool()]
+    monkeypatch.setattr(drawing_worker, '_drawing_pool', pools[0])
+    monkeypatch.setattr(drawing_worker, '_drawing_jobs', {})
+
+    hung = drawing_worker._acquire_drawing_pool()
+    healthy = drawing_worker._acquire_drawing_pool()
+    assert hung is healthy is pools[0]
+
+    drawing_worker._retire_drawing_pool(hung)
+    drawing_worker._release_drawing_pool(hung)
+    assert drawing_worker._drawing_pool is None
+
+    # A stale retire (the pool was already replaced) leaves the new pool alone
+    drawing_worker._drawing_pool = pools[1]
+    drawing_worker._retire_drawing_pool(pools[0])
+    assert drawing_worker._drawing_pool is pools[1]
+
+    # The retired pool keeps running until its healthy job is collected
+    time.sleep(0.05)
+    assert not pools[0].terminated.is_set()
+    drawing_worker._release_drawing_pool(healthy)
+    assert pools[0].terminated.wait(5)
+    assert not pools[1].terminated.is_set()
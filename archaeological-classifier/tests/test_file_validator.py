@@ -0,0 +1,189 @@
+"""Tests for upload file validation."""
+
+import tempfile
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from acs.core import file_validator
+from acs.core.file_validator import FileValidator, FileValidationError, RateLimiter
+
+
+def _upload(data: bytes, filename: str = 'axe.obj') -> FileStorage:
+    """FileStorage spooled the way Werkzeug's form parser spools uploads."""
+    stream = tempfile.SpooledTemporaryFile(max_size=500 * 1024, mode='rb+')
+    stream.write(data)
+    stream.seek(0)
+    return FileStorage(stream=stream, filename=filename)
+
+
+def test_file_size_checked_without_spilling_to_disk():
+    """Test small uploads are measured in memory and left at the start."""
+    upload = _upload(b'v 0 0 0\n' * 100)
+
+    FileValidator.validate_file_size(upload, max_size=1024)
+
+    assert not upload.stream._rolled
+    assert upload.stream.tell() == 0
+    with pytest.raises(FileValidationError) as exc:
+        FileValidator.validate_file_size(upload, max_size=100)
+    assert exc.value.error_code == 'FILE_TOO_LARGE'
+
+
+def test_batch_size_sums_spooled_and_on_disk_uploads():
+    """Test batch limits count both in-memory and rolled-over uploads."""
+    files = [_upload(b'a' * 100), _upload(b'b' * 600 * 1024)]
+
+    FileValidator.validate_batch_upload(files, max_total_size=700 * 1024)
+    with pytest.raises(FileValidationError) as exc:
+        FileValidator.validate_batch_upload(files, max_total_size=600 * 1024)
+    assert exc.value.error_code == 'BATCH_TOO_LARGE'
+
+
+def test_batch_rejected_for_one_oversized_file():
+    """Test a single file over the per-file limit rejects the batch by name."""
+    files = [_upload(b'a' * 100, 'small.obj'), _upload(b'b' * 2000, 'big.obj')]
+
+    with pytest.raises(FileValidationError) as exc:
+        FileValidator.validate_batch_upload(files, max_total_size=10000, max_file_size=1000)
+    assert exc.value.error_code == 'FILE_TOO_LARGE'
+    assert 'big.obj' in exc.value.message
+    assert all(f.stream.tell() == 0 for f in files)
+
+
+@pytest.mark.parametrize('size', [1024, 600 * 1024])
+def test_save_stream_copies_whole_upload(tmp_path, size):
+    """Test uploads are copied intact whether spooled in memory or on disk."""
+    data = bytes(range(256)) * (size // 256)
+    upload = _upload(data)
+    dest = tmp_path / 'copy.obj'
+
+    FileValidator.save_stream(upload, str(dest))
+
+    assert dest.read_bytes() == data
+    assert upload.stream.tell() == 0
+
+
+@pytest.mark.parametrize('header, expected', [
+    (b'solid axe\n', 'stl_ascii'),
+    (b'\x80\x00\x00\x00rest', 'stl_binary'),
+    (b'ply\r\nformat ascii 1.0\n', 'ply_ascii'),
+    (b'OFF\n8 6 0\n', 'off'),
+    (b'glTF\x02\x00\x00\x00', 'gltf'),
+    (b'o axe\nv 0 0 0\n', 'obj'),
+    (b'comment\nelement vertex 8\n', 'ascii_mesh'),
+])
+def test_magic_bytes_detection(header, expected):
+    """Test file types are detected from signatures and ASCII fallbacks."""
+    upload = _upload(header)
+
+    assert FileValidator.validate_magic_bytes(upload) == expected
+    assert upload.stream.tell() == 0
+
+
+def test_magic_bytes_rejects_unknown_content():
+    """Test unrecognized content fails the magic bytes check."""
+    with pytest.raises(FileValidationError) as exc:
+        FileValidator.validate_magic_bytes(_upload(b'\x00\x01binary junk'))
+    assert exc.value.error_code == 'INVALID_MAGIC_BYTES'
+
+
+@pytest.mark.parametrize('header,label', [
+    (b'<html><body>vertex shader and face detection</body></html>', 'html'),
+    (b'interface {\n  element: vertex;\n}\n', 'typescript'),
+])
+def test_magic_bytes_rejects_keywords_outside_mesh_records(header, label, monkeypatch):
+    """Test mesh keywords outside record lines fail when Magika places the content."""
+    monkeypatch.setattr(file_validator, '_content_label', lambda header: label)
+    with pytest.raises(FileValidationError):
+        FileValidator.validate_magic_bytes(_upload(header))
+
+
+def test_magic_bytes_content_label_only_decides_ambiguous_headers(monkeypatch):
+    """Test mesh records win over the content label, which decides keyword-only headers."""
+    # An OBJ whose vertices follow 500+ bytes of comment lines
+    obj = _upload(b'#exported by scanner\n' * 30 + b'v 1.0 2.0 3.0\nf 1 2 3\n')
+    indented = _upload(b'mesh data\n  element vertex 8\n  element face 12\n')
+    original_label = file_validator._content_label
+
+    monkeypatch.setattr(file_validator, '_content_label', lambda header: 'shell')
+    assert FileValidator.validate_magic_bytes(obj) == 'ascii_mesh'
+    with pytest.raises(FileValidationError) as exc:
+        FileValidator.validate_magic_bytes(indented)
+    assert exc.value.error_code == 'INVALID_MAGIC_BYTES'
+
+    monkeypatch.setattr(file_validator, '_content_label', lambda header: 'txt')
+    assert FileValidator.validate_magic_bytes(indented) == 'ascii_mesh'
+
+    # Without Magika, keyword-only headers are accepted as they always were
+    monkeypatch.setattr(file_validator, 'MAGIKA_AVAILABLE', False)
+    monkeypatch.setattr(file_validator, '_content_label', original_label)
+    assert FileValidator.validate_magic_bytes(indented) == 'ascii_mesh'
+
+
+def test_rate_limiter_sliding_window(monkeypatch):
+    """Test requests expire after the window and idle users are forgotten."""
+    now = [1000.0]
+    monkeypatch.setattr(file_validator.time, 'time', lambda: now[0])
+    limiter = RateLimiter(max_requests=2, window_seconds=60)
+
+    assert limiter.is_allowed('alice')
+    now[0] += 30
+    assert limiter.is_allowed('alice')
+    assert not limiter.is_allowed('alice')
+    assert limiter.get_remaining('alice') == 0
+
+    now[0] += 31  # first request left the window
+    assert limiter.get_remaining('alice') == 1
+    assert limiter.is_allowed('alice')
+
+    now[0] += 120
+    assert limiter.is_allowed('bob')
+    assert set(limiter.requests) == {'bob'}
+
+
+def test_identical_meshes_validated_once(tmp_path, monkeypatch):
+    """Test a re-upload with identical content skips the mesh parse."""
+    import trimesh
+    from collections import OrderedDict
+
+    monkeypatch.setattr(file_validator, '_validated_contents', OrderedDict())
+
+    first = tmp_path / 'first.stl'
+    trimesh.creation.box(extents=(40, 20, 10)).export(str(first))
+    second = tmp_path / 'second.stl'
+    second.write_bytes(first.read_bytes())
+
+    is_valid, _, mesh = FileValidator.validate_mesh_integrity(str(first))
+    assert is_valid and mesh is not None
+
+    # Only the verdict is cached; the caller loads the mesh itself
+    monkeypatch.setattr(FileValidator, '_load_isolated', lambda *a: pytest.fail("parsed again"))
+    assert FileValidator.validate_mesh_integrity(str(second)) == (True, None, None)
+
+    # Different content is still parsed (and here, rejected)
+    second.write_bytes(b'solid broken\n')
+    monkeypatch.undo()
+    assert not FileValidator.validate_mesh_integrity(str(second))[0]
+
+
+def test_mesh_parse_runs_within_budget(tmp_path, monkeypatch):
+    """Test parsing that overruns its time or memory budget is rejected."""
+    import trimesh
+
+    path = tmp_path / 'sphere.obj'
+    trimesh.creation.icosphere(subdivisions=6).export(str(path))
+
+    monkeypatch.setattr(FileValidator, 'PARSE_TIMEOUT', 0.001)
+    assert FileValidator.validate_mesh_integrity(str(path)) == \
+        (False, "Mesh parse exceeded time budget", None)
+
+    monkeypatch.setattr(FileValidator, 'PARSE_TIMEOUT', 60)
+    monkeypatch.setattr(FileValidator, 'PARSE_MEMORY_LIMIT', 16 * 1024 * 1024)
+    is_valid, error, mesh = FileValidator.validate_mesh_integrity(str(path))
+    assert not is_valid and mesh is None
+    assert 'memory budget' in error
+
+    monkeypatch.undo()
+    is_valid, _, mesh = FileValidator.validate_mesh_integrity(str(path))
+    assert is_valid and len(mesh.faces) == 81920
@@ -0,0 +1,309 @@
+"""Tests for mesh loading and feature extraction."""
+
+import pytest
+import trimesh
+
+from acs.core.file_validator import FileValidator
+from acs.core.mesh_processor import MeshProcessor, load_feature_matrix
+
+
+@pytest.fixture
+def box_path(tmp_path):
+    """Binary STL of a 40 x 20 x 10 box."""
+    path = tmp_path / "AXE_1.stl"
+    trimesh.creation.box(extents=(40, 20, 10)).export(str(path))
+    return str(path)
+
+
+def test_validated_mesh_is_not_parsed_again(box_path, monkeypatch):
+    """Test the mesh loaded by the integrity check is reused by load_mesh."""
+    from collections import OrderedDict
+    from acs.core import file_validator
+
+    monkeypatch.setattr(file_validator, '_validated_contents', OrderedDict())
+    is_valid, error, mesh = FileValidator.validate_mesh_integrity(box_path)
+    assert is_valid and error is None
+
+    def fail(*args, **kwargs):
+        raise AssertionError("mesh parsed twice")
+
+    monkeypatch.setattr(trimesh, 'load', fail)
+    processor = MeshProcessor()
+    features = processor.load_mesh(box_path, mesh=mesh)
+
+    assert processor.meshes['AXE_1'] is mesh
+    assert features['length'] == pytest.approx(40)
+
+    # A second load of the unchanged file comes from the cache
+    processor.load_mesh(box_path, 'AXE_1_copy')
+    assert processor.meshes['AXE_1_copy'] is mesh
+
+
+def test_features_cached_next_to_mesh(box_path, monkeypatch):
+    """Test features are read from the sidecar until the mesh file changes."""
+    first = MeshProcessor().load_mesh(box_path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("features recomputed")
+
+    monkeypatch.setattr(MeshProcessor, '_extract_features', fail)
+    cached = MeshProcessor().load_mesh(box_path, 'AXE_2')
+    assert cached['id'] == 'AXE_2'
+    assert cached['volume'] == pytest.approx(first['volume'])
+
+    monkeypatch.undo()
+    trimesh.creation.box(extents=(50, 20, 10)).export(box_path)
+    assert MeshProcessor().load_mesh(box_path)['length'] == pytest.approx(50)
+
+
+def test_features_sidecar_from_older_extraction_ignored(box_path, monkeypatch):
+    """Test a sidecar written by an older FEATURES_VERSION is recomputed."""
+    from acs.core import mesh_processor
+
+    monkeypatch.setattr(mesh_processor, 'FEATURES_VERSION', mesh_processor.FEATURES_VERSION - 1)
+    MeshProcessor().load_mesh(box_path)
+    monkeypatch.undo()
+
+    calls = []
+    extract = MeshProcessor._extract_features
+
+    def counting(self, *args, **kwargs):
+        calls.append(1)
+        return extract(self, *args, **kwargs)
+
+    monkeypatch.setattr(MeshProcessor, '_extract_features', counting)
+    MeshProcessor().load_mesh(box_path)
+    MeshProcessor().load_mesh(box_path)
+    assert len(calls) == 1  # recomputed once, then served from the rewritten sidecar
+
+
+def test_fast_profiles_outline_projection():
+    """Test fast profiles are the projected outlines, ordered around the hull."""
+    mesh = trimesh.creation.box(extents=(40, 20, 10))
+    processor = MeshProcessor()
+
+    sliced = processor._extract_profiles(mesh)
+    fast = processor._extract_profiles(mesh, fast=True)
+
+    assert set(sliced) == set(fast) == {'xy', 'xz', 'yz'}
+    assert sorted(map(tuple, fast['xy'])) == [(-20, -10), (-20, 10), (20, -10), (20, 10)]
+
+
+def test_batch_process_in_worker_processes(tmp_path, monkeypatch):
+    """Test parallel batch processing keeps results in input order."""
+    monkeypatch.setenv('ACS_MESH_WORKERS', '2')
+    paths = []
+    for i, length in enumerate((30, 40, 50)):
+        path = tmp_path / f"AXE_{i}.stl"
+        trimesh.creation.box(extents=(length, 20, 10)).export(str(path))
+        paths.append(str(path))
+    missing = str(tmp_path / "missing.stl")
+
+    processor = MeshProcessor()
+    results = processor.batch_process(paths + [missing])
+
+    assert [r['status'] for r in results] == ['success'] * 3 + ['error']
+    assert [r['features']['length'] for r in results[:3]] == pytest.approx([30, 40, 50])
+    assert set(processor.meshes) == {'AXE_0', 'AXE_1', 'AXE_2'}
+    assert processor.meshes['AXE_2'].extents.max() == pytest.approx(50)
+
+
+def test_reload_from_database_loads_meshes_on_access(box_path, tmp_path, monkeypatch):
+    """Test reload only registers paths, and meshes are parsed when used."""
+    class FakeDB:
+        def get_all_artifacts(self):
+            return [{'artifact_id': 'A1', 'mesh_path': box_path},
+                    {'artifact_id': 'A2', 'mesh_path': str(tmp_path / 'gone.stl')}]
+
+    loads = []
+    original = trimesh.Trimesh.__init__
+
+    def counting(self, *args, **kwargs):
+        loads.append(1)
+        original(self, *args, **kwargs)
+
+    monkeypatch.setattr(trimesh.Trimesh, '__init__', counting)
+    processor = MeshProcessor()
+    stats = processor.reload_from_database(FakeDB())
+
+    assert (stats['loaded'], stats['failed']) == (1, 1)
+    assert 'A1' in processor.meshes and not loads
+    assert processor.meshes['A1'].extents.max() == pytest.approx(40)
+    assert loads
+
+
+def test_distances_reuse_samples_per_mesh():
+    """Test distances are reproducible and sample each mesh only once."""
+    from scipy.spatial.distance import directed_hausdorff
+
+    processor = MeshProcessor()
+    processor.meshes['A'] = trimesh.creation.box(extents=(40, 20, 10))
+    processor.meshes['B'] = trimesh.creation.box(extents=(50, 20, 10))
+
+    hausdorff = processor.compute_distance('A', 'B')
+    points_a, tree_a = processor._get_samples('A')
+    points_b, _ = processor._get_samples('B')
+
+    assert processor.compute_distance('A', 'B') == hausdorff
+    assert processor._get_samples('A')[1] is tree_a
+    assert hausdorff == pytest.approx(max(directed_hausdorff(points_a, points_b)[0],
+                                          directed_hausdorff(points_b, points_a)[0]))
+    assert 0 < processor.compute_distance('A', 'B', method='chamfer') <= hausdorff
+
+    del processor.meshes['B']
+    processor.meshes['C'] = processor.meshes['A']
+    processor.compute_distance('A', 'C')
+    assert set(processor._sample_cache) == {'A', 'C'}
+
+
+def test_binary_stl_fast_path_matches_trimesh(tmp_path, monkeypatch):
+    """Test binary STLs load without trimesh's parser and with merged vertices."""
+    path = tmp_path / "sphere.stl"
+    trimesh.creation.icosphere(subdivisions=3).export(str(path))
+    reference = trimesh.load(str(path))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("generic loader used")
+
+    monkeypatch.setattr(trimesh, 'load', fail)
+    features = MeshProcessor().load_mesh(str(path))
+
+    assert features['n_vertices'] == len(reference.vertices)
+    assert features['n_faces'] == len(reference.faces)
+    assert features['volume'] == pytest.approx(reference.volume)
+    assert features['surface_area'] == pytest.approx(reference.area)
+
+
+def test_export_reuses_extracted_features(box_path, tmp_path, monkeypatch):
+    """Test exports use the features extracted at load time."""
+    import json
+
+    processor = MeshProcessor()
+    processor.load_mesh(box_path)
+    processor.meshes['BOX'] = trimesh.creation.box(extents=(30, 20, 10))
+
+    extracted = []
+    original = MeshProcessor._extract_features
+
+    def counting(self, mesh, artifact_id):
+        extracted.append(artifact_id)
+        return original(self, mesh, artifact_id)
+
+    monkeypatch.setattr(MeshProcessor, '_extract_features', counting)
+    for _ in range(2):
+        processor.export_features(str(tmp_path / 'features.json'))
+
+    assert extracted == ['BOX']
+    exported = json.loads((tmp_path / 'features.json').read_text())
+    assert [f['id'] for f in exported] == ['AXE_1', 'BOX']
+
+
+def test_convexity_skips_hull_for_convex_meshes(monkeypatch):
+    """Test convex meshes skip the hull, others use a vertex subset when large."""
+    processor = MeshProcessor()
+    box = trimesh.creation.box(extents=(40, 20, 10))
+    monkeypatch.setattr(MeshProcessor, '_convex_hull_volume',
+                        lambda self, mesh: pytest.fail("hull built"))
+    features = processor._extract_features(box, 'BOX')
+    assert features['convexity'] == 1.0
+    assert features['convex_volume'] == pytest.approx(8000)
+
+    monkeypatch.undo()
+    dented = trimesh.creation.icosphere(subdivisions=3)
+    dented.vertices[0] *= 0.5
+    processor.HULL_MAX_POINTS = 300
+    features = processor._extract_features(dented, 'DENTED')
+    assert 0.9 < features['convexity'] <= 1.0
+    assert features['convex_volume'] == pytest.approx(dented.convex_hull.volume, rel=0.05)
+
+
+def test_planar_profiles_match_trimesh_sections():
+    """Test array-based slices find the same points as trimesh's section."""
+    import numpy as np
+
+    mesh = trimesh.creation.icosphere(subdivisions=3)
+    mesh.vertices *= [3, 2, 1]
+    processor = MeshProcessor()
+    center = (mesh.bounds[0] + mesh.bounds[1]) * 0.5
+
+    profiles = processor._extract_profiles(mesh)
+
+    for plane, (normal, axes) in MeshProcessor.PROFILE_PLANES.items():
+        expected = mesh.section(plane_origin=center, plane_normal=normal).vertices[:, axes]
+        assert np.allclose(np.unique(np.round(profiles[plane], 9), axis=0),
+                           np.unique(np.round(expected, 9), axis=0))
+        # Ordered counterclockwise around the outline
+        offsets = np.array(profiles[plane]) - np.mean(profiles[plane], axis=0)
+        steps = np.diff(np.arctan2(offsets[:, 1], offsets[:, 0])) % (2 * np.pi)
+        assert np.all(steps < 1)
+
+
+def test_planar_profile_chains_each_section_loop():
+    """Test sections with several loops come out loop by loop, largest first."""
+    import numpy as np
+
+    # A ring: the horizontal section is an outer and an inner circle
+    ring = trimesh.creation.annulus(r_min=1, r_max=2, height=1, sections=32)
+
+    outline = np.array(MeshProcessor()._extract_planar_profile(ring, 'xy'))
+
+    radii = np.linalg.norm(outline, axis=1)
+    outer, inner = outline[radii > 1.5], outline[radii < 1.5]
+    assert len(outer) == len(inner) == 64  # side edges and quad diagonals
+    assert np.array_equal(outline, np.concatenate([outer, inner]))
+    for loop in (outer, inner):
+        # Consecutive points are neighbours on the circle, counterclockwise
+        angles = np.arctan2(loop[:, 1], loop[:, 0])
+        assert np.allclose(np.diff(np.unwrap(angles)), 2 * np.pi / 64)
+
+
+def test_feature_matrix_export_round_trip(box_path, tmp_path):
+    """Test scalar features export as a float32 matrix that loads memory-mapped."""
+    import numpy as np
+
+    processor = MeshProcessor()
+    processor.load_mesh(box_path)
+    processor.meshes['BOX'] = trimesh.creation.box(extents=(30, 20, 10))
+
+    ids, matrix = processor.feature_matrix()
+    assert ids == ['AXE_1', 'BOX']
+    assert matrix.dtype == np.float32 and matrix.shape == (2, len(MeshProcessor.SCALAR_FEATURES))
+    length = MeshProcessor.SCALAR_FEATURES.index('length')
+    assert matrix[:, length] == pytest.approx([40, 30])
+
+    path = str(tmp_path / 'features.npy')
+    processor.export_features(path, format='npy')
+    loaded_ids, columns, loaded = load_feature_matrix(path)
+
+    assert loaded_ids == ids and columns == list(MeshProcessor.SCALAR_FEATURES)
+    assert isinstance(loaded, np.memmap)
+    assert np.array_equal(loaded, matrix)
+
+
+@pytest.mark.parametrize('extents', [(10, 40, 20), (20, 20, 10), (40, 10, 10), (15, 15, 15)])
+def test_dimensions_ordered_from_extents(extents):
+    """Test length, width and thickness are the sorted oriented-box extents."""
+    features = MeshProcessor()._extract_features(trimesh.creation.box(extents=extents), 'BOX')
+
+    expected = sorted(extents, reverse=True)
+    assert [features['length'], features['width'], features['thickness']] == pytest.approx(expected)
+
+
+def test_distance_samples_spread_by_farthest_point_sampling():
+    """Test distance samples are thinned evenly and keep the mesh's extremities."""
+    import numpy as np
+    from acs.core.mesh_processor import _farthest_point_sample
+
+    rng = np.random.default_rng(0)
+    cloud = rng.random((2000, 3))
+    picked = _farthest_point_sample(cloud, 100)
+    assert len(picked) == 100 and len(np.unique(picked, axis=0)) == 100
+    assert len(_farthest_point_sample(cloud[:50], 100)) == 50
+
+    processor = MeshProcessor()
+    processor.meshes['A'] = trimesh.creation.box(extents=(40, 20, 10))
+    points, _ = processor._get_samples('A')
+    assert len(points) == MeshProcessor.DISTANCE_SAMPLES
+    # Samples reach (close to) every face of the box
+    assert np.allclose(points.min(axis=0), [-20, -10, -5], atol=1)
+    assert np.allclose(points.max(axis=0), [20, 10, 5], atol=1)
@@ -0,0 +1,273 @@
+"""Tests for the software fallback rasterizer."""
+
+import numpy as np
+import pytest
+import trimesh
+
+from acs.core import mesh_renderer
+from acs.core.mesh_renderer import MeshRenderer, _project_views, _rasterize, _view_rotation
+
+
+def _front(mesh):
+    """Vertices of a mesh as seen from the front, centered on the origin."""
+    return _project_views(mesh.vertices, np.zeros(3), _view_rotation(0, 0)[None])[0]
+
+
+@pytest.mark.parametrize('azim, elev', [(0, 0), (90, 0), (0, 90), (45, 45)])
+def test_view_rotation_is_orthonormal(azim, elev):
+    """Test view rotations are proper rotations facing the camera."""
+    rotation = _view_rotation(azim, elev)
+
+    assert np.allclose(rotation @ rotation.T, np.eye(3))
+    assert np.linalg.det(rotation) == pytest.approx(1)
+
+
+def test_project_views_matches_per_view_rotation():
+    """Test the batched projection equals rotating for each view separately."""
+    mesh = trimesh.creation.icosphere(subdivisions=1)
+    center = np.array([1.0, 2.0, 3.0])
+    rotations = np.stack([_view_rotation(a, e) for a, e in [(0, 0), (90, 0), (45, 45)]])
+
+    views = _project_views(mesh.vertices, center, rotations)
+
+    assert views.shape == (3, len(mesh.vertices), 3)
+    for view, rotation in zip(views, rotations):
+        assert np.allclose(view, (mesh.vertices - center) @ rotation.T)
+
+
+def test_rasterize_fills_projected_box():
+    """Test a box seen from the front covers its projected rectangle only."""
+    box = trimesh.creation.box(extents=(10, 20, 10))
+    image = _rasterize(_front(box), box.faces, 10.0, (100, 80))
+
+    assert image.shape == (80, 100, 3)
+    # y spans [-10, 10] -> full shorter side; z spans [-5, 5] -> half of it
+    covered = np.any(image != 255, axis=2)
+    rows, cols = np.nonzero(covered)
+    assert (cols.min(), cols.max()) == (10, 89)
+    assert (rows.min(), rows.max()) == (20, 59)
+    assert covered[20:60, 10:90].all()
+
+
+def test_rasterize_keeps_nearest_surface(monkeypatch):
+    """Test the depth test keeps the closest triangle, across batches too."""
+    far = trimesh.creation.box(extents=(1, 20, 20))
+    near = trimesh.creation.box(extents=(1, 4, 4))
+    near.apply_translation([5, 0, 0])
+    # Tilted so its shading differs from the far box's
+    near.apply_transform(trimesh.transformations.rotation_matrix(0.5, [0, 0, 1], [5, 0, 0]))
+    mesh = trimesh.util.concatenate([near, far])
+
+    expected = _rasterize(_front(near), near.faces, 10.0, (50, 50))[25, 25]
+    for chunk in (1 << 20, 16):
+        monkeypatch.setattr(mesh_renderer, 'RASTER_FRAGMENT_CHUNK', chunk)
+        image = _rasterize(_front(mesh), mesh.faces, 10.0, (50, 50))
+        assert np.array_equal(image[25, 25], expected)
+
+
+def test_decimation_cached_in_memory_and_on_disk(tmp_path, monkeypatch):
+    """Test each geometry is decimated once, then read from memory or disk."""
+    calls = []
+
+    def fake_decimation(self, percent=None, face_count=None):
+        calls.append(face_count)
+        return trimesh.creation.icosphere(subdivisions=1)
+
+    monkeypatch.setattr(trimesh.Trimesh, 'simplify_quadric_decimation', fake_decimation)
+    monkeypatch.setattr(mesh_renderer, '_simplified_meshes', mesh_renderer.OrderedDict())
+    mesh = trimesh.creation.icosphere(subdivisions=3)
+
+    first = mesh_renderer._simplify_cached(mesh, 100, str(tmp_path))
+    assert mesh_renderer._simplify_cached(mesh.copy(), 100, str(tmp_path)) is first
+    assert calls == [100]
+
+    mesh_renderer._simplified_meshes.clear()
+    from_disk = mesh_renderer._simplify_cached(mesh, 100, str(tmp_path))
+    assert calls == [100]
+    assert np.allclose(from_disk.vertices, first.vertices)
+    assert [p.name for p in tmp_path.iterdir()] == \
+        [f"simplified_{mesh_renderer._geometry_key(mesh)}_100.ply"]
+
+    # A torn cache file is replaced by decimating again
+    cache_file = next(tmp_path.iterdir())
+    cache_file.write_bytes(cache_file.read_bytes()[:200])
+    mesh_renderer._simplified_meshes.clear()
+    redone = mesh_renderer._simplify_cached(mesh, 100, str(tmp_path))
+    assert calls == [100, 100]
+    assert np.allclose(redone.vertices, first.vertices)
+    assert len(trimesh.load(str(cache_file)).faces) == len(first.faces)
+
+
+def test_real_decimation_reaches_target_and_is_cached(tmp_path, monkeypatch):
+    """Test the quadric decimation call itself, without stubbing it."""
+    pytest.importorskip('fast_simplification')
+    monkeypatch.setattr(mesh_renderer, '_simplified_meshes', mesh_renderer.OrderedDict())
+    mesh = trimesh.creation.icosphere(subdivisions=4)  # 5120 faces
+
+    simplified = mesh_renderer._simplify_cached(mesh, 500, str(tmp_path))
+
+    assert 0 < len(simplified.faces) <= 600
+    cached = tmp_path / f"simplified_{mesh_renderer._geometry_key(mesh)}_500.ply"
+    assert len(trimesh.load(str(cached)).faces) == len(simplified.faces)
+
+
+def test_pyrender_views_render_on_their_own_contexts(tmp_path):
+    """Test a converted mesh renders in several views (and renders) on different GL contexts."""
+    pytest.importorskip('pyrender')
+    try:
+        mesh_renderer._get_offscreen_renderer(8, 8)
+    except Exception as e:  # no display, EGL or OSMesa
+        pytest.skip(f"no OpenGL context: {e}")
+    from PIL import Image
+
+    box = trimesh.creation.box(extents=(40, 20, 10))
+    renderer = MeshRenderer(width=400, height=200)
+
+    for attempt in range(2):  # the second render reuses the worker threads' contexts
+        path = renderer.render_mesh_views(box, str(tmp_path / f'views{attempt}.png'),
+                                          views=['front', 'top'])
+        image = np.asarray(Image.open(path))
+        spans = []
+        for tile in (image[:, :200], image[:, 200:]):
+            rows, cols = np.nonzero((tile < 250).any(axis=2))
+            spans.append((np.ptp(cols) / np.ptp(rows)))
+        front, top = spans
+        assert front == pytest.approx(2, rel=0.2)  # 40 x 20 face
+        assert top == pytest.approx(4, rel=0.2)  # 40 x 10 face, seen from above
+
+
+def test_look_at_pose_faces_target():
+    """Test camera poses are rigid float32 transforms looking at the target."""
+    eye, target = np.array([3.0, 4.0, 12.0]), np.array([1.0, 1.0, 1.0])
+    pose = MeshRenderer._look_at(eye, target, up=np.array([0, 1, 0]))
+
+    assert pose.dtype == np.float32
+    assert np.allclose(pose[:3, :3] @ pose[:3, :3].T, np.eye(3), atol=1e-6)
+    assert np.allclose(pose[:3, 3], eye)
+    # Cameras look down their -z axis
+    direction = (target - eye) / np.linalg.norm(target - eye)
+    assert np.allclose(-pose[:3, 2], direction, atol=1e-6)
+    assert MeshRenderer._IDENTITY[0, 3] == 0
+
+
+def test_rasterize_float32_matches_float64():
+    """Test rendering from float32 vertices gives the same image."""
+    mesh = trimesh.creation.icosphere(subdivisions=2)
+    rotation = _view_rotation(45, 45)[None]
+
+    images = [
+        _rasterize(_project_views(mesh.vertices.astype(dtype), np.zeros(3, dtype),
+                                  rotation.astype(dtype))[0], mesh.faces, 1.0, (120, 90))
+        for dtype in (np.float64, np.float32)
+    ]
+
+    assert np.array_equal(images[0], images[1])
+
+
+def test_renders_shared_by_identical_meshes(tmp_path, monkeypatch):
+    """Test a mesh already rendered under another ID is not rendered again."""
+    rendered = []
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("no GL")
+
+    def fake_render(mesh, output_path):
+        rendered.append(output_path)
+        with open(output_path, 'wb') as f:
+            f.write(b'png')
+        return output_path
+
+    monkeypatch.setattr(mesh_renderer, 'get_mesh_renderer', fail)
+    monkeypatch.setattr(mesh_renderer, '_render_trimesh_gl', fail)
+    monkeypatch.setattr(mesh_renderer, '_render_software_fallback', fake_render)
+    mesh = trimesh.creation.box(extents=(40, 20, 10))
+
+    first = mesh_renderer.render_artifact_image(mesh, 'AXE_1', str(tmp_path))
+    second = mesh_renderer.render_artifact_image(mesh.copy(), 'AXE_2', str(tmp_path))
+
+    assert len(rendered) == 1
+    assert first.endswith('render_AXE_1.png') and second.endswith('render_AXE_2.png')
+    assert open(first, 'rb').read() == open(second, 'rb').read() == b'png'
+
+
+@pytest.mark.parametrize('azim, elev', [(0, 0), (45, 45)])
+def test_backface_culling_keeps_image_of_closed_mesh(azim, elev):
+    """Test culling back faces of a closed mesh doesn't change its image."""
+    mesh = trimesh.creation.icosphere(subdivisions=2)
+    assert mesh.is_volume
+    view = _project_views(mesh.vertices, np.zeros(3), _view_rotation(azim, elev)[None])[0]
+
+    full = _rasterize(view, mesh.faces, 1.0, (120, 90))
+    culled = _rasterize(view, mesh.faces, 1.0, (120, 90), cull_backfaces=True)
+
+    assert np.array_equal(full, culled)
+
+
+def test_backface_culling_drops_faces_turned_away():
+    """Test culled faces are those facing away: a cone seen tip-on shows its base."""
+    cone = trimesh.creation.cone(radius=1.0, height=2.0)
+    view = _project_views(cone.vertices, np.zeros(3), _view_rotation(0, 90)[None])[0]
+
+    tip = _rasterize(view, cone.faces, 1.0, (120, 90), cull_backfaces=True)
+    base = _rasterize(view, cone.faces[:, ::-1], 1.0, (120, 90), cull_backfaces=True)
+
+    assert not np.array_equal(tip[45, 80], base[45, 80])
+    assert np.array_equal(base[45, 80], [212, 167, 106])  # flat base faces the camera
+
+
+def test_mesh_renderer_per_thread_and_reset(monkeypatch):
+    """Test each thread gets its own renderer until the renderer is reset."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    monkeypatch.setattr(mesh_renderer, 'RENDERING_AVAILABLE', True)  # nothing is rendered
+    main = mesh_renderer.get_mesh_renderer()
+    assert mesh_renderer.get_mesh_renderer() is main
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        other = pool.submit(mesh_renderer.get_mesh_renderer).result()
+    assert other is not main
+
+    mesh_renderer.reset_renderer()
+    assert mesh_renderer.get_mesh_renderer() is not main
+    mesh_renderer.reset_renderer()
+
+
+def test_scene_rendered_under_its_id(tmp_path, monkeypatch):
+    """Test objects without a geometry key still render, under the artifact ID."""
+    def fail(*args, **kwargs):
+        raise RuntimeError("no GL")
+
+    def fake_render(mesh, output_path):
+        with open(output_path, 'wb') as f:
+            f.write(b'png')
+        return output_path
+
+    monkeypatch.setattr(mesh_renderer, 'get_mesh_renderer', fail)
+    monkeypatch.setattr(mesh_renderer, '_render_trimesh_gl', fail)
+    monkeypatch.setattr(mesh_renderer, '_render_software_fallback', fake_render)
+    scene = trimesh.Scene([trimesh.creation.box()])
+
+    path = mesh_renderer.render_artifact_image(scene, 'AXE_1', str(tmp_path))
+
+    assert path == str(tmp_path / 'render_AXE_1.png')
+    assert not (tmp_path / 'render_AXE_1.png').is_symlink()
+    assert (tmp_path / 'render_AXE_1.png').read_bytes() == b'png'
+
+
+def test_image_saved_atomically(tmp_path):
+    """Test a failed save leaves neither a partial image nor a temporary file."""
+    class BrokenImage:
+        def save(self, f, *args, **kwargs):
+            f.write(b'\x89PNG partial')
+            raise OSError("disk full")
+
+    class Image:
+        def save(self, f, *args, **kwargs):
+            f.write(b'\x89PNG')
+
+    path = tmp_path / 'render_abc.png'
+    with pytest.raises(OSError):
+        mesh_renderer._save_image(BrokenImage(), str(path))
+    assert list(tmp_path.iterdir()) == []
+
+    mesh_renderer._save_image(Image(), str(path))
+    assert list(tmp_path.iterdir()) == [path] and path.read_bytes() == b'\x89PNG'
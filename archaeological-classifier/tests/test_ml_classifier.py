@@ -0,0 +1,150 @@
+"""Tests for the machine learning classifier."""
+
+import numpy as np
+import pytest
+
+from acs.core.ml_classifier import MLArtifactClassifier
+
+
+def _samples(n=40, seed=0):
+    """Two well separated classes; some samples lack 'weight' or carry an ID."""
+    rng = np.random.default_rng(seed)
+    samples = []
+    for i in range(n):
+        label = 'flanged' if i % 2 else 'flat'
+        features = {'length': float(rng.normal(120 if i % 2 else 80, 5)),
+                    'width': float(rng.normal(40, 3)),
+                    'id': f'AXE_{i}'}
+        if i % 3:
+            features['weight'] = float(rng.normal(300 if i % 2 else 200, 10))
+        samples.append({'features': features, 'class_label': label})
+    return samples
+
+
+@pytest.fixture
+def classifier(tmp_path):
+    return MLArtifactClassifier(model_path=str(tmp_path / 'model.pkl'))
+
+
+def test_prepare_data_fills_sparse_samples(classifier):
+    """Test feature matrices are float32, sorted by name, with absent features zero."""
+    samples = _samples(6)
+
+    X, y, names = classifier._prepare_data(samples)
+
+    assert names == ['length', 'weight', 'width']
+    assert X.dtype == np.float32 and X.shape == (6, 3)
+    assert y == [s['class_label'] for s in samples]
+    for row, sample in zip(X, samples):
+        expected = [sample['features'].get(name, 0.0) for name in names]
+        assert row == pytest.approx(expected)
+
+
+def test_predict_matches_model(classifier):
+    """Test predictions use the trained columns and label probabilities correctly."""
+    samples = _samples()
+    assert classifier.train(samples)['success']
+    assert classifier.class_labels == list(classifier.model.classes_)
+    assert not classifier._uses_scaler  # trees take the raw features
+
+    for sample in samples[:10]:
+        result = classifier.predict(sample['features'])
+        X = np.array([[sample['features'].get(name, 0.0) for name in classifier.feature_names]])
+
+        assert result['prediction'] == classifier.model.predict(X)[0]
+        assert [result['all_probabilities'][c] for c in classifier.class_labels] == \
+            pytest.approx(classifier.model.predict_proba(X)[0])
+
+    # Unknown and non-numeric features are ignored
+    assert classifier.predict({'length': 120.0, 'colour': 'green', 'unknown': 1.0})['prediction']
+
+
+def test_predict_batch_matches_predict(classifier):
+    """Test batch predictions equal one-at-a-time predictions, in order."""
+    samples = _samples()
+    for i, sample in enumerate(samples):  # a third class, so top 3 is a real cut
+        if i % 5 == 0:
+            sample['class_label'] = 'socketed'
+            sample['features']['width'] += 30
+    classifier.train(samples)
+    features = [s['features'] for s in samples[:12]]
+
+    batch = classifier.predict_batch(features)
+
+    assert len(batch) == 12
+    for result, single in zip(batch, map(classifier.predict, features)):
+        assert result['prediction'] == single['prediction']
+        assert result['confidence'] == pytest.approx(single['confidence'])
+        assert [p['confidence'] for p in result['top_predictions']] == \
+            pytest.approx([p['confidence'] for p in single['top_predictions']])
+    assert classifier.predict_batch([]) == []
+
+
+def test_saved_model_round_trip(classifier, tmp_path):
+    """Test models reload from their split files and from a legacy single pickle."""
+    import joblib
+
+    samples = _samples()
+    classifier.train(samples)
+    expected = classifier.predict_batch([s['features'] for s in samples])
+
+    assert (tmp_path / 'model.meta.json').exists()
+    loaded = MLArtifactClassifier(model_path=classifier.model_path)
+    assert loaded.is_trained and loaded.feature_names == classifier.feature_names
+    assert loaded.training_history == classifier.training_history
+    assert loaded.predict_batch([s['features'] for s in samples]) == expected
+
+    # A model trained on standardized features, saved as one pickled dict
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    X, y, names = classifier._prepare_data(samples)
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(scaler.transform(X), y)
+    legacy = tmp_path / 'legacy.pkl'
+    joblib.dump({'model': model, 'scaler': scaler, 'feature_names': names,
+                 'class_labels': ['flat', 'flanged'], 'is_trained': True}, legacy)
+
+    loaded = MLArtifactClassifier(model_path=str(legacy))
+    assert loaded._uses_scaler and loaded.class_labels == ['flanged', 'flat']
+    results = loaded.predict_batch([s['features'] for s in samples])
+    assert [r['all_probabilities']['flat'] for r in results] == \
+        pytest.approx(model.predict_proba(scaler.transform(X))[:, 1])
+
+    # Saved again in the split format, the scaler comes back from its arrays
+    loaded.save_model(str(tmp_path / 'resaved.pkl'))
+    assert (tmp_path / 'resaved.mean.npy').exists()
+    assert MLArtifactClassifier(model_path=str(tmp_path / 'resaved.pkl')).predict_batch(
+        [s['features'] for s in samples]) == results
+
+
+def test_gradient_boosting_importances_and_explanation(classifier):
+    """Test histogram boosting trains and still explains its predictions."""
+    samples = _samples()
+
+    result = classifier.train(samples, algorithm='gradient_boosting')
+
+    assert result['success'] and type(classifier.model).__name__ == 'HistGradientBoostingClassifier'
+    importance = classifier.get_feature_importance()
+    assert set(importance) == {'length', 'weight', 'width'}
+    assert sum(importance.values()) == pytest.approx(1)
+    assert next(iter(importance)) == 'length'  # the feature separating the classes
+
+    explanation = classifier.explain_prediction(samples[1]['features'])
+    assert explanation['key_features'][0]['feature'] == 'length'
+    assert explanation['predicted_class'] == 'flanged'
+
+
+def test_evaluate_uses_training_columns(classifier):
+    """Test evaluation maps test samples onto the trained model's features."""
+    samples = _samples()
+    classifier.train(samples)
+    test_data = _samples(10, seed=1)
+    for sample in test_data:
+        sample['features']['aaa_extra'] = 1.0  # a feature the model never saw
+
+    result = classifier.evaluate_on_test_set(test_data)
+
+    assert result['n_test_samples'] == 10
+    assert result['accuracy'] == pytest.approx(np.mean(
+        [classifier.predict(s['features'])['prediction'] == s['class_label'] for s in test_data]))